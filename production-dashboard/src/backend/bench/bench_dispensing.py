@@ -0,0 +1,169 @@
+"""
+분주 분석: 배열 기반 parse_dispensing_rows vs 기존 dict + statistics 구현 비교.
+
+합성 SET 파일(UTF-16 LE + BOM, 탭 구분)을 분주점 수별로 만들어 시간과 결과 일치 여부를 출력한다.
+실행 (src/backend 에서): python -m bench.bench_dispensing [--points 1000 10000 100000] [--check 3000]
+--check N: 점 수/시드가 다른 무작위 SET 파일 N개에서 기존 구현과 결과가 같은지 확인 (다른 파일 수 출력)
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import tempfile
+import time
+from pathlib import Path
+from statistics import mean, pstdev
+
+from parsers.csv_parser import read_utf16_tab_block
+from parsers.dispensing_parser import OUTLIER_THRESHOLD, parse_dispensing_rows
+
+
+def _legacy_build_stats(values: list[float]) -> dict[str, float]:
+    if not values:
+        return {"count": 0, "mean": 0.0, "stdDev": 0.0, "min": 0.0, "max": 0.0, "cv": 0.0}
+    avg = mean(values)
+    std = pstdev(values) if len(values) > 1 else 0.0
+    cv = (std / avg * 100) if avg != 0 else 0.0
+    return {
+        "count": len(values),
+        "mean": round(avg, 4),
+        "stdDev": round(std, 4),
+        "min": round(min(values), 4),
+        "max": round(max(values), 4),
+        "cv": round(cv, 2),
+    }
+
+
+def _legacy_sigma_status(value: float, avg: float, std: float) -> str:
+    if std == 0:
+        return "OK"
+    z = abs((value - avg) / std)
+    if z > 2:
+        return "NG"
+    if z > 1:
+        return "CHECK"
+    return "OK"
+
+
+def _legacy_parse(path: Path) -> dict:
+    """변경 전 parse_dispensing_rows 동작 그대로 (에러 처리 제외)."""
+    area_values: dict[int, float] = {}
+    for row in read_utf16_tab_block(path):
+        if len(row) < 2:
+            continue
+        label = row[0].strip().strip('"')
+        try:
+            value = float(row[1])
+        except (TypeError, ValueError):
+            continue
+        match = re.search(r"_(\d+):", label)
+        if match is None:
+            continue
+        if "분주면적" in label:
+            area_values[int(match.group(1))] = value
+
+    sets: list[dict] = []
+    area_all: list[float] = []
+    area_filtered: list[float] = []
+    for set_idx in range(1, len(area_values) // 2 + 1):
+        area1 = area_values.get(set_idx * 2 - 1)
+        area2 = area_values.get(set_idx * 2)
+        if area1 is None or area2 is None:
+            continue
+        outlier1 = area1 < OUTLIER_THRESHOLD
+        outlier2 = area2 < OUTLIER_THRESHOLD
+        area_all.extend([area1, area2])
+        if not outlier1:
+            area_filtered.append(area1)
+        if not outlier2:
+            area_filtered.append(area2)
+        sets.append({
+            "index": set_idx,
+            "area1": round(area1, 4),
+            "area2": round(area2, 4),
+            "areaAvg": round((area1 + area2) / 2, 4),
+            "outlier": outlier1 or outlier2,
+            "outlierAreaCount": int(outlier1) + int(outlier2),
+        })
+
+    filtered_stats = _legacy_build_stats(area_filtered)
+    for item in sets:
+        status = _legacy_sigma_status(item["areaAvg"], filtered_stats["mean"], filtered_stats["stdDev"])
+        item["judgement"] = "NG" if item["outlier"] else status
+
+    counts = {"OK": 0, "CHECK": 0, "NG": 0}
+    for item in sets:
+        counts[item["judgement"]] += 1
+
+    return {
+        "process": "dispensing",
+        "sourceFile": path.name,
+        "setCount": len(sets),
+        "outlierCount": sum(item["outlierAreaCount"] for item in sets),
+        "counts": counts,
+        "stats": {"areaFiltered": filtered_stats, "areaAll": _legacy_build_stats(area_all)},
+        "rows": sets,
+    }
+
+
+def _write_sample(path: Path, points: int, seed: int) -> None:
+    """분주면적 points개 + 분주간격 라벨이 섞인 SET 파일 (약 1% 미분주, 일부 결측)."""
+    rng = random.Random(seed)
+    lines = [":BEGIN"]
+    for i in range(1, points + 1):
+        if rng.random() < 0.002:
+            continue
+        area = rng.uniform(0.5, 2.5) if rng.random() < 0.01 else rng.gauss(5.6, 0.12)
+        lines.append(f'"닫힌 스플라인 분주면적_{i}: 면적"\t{area:.4f}\t{area:.4f}\t\t\t0\t')
+        if i % 2 == 0:
+            gap = rng.gauss(5.6, 0.02)
+            lines.append(f'"거리 분주간격_{i // 2}: 거리 X"\t{gap:.4f}\t{gap:.4f}\t\t\t0.0000\t')
+    lines.append(":END")
+    path.write_bytes(("﻿" + "\r\n".join(lines) + "\r\n").encode("utf-16-le"))
+
+
+def _check(count: int, tmp: Path) -> int:
+    """무작위 SET 파일 count개 → 기존 구현과 결과가 다른 파일 수."""
+    rng = random.Random(0)
+    mismatched = 0
+    for i in range(count):
+        path = tmp / f"0101_dispensing-A_SET_check{i}.csv"
+        _write_sample(path, rng.randint(2, 2000), seed=i)
+        if _legacy_parse(path) != parse_dispensing_rows(path):
+            mismatched += 1
+            print(f"다름: {path.name}")
+    return mismatched
+
+
+def _time(fn, path: Path, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(path)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--points", type=int, nargs="+", default=[1000, 10000, 100000], help="분주점 수")
+    ap.add_argument("--repeat", type=int, default=5, help="반복 횟수 (최솟값 사용)")
+    ap.add_argument("--check", type=int, default=0, help="결과 비교용 무작위 파일 수 (0 = 생략)")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.check:
+            print(f"check: {args.check} files, {_check(args.check, Path(tmp))} mismatched")
+        print(f"{'points':>8} {'legacy ms':>10} {'array ms':>10} {'speedup':>8} same")
+        for points in args.points:
+            path = Path(tmp) / f"0101_dispensing-A_SET_{points}.csv"
+            _write_sample(path, points, seed=points)
+            same = _legacy_parse(path) == parse_dispensing_rows(path)
+            legacy = _time(_legacy_parse, path, args.repeat)
+            array = _time(parse_dispensing_rows, path, args.repeat)
+            print(f"{points:>8} {legacy * 1e3:>10.1f} {array * 1e3:>10.1f} {legacy / array:>7.1f}x {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,22 @@
 from __future__ import annotations
 
-from datetime import datetime
+import os
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 
+from parsers.assembly_parser import parse_assembly_worst
+from parsers.dispensing_parser import OUTLIER_THRESHOLD
+from parsers.dispensing_parser import PARSER_VERSION as DISPENSING_PARSER_VERSION
 from parsers.dispensing_parser import DispensingParseError, parse_dispensing_rows
+from parsers.printing_parser import PARSER_VERSION as PRINTING_PARSER_VERSION
 from parsers.printing_parser import parse_printing_rows
+from result_cache import ResultCache, etag_matches, file_signature, make_etag
+from sample_index import SampleFile, SampleIndex, SampleWatcher
+from spc import Measurement, SpcMonitor
 
 app = FastAPI(title="Production Dashboard API", version="0.1.0")
 
@@ -15,73 +24,201 @@ ROOT = Path(__file__).resolve().parents[2]
 SAMPLES_DIR = ROOT / "data" / "samples"
 
 
-def _filename_order_key(path: Path) -> tuple:
-    """신규 규칙 우선 정렬 + 레거시 파일 fallback."""
-    stem = path.stem
-    parts = stem.split("_")
-    # {date}_{processLine}_{lot}_{status}_{sheetOrder}_{memo?}.csv
-    if len(parts) >= 5 and parts[0].isdigit() and len(parts[0]) == 6 and parts[4].isdigit():
-        date_part = parts[0]
-        status = parts[3]
-        order = int(parts[4])
-        status_weight = {"SET": 0, "TEST": 1, "PRD": 2}.get(status, -1)
-        return (2, date_part, status_weight, order, path.name)
-
-    # 레거시: mtime 최신순 기준
-    stat = path.stat()
-    return (1, datetime.fromtimestamp(stat.st_mtime).isoformat(), 0, 0, path.name)
+# 폴더 감시 인덱스: 요청마다 glob/정렬/stat 하지 않고 메모리 인덱스에서 조회
+SAMPLE_INDEX = SampleIndex(SAMPLES_DIR)
+SAMPLE_WATCHER = SampleWatcher(
+    SAMPLE_INDEX,
+    poll_interval=float(os.environ.get("PD_SAMPLES_POLL_SEC", "2.0")),
+    use_watchdog=os.environ.get("PD_SAMPLES_WATCHDOG", "1") != "0",
+)
+
+
+@app.on_event("startup")
+def _start_sample_watcher() -> None:
+    SAMPLE_WATCHER.start()
+
+
+@app.on_event("shutdown")
+def _stop_sample_watcher() -> None:
+    SAMPLE_WATCHER.stop()
+
+
+# 파싱+직렬화 결과 캐시: 대시보드 폴링이 같은 파일을 반복 요청해도 파싱/직렬화 1회
+RESULT_CACHE = ResultCache(max_bytes=int(float(os.environ.get("PD_RESULT_CACHE_MB", "64")) * 1024 * 1024))
+
+
+# 온라인 SPC: 새 파일의 측정값만 관리도에 반영 (상태는 체크포인트로 유지, 이력 재처리 없음)
+SPC_PROCESSES = ("dispensing", "printing", "assembly-sample")
+SPC_MONITOR = SpcMonitor(Path(os.environ.get("PD_SPC_CHECKPOINT", str(ROOT / "data" / "spc" / "checkpoint.json"))))
+
+
+def _spc_measurements(entry: SampleFile) -> list[Measurement]:
+    """샘플 파일 1개 → (채널, 값, 위치). 채널 = "<지표>:<공정라인>"."""
+    path = SAMPLES_DIR / entry.name
+    line = entry.process_line or "-"
+    out: list[Measurement] = []
+    if entry.process == "dispensing":
+        # 미분주(임계값 미만)는 관리도가 아니라 파서 판정(NG)에서 다룸
+        for item in parse_dispensing_rows(path)["rows"]:
+            for key in ("area1", "area2"):
+                if item[key] >= OUTLIER_THRESHOLD:
+                    out.append((f"dispensingArea:{line}", item[key], f"set {item['index']} {key}"))
+    elif entry.process == "printing":
+        for item in parse_printing_rows(path)["rows"]:
+            out.append((f"printingLeftRight:{line}", item["leftRight"], f"row {item['row']}"))
+            out.append((f"printingUpDown:{line}", item["upDown"], f"row {item['row']}"))
+    elif entry.process == "assembly-sample":
+        for item in parse_assembly_worst(path)["rows"]:
+            for key, metric in (("worstX", "assemblyWorstX"), ("worstY", "assemblyWorstY")):
+                if item[key] is not None:
+                    out.append((f"{metric}:{line}", item[key], f"row {item['row']}"))
+    return out
+
+
+def _sync_spc() -> None:
+    """새 파일만 관리도에 반영. 인덱스 버전이 지난번과 같으면 목록 조회 없이 끝 (폴링 비용 O(1))."""
+    SAMPLE_INDEX.ensure_loaded()
+    SPC_MONITOR.sync(
+        lambda watermark: SAMPLE_INDEX.newer_than(watermark, SPC_PROCESSES),
+        SAMPLE_INDEX.get,
+        _spc_measurements,
+        # 목록 조회 전에 읽은 버전 — 조회 중 바뀐 파일은 다음 sync에서 다시 봄
+        version=SAMPLE_INDEX.version,
+    )
 
 
-@app.get("/api/process/printing/latest")
-def get_latest_printing() -> dict[str, Any]:
-    if not SAMPLES_DIR.exists():
+def _cached_json(
+    request: Request,
+    kind: str,
+    path: Path,
+    parser_version: int,
+    build: Callable[[], dict[str, Any]],
+    entry: SampleFile | None = None,
+) -> Response:
+    """
+    (path, size, mtime_ns, parser_version) 기준 캐시 + ETag. 변경 없으면 304(파싱/직렬화 없음).
+    entry(인덱스 항목)가 있으면 인덱스의 size/mtime_ns를 그대로 사용 → 요청마다 stat 없음.
+    인덱스에 없는 파일만 stat.
+    """
+    if entry is not None:
+        signature = (entry.size, entry.mtime_ns, parser_version)
+    else:
+        try:
+            signature = file_signature(path, parser_version)
+        except OSError:
+            return JSONResponse(jsonable_encoder(build()))
+
+    etag = make_etag(kind, path, signature)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    body = RESULT_CACHE.get(kind, path, signature)
+    if body is None:
+        body = JSONResponse(jsonable_encoder(build())).body
+        RESULT_CACHE.put(kind, path, signature, body)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _require_samples_dir() -> None:
+    SAMPLE_INDEX.ensure_loaded()
+    if not SAMPLE_INDEX.exists:
         raise HTTPException(status_code=404, detail="data/samples 디렉토리가 없습니다.")
 
-    candidates = sorted(
-        SAMPLES_DIR.glob("*.csv"),
-        key=_filename_order_key,
-        reverse=True,
-    )
-    printing_files = [p for p in candidates if "printing" in p.name.lower() or "프린팅" in p.name]
-
-    if not printing_files:
-        raise HTTPException(status_code=404, detail="프린팅 CSV 파일을 찾지 못했습니다.")
-
-    latest = printing_files[0]
-    parsed = parse_printing_rows(latest)
 
+@app.get("/api/samples")
+def list_samples(
+    process: str | None = None,
+    date: str | None = None,
+    lot: str | None = None,
+    status: str | None = None,
+) -> dict[str, Any]:
+    _require_samples_dir()
+    files = SAMPLE_INDEX.query(process=process, date=date, lot=lot, status=status)
     return {
         "ok": True,
-        "latestFile": latest.name,
-        "data": parsed,
+        "watchMode": SAMPLE_WATCHER.mode,
+        "files": [f.to_dict() for f in files],
     }
 
 
+@app.get("/api/process/printing/latest")
+def get_latest_printing(request: Request) -> Response:
+    _require_samples_dir()
+
+    latest = SAMPLE_INDEX.latest("printing")
+    if latest is None:
+        raise HTTPException(status_code=404, detail="프린팅 CSV 파일을 찾지 못했습니다.")
+
+    path = SAMPLES_DIR / latest.name
+    return _cached_json(
+        request,
+        "printing",
+        path,
+        PRINTING_PARSER_VERSION,
+        lambda: {
+            "ok": True,
+            "latestFile": latest.name,
+            "data": parse_printing_rows(path),
+        },
+        entry=latest,
+    )
+
+
 @app.get("/api/dispensing")
-def get_dispensing(file: str | None = None) -> dict[str, Any]:
-    if not SAMPLES_DIR.exists():
-        raise HTTPException(status_code=404, detail="data/samples 디렉토리가 없습니다.")
+def get_dispensing(request: Request, file: str | None = None) -> Response:
+    _require_samples_dir()
 
     if file:
         target = SAMPLES_DIR / file
+        entry = SAMPLE_INDEX.get(file)
+        # 인덱스에 없으면(감시 반영 전 등) 디스크에서 직접 확인
+        if entry is None and (not target.exists() or target.suffix.lower() != ".csv"):
+            raise HTTPException(status_code=404, detail="요청한 CSV 파일이 존재하지 않습니다.")
     else:
-        candidates = sorted(SAMPLES_DIR.glob("*dispensing*.csv"), key=lambda p: p.name)
-        if not candidates:
+        entry = SAMPLE_INDEX.latest("dispensing")
+        if entry is None:
             raise HTTPException(status_code=404, detail="분주 CSV 파일을 찾지 못했습니다.")
-        target = candidates[-1]
-
-    if not target.exists() or target.suffix.lower() != ".csv":
-        raise HTTPException(status_code=404, detail="요청한 CSV 파일이 존재하지 않습니다.")
-
-    try:
-        parsed = parse_dispensing_rows(target)
-    except DispensingParseError as exc:
-        raise HTTPException(status_code=422, detail=str(exc)) from exc
-    except ValueError as exc:
-        raise HTTPException(status_code=422, detail=f"CSV 파싱 실패: {exc}") from exc
-
-    return {
-        "ok": True,
-        "file": target.name,
-        "data": parsed,
-    }
+        target = SAMPLES_DIR / entry.name
+
+    def build() -> dict[str, Any]:
+        try:
+            parsed = parse_dispensing_rows(target)
+        except DispensingParseError as exc:
+            raise HTTPException(status_code=422, detail=str(exc)) from exc
+        except ValueError as exc:
+            raise HTTPException(status_code=422, detail=f"CSV 파싱 실패: {exc}") from exc
+
+        return {
+            "ok": True,
+            "file": target.name,
+            "data": parsed,
+        }
+
+    return _cached_json(request, "dispensing", target, DISPENSING_PARSER_VERSION, build, entry=entry)
+
+
+@app.get("/api/spc/alarms")
+def get_spc_alarms(request: Request, since: int = 0) -> Response:
+    """since 이후 알람만 반환. 새 알람이 없으면 304 (대시보드 폴링용)."""
+    _sync_spc()
+    seq = SPC_MONITOR.seq
+    etag = f'"spc-{seq}-{since}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    body = {"ok": True, "seq": seq, "alarms": SPC_MONITOR.alarms_since(since)}
+    return JSONResponse(body, headers=headers)
+
+
+@app.get("/api/spc/charts")
+def get_spc_charts() -> dict[str, Any]:
+    _sync_spc()
+    return {"ok": True, "charts": SPC_MONITOR.chart_summaries()}
+
+
+@app.post("/api/spc/charts/{channel}/reset")
+def reset_spc_chart(channel: str) -> dict[str, Any]:
+    if not SPC_MONITOR.reset(channel):
+        raise HTTPException(status_code=404, detail="해당 SPC 채널이 없습니다.")
+    return {"ok": True, "channel": channel}
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import math
+from pathlib import Path
+
+from .csv_parser import iter_utf16_tab_block
+from .label_grammar import ASSEMBLY
+
+# 결과가 달라지는 파서 변경 시 올린다 (응답 캐시/ETag 무효화)
+PARSER_VERSION = 2
+
+
+def _last_number(cells: list[str]) -> float | None:
+    """
+    계산값 = 오른쪽에서 첫 번째로 숫자 변환되는 칸 (NaN 제외).
+    Rev8 core.read_measurement_csv와 같은 규칙 → 스텝1 대시보드와 같은 값. 섹션 → 축은 label_grammar.ASSEMBLY
+    """
+    for cell in reversed(cells):
+        try:
+            value = float(cell.strip().strip('"').strip())
+        except ValueError:
+            continue
+        if not math.isnan(value):
+            return value
+    return None
+
+
+def parse_assembly_worst(path: Path) -> dict:
+    """샘플검사 CSV → Row별/시트 |편차| 최대 (양면 좌우 = X, 양면 상하 = Y)."""
+    rows = iter_utf16_tab_block(path)
+
+    by_row: dict[int, dict[str, float]] = {}
+    for row in rows:
+        if len(row) < 2:
+            continue
+
+        hit = ASSEMBLY.match(row[0].strip().strip('"'))
+        if hit is None:
+            continue
+        value = _last_number(row[1:])
+        if value is None:
+            continue
+        dev = abs(value)
+
+        cur = by_row.setdefault(int(hit.fields["row"]), {})
+        cur[hit.kind] = max(cur.get(hit.kind, 0.0), dev)
+
+    points = [
+        {"row": idx, "worstX": by_row[idx].get("worstX"), "worstY": by_row[idx].get("worstY")}
+        for idx in sorted(by_row)
+    ]
+
+    def _worst(axis: str) -> float | None:
+        vals = [p[axis] for p in points if p[axis] is not None]
+        return round(max(vals), 4) if vals else None
+
+    return {
+        "process": "assembly-sample",
+        "sourceFile": path.name,
+        "rowCount": len(points),
+        "metrics": {"worstX": _worst("worstX"), "worstY": _worst("worstY")},
+        "rows": [
+            {
+                "row": p["row"],
+                "worstX": round(p["worstX"], 4) if p["worstX"] is not None else None,
+                "worstY": round(p["worstY"], 4) if p["worstY"] is not None else None,
+            }
+            for p in points
+        ],
+    }
@@ -1,19 +1,75 @@
 from __future__ import annotations
 
 import csv
+import io
+import re
+from collections.abc import Iterator
 from pathlib import Path
 
+from .text_encoding import SNIFF_BYTES, decode_bytes, detect_encoding
 
-def read_utf16_tab_block(path: Path) -> list[list[str]]:
-    """UTF-16 LE BOM + 탭 구분자 CSV에서 :BEGIN~:END 구간만 읽는다."""
-    text = path.read_text(encoding="utf-16")
-    lines = text.splitlines()
+# 블록 표식 줄 (앞뒤 공백 무시, :BEGIN 앞 BOM 허용) — 처음 나온 표식이 :END면 블록 없음
+_BLOCK_MARK = re.compile(r"(?:^|\n)[^\S\n]*(?:\ufeff*(:BEGIN)|:END)[^\S\n]*(?=\n|\Z)")
+_BLOCK_END = re.compile(r"\n[^\S\n]*:END[^\S\n]*(?=\n|\Z)")
+
+
+def _iter_lines(path: Path) -> Iterator[str]:
+    """파일 → 줄 단위 텍스트 (줄바꿈 제외). BOM/NUL 분포로 판별되면 파일 핸들에서 점진 디코딩."""
+    with path.open("rb") as raw:
+        _, codec, _ = detect_encoding(raw.peek(SNIFF_BYTES)[:SNIFF_BYTES])
+        if codec is not None:
+            # 장비 출력(UTF-16 LE + BOM)은 이 경로: 전체를 메모리에 올리지 않음
+            for line in io.TextIOWrapper(raw, encoding=codec, newline=None):
+                yield line.rstrip("\n")
+            return
+
+        # BOM 없는 UTF-8/CP949는 전체 버퍼 기준 폴백 판별이 필요해 한 번에 디코딩
+        yield from decode_bytes(raw.read()).text.splitlines()
+
+
+def _iter_block_lines(path: Path) -> Iterator[str]:
+    """:BEGIN~:END 구간의 줄을 순서대로 yield (:END에서 중단, 블록이 없거나 닫히지 않으면 ValueError)."""
+    lines = _iter_lines(path)
+    for line in lines:
+        stripped = line.strip()
+        if stripped.lstrip("\ufeff") == ":BEGIN":
+            break
+        if stripped == ":END":
+            raise ValueError(f":BEGIN/:END 블록을 찾을 수 없습니다: {path}")
+    else:
+        raise ValueError(f":BEGIN/:END 블록을 찾을 수 없습니다: {path}")
 
-    start = next((i for i, line in enumerate(lines) if line.strip().lstrip("\ufeff") == ":BEGIN"), None)
-    end = next((i for i, line in enumerate(lines) if line.strip() == ":END"), None)
+    for line in lines:
+        if line.strip() == ":END":
+            return
+        yield line
+    raise ValueError(f":BEGIN/:END 블록을 찾을 수 없습니다: {path}")
 
-    if start is None or end is None or end <= start:
+
+def iter_utf16_tab_block(path: Path) -> Iterator[list[str]]:
+    """UTF-16 LE BOM + 탭 구분자 CSV의 :BEGIN~:END 구간 행을 순서대로 yield (:END에서 중단)."""
+    yield from csv.reader(_iter_block_lines(path), delimiter="\t")
+
+
+def read_tab_block_text(path: Path) -> str:
+    """
+    :BEGIN~:END 구간 텍스트 1개 (줄바꿈은 "\\n"로 통일) — 정규식 1회로 전체 행을 훑는 호출부용.
+    블록 규칙은 iter_utf16_tab_block과 같고, 파일을 한 번에 디코딩한 뒤 표식 줄만 정규식으로 찾는다.
+    """
+    raw = path.read_bytes()
+    _, codec, _ = detect_encoding(raw[:SNIFF_BYTES])
+    text = raw.decode(codec) if codec is not None else decode_bytes(raw).text
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+
+    begin = _BLOCK_MARK.search(text)
+    if begin is None or begin.group(1) is None:
         raise ValueError(f":BEGIN/:END 블록을 찾을 수 없습니다: {path}")
+    end = _BLOCK_END.search(text, begin.end())
+    if end is None:
+        raise ValueError(f":BEGIN/:END 블록을 찾을 수 없습니다: {path}")
+    return text[begin.end() + 1 : end.start()]
+
 
-    block = lines[start + 1 : end]
-    return list(csv.reader(block, delimiter="\t"))
+def read_utf16_tab_block(path: Path) -> list[list[str]]:
+    """iter_utf16_tab_block 결과를 리스트로 (행 전체가 필요한 호출부용)."""
+    return list(iter_utf16_tab_block(path))
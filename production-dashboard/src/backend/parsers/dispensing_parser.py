@@ -1,12 +1,15 @@
 from __future__ import annotations
 
-import re
 from pathlib import Path
-from statistics import mean, pstdev
 
-from .csv_parser import read_utf16_tab_block
+import numpy as np
 
-OUTLIER_THRESHOLD = 3.0
+from .csv_parser import read_tab_block_text
+from .dispensing_sets import OUTLIER_THRESHOLD, area_stats, filtered_area_stats, last_by_index, pair_sets
+from .label_grammar import DISPENSING
+
+# 결과가 달라지는 파서 변경 시 올린다 (응답 캐시/ETag 무효화)
+PARSER_VERSION = 2
 
 
 class DispensingParseError(ValueError):
@@ -20,138 +23,100 @@ def _to_float(value: str) -> float | None:
         return None
 
 
-def _extract_index(label: str) -> int | None:
-    match = re.search(r"_(\d+):", label)
-    return int(match.group(1)) if match else None
+def _round4(values: np.ndarray) -> list[float]:
+    """[round(v, 4) for v in values]와 같은 결과. 이미 4자리인 값(대부분의 측정값)은 round() 호출 생략."""
+    out = values.tolist()
+    # rint(v*1e4)/1e4 == v 이면 v는 그 4자리 소수에 가장 가까운 float → round(v, 4) == v
+    done = (np.round(values, 4) == values) & (np.abs(values) < 1e9)
+    for i in np.flatnonzero(~done).tolist():
+        out[i] = round(out[i], 4)
+    return out
 
 
-def _build_stats(values: list[float]) -> dict[str, float]:
-    if not values:
-        return {
-            "count": 0,
-            "mean": 0.0,
-            "stdDev": 0.0,
-            "min": 0.0,
-            "max": 0.0,
-            "cv": 0.0,
-        }
+def _sigma_status(values: np.ndarray, avg: float, std: float) -> np.ndarray:
+    if std == 0:
+        return np.full(values.shape, "OK", dtype=object)
 
-    avg = mean(values)
-    std = pstdev(values) if len(values) > 1 else 0.0
-    cv = (std / avg * 100) if avg != 0 else 0.0
+    z = np.abs((values - avg) / std)
+    return np.where(z > 2, "NG", np.where(z > 1, "CHECK", "OK")).astype(object)
 
-    return {
-        "count": len(values),
-        "mean": round(avg, 4),
-        "stdDev": round(std, 4),
-        "min": round(min(values), 4),
-        "max": round(max(values), 4),
-        "cv": round(cv, 2),
-    }
 
+def _to_floats(texts: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """값 문자열 → (float 배열, 변환 성공 마스크). 전부 숫자면 배열 변환 1회."""
+    try:
+        return np.array(texts).astype(np.float64), np.ones(len(texts), dtype=bool)
+    except ValueError:
+        parsed = [_to_float(t) for t in texts]
+        ok = np.array([v is not None for v in parsed], dtype=bool)
+        return np.array([np.nan if v is None else v for v in parsed], dtype=np.float64), ok
 
-def _sigma_status(value: float, avg: float, std: float) -> str:
-    if std == 0:
-        return "OK"
 
-    z = abs((value - avg) / std)
-    if z > 2:
-        return "NG"
-    if z > 1:
-        return "CHECK"
-    return "OK"
+def _read_area_values(path: Path) -> tuple[np.ndarray, np.ndarray]:
+    """분주면적 라벨 → (인덱스, 값) 배열. 같은 인덱스가 반복되면 마지막 값."""
+    # 블록 전체를 findall 1회로 분류 → 분주면적 행의 (인덱스, 값) 문자열만 남음
+    hits = DISPENSING.scan(read_tab_block_text(path), "area", "index")
+    idx = np.fromiter((int(i) for i, _ in hits), dtype=np.int64, count=len(hits))
+    val, ok = _to_floats([v for _, v in hits])
+    return last_by_index(idx[ok], val[ok])
 
 
 def parse_dispensing_rows(path: Path) -> dict:
-    rows = read_utf16_tab_block(path)
+    indices, values = _read_area_values(path)
 
-    area_values: dict[int, float] = {}
+    if indices.size == 0:
+        raise DispensingParseError("분주면적 데이터를 찾지 못했습니다.")
 
-    for row in rows:
-        if len(row) < 2:
-            continue
+    if indices.size // 2 == 0:
+        raise DispensingParseError("면적 2개 세트 구성에 필요한 데이터가 부족합니다.")
 
-        label = row[0].strip().strip('"')
-        value = _to_float(row[1])
-        if value is None:
-            continue
+    set_index, pairs = pair_sets(indices, values)
+    area1, area2 = pairs[:, 0], pairs[:, 1]
 
-        idx = _extract_index(label)
-        if idx is None:
-            continue
+    outlier_mask = pairs < OUTLIER_THRESHOLD
+    outlier = outlier_mask.any(axis=1)
+    outlier_area_count = outlier_mask.sum(axis=1)
 
-        if "분주면적" in label:
-            area_values[idx] = value
+    area_avg = _round4((area1 + area2) / 2)
 
-    if not area_values:
-        raise DispensingParseError("분주면적 데이터를 찾지 못했습니다.")
+    area_filtered_stats = filtered_area_stats(pairs)
 
-    set_count = len(area_values) // 2
-    if set_count == 0:
-        raise DispensingParseError("면적 2개 세트 구성에 필요한 데이터가 부족합니다.")
+    area_status = _sigma_status(np.array(area_avg), area_filtered_stats["mean"], area_filtered_stats["stdDev"])
+    judgement = np.where(outlier, "NG", area_status)
 
-    sets: list[dict] = []
-    area_all: list[float] = []
-    area_filtered: list[float] = []
-
-    for set_idx in range(1, set_count + 1):
-        area1 = area_values.get(set_idx * 2 - 1)
-        area2 = area_values.get(set_idx * 2)
-        if area1 is None or area2 is None:
-            continue
-
-        outlier1 = area1 < OUTLIER_THRESHOLD
-        outlier2 = area2 < OUTLIER_THRESHOLD
-        outlier = outlier1 or outlier2
-
-        area_avg = (area1 + area2) / 2
-
-        area_all.extend([area1, area2])
-        if not outlier1:
-            area_filtered.append(area1)
-        if not outlier2:
-            area_filtered.append(area2)
-
-        sets.append(
-            {
-                "index": set_idx,
-                "area1": round(area1, 4),
-                "area2": round(area2, 4),
-                "areaAvg": round(area_avg, 4),
-                "outlier": outlier,
-                "outlierAreaCount": int(outlier1) + int(outlier2),
-            }
+    sets = [
+        {
+            "index": i,
+            "area1": a1,
+            "area2": a2,
+            "areaAvg": avg,
+            "outlier": o,
+            "outlierAreaCount": c,
+            "judgement": j,
+        }
+        for i, a1, a2, avg, o, c, j in zip(
+            set_index.tolist(),
+            _round4(area1),
+            _round4(area2),
+            area_avg,
+            outlier.tolist(),
+            outlier_area_count.tolist(),
+            judgement.tolist(),
         )
-
-    area_filtered_stats = _build_stats(area_filtered)
-
-    for item in sets:
-        area_status = _sigma_status(item["areaAvg"], area_filtered_stats["mean"], area_filtered_stats["stdDev"])
-
-        if item["outlier"]:
-            item["judgement"] = "NG"
-        elif area_status == "NG":
-            item["judgement"] = "NG"
-        elif area_status == "CHECK":
-            item["judgement"] = "CHECK"
-        else:
-            item["judgement"] = "OK"
+    ]
 
     status_count = {"OK": 0, "CHECK": 0, "NG": 0}
-    for item in sets:
-        status_count[item["judgement"]] += 1
-
-    outlier_count = sum(item["outlierAreaCount"] for item in sets)
+    labels, counts = np.unique(judgement.astype(str), return_counts=True)
+    status_count.update(zip(labels.tolist(), counts.tolist()))
 
     return {
         "process": "dispensing",
         "sourceFile": path.name,
         "setCount": len(sets),
-        "outlierCount": outlier_count,
+        "outlierCount": int(outlier_area_count.sum()),
         "counts": status_count,
         "stats": {
             "areaFiltered": area_filtered_stats,
-            "areaAll": _build_stats(area_all),
+            "areaAll": area_stats(pairs.ravel()),
         },
         "rows": sets,
     }
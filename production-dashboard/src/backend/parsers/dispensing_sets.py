@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+# 분주면적 세트 구성/통계 — 대시보드_Rev8/isens_backend_step1/dispensing_sets.py 와 동일하게 유지
+# - 입력: 라벨 '분주면적_{번호}'의 (번호, 값) 배열 (라벨 분류는 label_grammar.DISPENSING)
+# - 같은 번호는 마지막 값, 번호 2k-1/2k가 모두 있는 세트 k만 사용
+# - 이 값 미만 면적은 미분주(이상치) → 필터 통계에서 제외
+
+OUTLIER_THRESHOLD = 3.0
+
+
+def last_by_index(indices: np.ndarray, values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """(번호, 값) → (고유 번호 오름차순, 값). 같은 번호가 반복되면 마지막 값."""
+    # 뒤에서부터 첫 등장 = 원래 순서의 마지막 등장
+    uniq, first_rev = np.unique(indices[::-1], return_index=True)
+    return uniq, values[::-1][first_rev]
+
+
+def pair_sets(indices: np.ndarray, values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    last_by_index 결과 → (세트 번호, [세트, 2] 면적 배열).
+    세트 수 = 고유 번호 수 // 2, 두 면적이 모두 있는 세트만 남김.
+    """
+    set_count = indices.size // 2
+    # 번호 1..2*set_count 를 (세트, 면적1/2) 격자로 펼침 (없는 칸은 present=False)
+    grid = np.zeros(set_count * 2, dtype=np.float64)
+    present = np.zeros(set_count * 2, dtype=bool)
+    in_range = (indices >= 1) & (indices <= set_count * 2)
+    grid[indices[in_range] - 1] = values[in_range]
+    present[indices[in_range] - 1] = True
+
+    complete = present.reshape(set_count, 2).all(axis=1)
+    return np.flatnonzero(complete) + 1, grid.reshape(set_count, 2)[complete]
+
+
+def area_stats(values: np.ndarray) -> dict[str, float]:
+    """면적 값 → count/mean/stdDev(모표준편차)/min/max/cv(%)."""
+    if values.size == 0:
+        return {
+            "count": 0,
+            "mean": 0.0,
+            "stdDev": 0.0,
+            "min": 0.0,
+            "max": 0.0,
+            "cv": 0.0,
+        }
+
+    # 평균/표준편차는 fsum(보정 합)으로 — np.mean 쌍별 합은 round 경계에서 statistics 결과와 달라짐
+    avg = math.fsum(values) / values.size
+    std = math.sqrt(math.fsum((values - avg) ** 2) / values.size) if values.size > 1 else 0.0
+    cv = (std / avg * 100) if avg != 0 else 0.0
+
+    return {
+        "count": int(values.size),
+        "mean": round(avg, 4),
+        "stdDev": round(std, 4),
+        "min": round(float(values.min()), 4),
+        "max": round(float(values.max()), 4),
+        "cv": round(cv, 2),
+    }
+
+
+def filtered_area_stats(pairs: np.ndarray) -> dict[str, float]:
+    """pair_sets 면적 배열 → 미분주(OUTLIER_THRESHOLD 미만) 제외 통계."""
+    return area_stats(pairs[~(pairs < OUTLIER_THRESHOLD)])
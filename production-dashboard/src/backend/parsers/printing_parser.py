@@ -1,11 +1,14 @@
 from __future__ import annotations
 
-import re
 from dataclasses import dataclass
 from pathlib import Path
 from statistics import mean
 
-from .csv_parser import read_utf16_tab_block
+from .csv_parser import iter_utf16_tab_block
+from .label_grammar import PRINTING
+
+# 결과가 달라지는 파서 변경 시 올린다 (응답 캐시/ETag 무효화)
+PARSER_VERSION = 2
 
 CHECK_LIMIT = 0.12
 NG_LIMIT = 0.15
@@ -28,37 +31,25 @@ def _judge(value: float) -> str:
     return "OK"
 
 
-def _extract_row_index(name: str) -> int | None:
-    m = re.search(r"_(\d+):", name)
-    if m:
-        return int(m.group(1))
-    return None
-
-
 def parse_printing_rows(path: Path) -> dict:
-    rows = read_utf16_tab_block(path)
+    rows = iter_utf16_tab_block(path)
 
-    # 프린팅 CSV의 기본 숫자 메타(앞 6줄)는 row 인덱스가 없어 제외
+    # 프린팅 CSV의 기본 숫자 메타(앞 6줄)는 row 인덱스가 없어 문법에 걸리지 않음
     by_row: dict[int, dict[str, float]] = {}
     for row in rows:
-        if not row:
+        if len(row) < 2:
+            continue
+
+        hit = PRINTING.match(row[0].strip().strip('"'))
+        if hit is None:
+            continue
+        try:
+            value = float(row[1])
+        except ValueError:
             continue
 
-        label = row[0].strip().strip('"')
-        if "타발기준_카본좌우_" in label or "타발기준_카본상하_" in label:
-            row_idx = _extract_row_index(label)
-            if row_idx is None or len(row) < 2:
-                continue
-            try:
-                value = float(row[1])
-            except ValueError:
-                continue
-
-            by_row.setdefault(row_idx, {})
-            if "좌우" in label:
-                by_row[row_idx]["leftRight"] = value
-            else:
-                by_row[row_idx]["upDown"] = value
+        key = "leftRight" if hit.fields["axis"] == "좌우" else "upDown"
+        by_row.setdefault(int(hit.fields["row"]), {})[key] = value
 
     points: list[PrintingPoint] = []
     for idx in sorted(by_row.keys()):
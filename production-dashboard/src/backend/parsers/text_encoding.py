@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import codecs
+from typing import NamedTuple
+
+# 계측 CSV 인코딩 판별 규칙 — 대시보드_Rev8/isens_backend_step1/text_encoding.py 와 동일하게 유지 (상수 이름/errors 기본값 포함)
+# - BOM이 있으면 BOM만 보고 결정 (장비 출력은 UTF-16 LE + BOM)
+# - BOM이 없으면 앞부분 NUL 바이트 분포로 UTF-16 LE/BE 추정
+# - 그 외: UTF-8 → CP949 시도, 모두 실패하면 UTF-8(errors, 기본 "replace")로 강제 디코딩 — 예외 없음
+
+# (BOM, 인코딩 이름, 코덱) — 코덱이 BOM을 제거하므로 슬라이스 없이 디코딩 ("utf-16"은 내장 fast path)
+_BOMS: tuple[tuple[bytes, str, str], ...] = (
+    (codecs.BOM_UTF8, "utf-8-sig", "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16-le", "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16-be", "utf-16"),
+)
+
+SNIFF_BYTES = 512
+NUL_RATIO_UTF16 = 0.3
+
+
+class DecodedText(NamedTuple):
+    text: str
+    encoding: str
+    bom: bool
+
+
+def detect_encoding(data: bytes) -> tuple[str | None, str | None, bool]:
+    """BOM/prefix로 인코딩 추정. (인코딩 이름, 코덱 또는 None, BOM 여부)를 반환한다."""
+    for bom, enc, codec in _BOMS:
+        if data.startswith(bom):
+            return enc, codec, True
+
+    head = data[:SNIFF_BYTES]
+    half = len(head) // 2
+    if half:
+        nul_even = head[0::2].count(0) / half
+        nul_odd = head[1::2].count(0) / half
+        if nul_odd >= NUL_RATIO_UTF16 and nul_even < NUL_RATIO_UTF16:
+            return "utf-16-le", "utf-16-le", False
+        if nul_even >= NUL_RATIO_UTF16 and nul_odd < NUL_RATIO_UTF16:
+            return "utf-16-be", "utf-16-be", False
+    return None, None, False
+
+
+def decode_bytes(data: bytes, errors: str = "replace") -> DecodedText:
+    """바이트 → 텍스트. 판별된 인코딩으로 전체 버퍼를 1회만 디코딩한다."""
+    enc, codec, bom = detect_encoding(data)
+    if codec is not None:
+        try:
+            return DecodedText(data.decode(codec), enc, bom)
+        except UnicodeDecodeError:
+            pass
+
+    for cand in ("utf-8", "cp949"):
+        try:
+            return DecodedText(data.decode(cand), cand, False)
+        except UnicodeDecodeError:
+            continue
+    return DecodedText(data.decode("utf-8", errors=errors), f"utf-8({errors})", False)
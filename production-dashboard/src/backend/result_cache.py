@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+
+def file_signature(path: Path, parser_version: int) -> tuple[int, int, int]:
+    """(size, mtime_ns, parser_version). 파일이 바뀌거나 파서가 바뀌면 달라진다."""
+    st = path.stat()
+    return (st.st_size, st.st_mtime_ns, parser_version)
+
+
+def make_etag(kind: str, path: Path, signature: tuple[int, int, int]) -> str:
+    raw = f"{kind}|{path}|{signature}".encode("utf-8")
+    return '"' + hashlib.blake2b(raw, digest_size=12).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # 약한 비교: W/ 접두어 무시
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+class ResultCache:
+    """직렬화된 응답 본문 LRU 캐시. (kind, path)당 1개만 두고 signature가 다르면 무효."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._items: OrderedDict[tuple[str, str], tuple[tuple[int, int, int], bytes]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, kind: str, path: Path, signature: tuple[int, int, int]) -> bytes | None:
+        key = (kind, str(path))
+        with self._lock:
+            item = self._items.get(key)
+            if item is None or item[0] != signature:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def put(self, kind: str, path: Path, signature: tuple[int, int, int], body: bytes) -> None:
+        if len(body) > self.max_bytes:
+            return
+        key = (kind, str(path))
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.nbytes -= len(old[1])
+            self._items[key] = (signature, body)
+            self.nbytes += len(body)
+            while self.nbytes > self.max_bytes:
+                _key, (_sig, evicted) = self._items.popitem(last=False)
+                self.nbytes -= len(evicted)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._items), "bytes": self.nbytes, "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,388 @@
+from __future__ import annotations
+
+import bisect
+import logging
+import os
+import stat
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Callable
+
+try:  # 선택 의존성: 없으면 폴링으로 감시
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # pragma: no cover - 설치 환경에 따라 다름
+    FileSystemEventHandler = object  # type: ignore[assignment,misc]
+    Observer = None
+
+logger = logging.getLogger(__name__)
+
+STATUS_WEIGHT = {"SET": 0, "TEST": 1, "PRD": 2}
+
+FULL_RESCAN_EVERY = 15  # 폴링 모드: 디렉토리 변경이 없어도 N회마다 전체 스캔
+_BULK_REBUILD = 256  # 한 번의 스캔에서 이 개수 이상 바뀌면 정렬 목록을 통째로 재구성
+
+# 공정 유형 판별 키워드 (파일명 공정라인 필드 또는 레거시 파일명 전체에서 검색)
+PROCESS_KEYWORDS: tuple[tuple[str, tuple[str, ...]], ...] = (
+    ("printing", ("printing", "프린팅")),
+    ("dispensing", ("dispensing", "분주")),
+    ("row-slitter", ("slitter", "슬리터")),
+    ("electrode-area", ("electrode", "전극면적")),
+    ("assembly-sample", ("assembly", "샘플검사")),
+)
+
+
+@dataclass(frozen=True, slots=True)
+class SampleFile:
+    name: str
+    process: str | None
+    date: str | None
+    process_line: str | None
+    lot: str | None
+    status: str | None
+    sheet_order: int | None
+    memo: str | None
+    size: int
+    mtime_ns: int
+    order_key: tuple
+
+    def to_dict(self) -> dict:
+        return {
+            "file": self.name,
+            "process": self.process,
+            "date": self.date,
+            "processLine": self.process_line,
+            "lot": self.lot,
+            "status": self.status,
+            "sheetOrder": self.sheet_order,
+            "memo": self.memo,
+            "size": self.size,
+            "mtime": self.mtime_ns / 1e9,
+        }
+
+
+def _process_type(text: str) -> str | None:
+    lowered = text.lower()
+    for process, keywords in PROCESS_KEYWORDS:
+        if any(k in lowered for k in keywords):
+            return process
+    return None
+
+
+def filename_order_key(name: str, mtime: float) -> tuple:
+    """신규 규칙 우선 정렬 + 레거시 파일 fallback (레거시는 mtime 최신순)."""
+    parts = Path(name).stem.split("_")
+    # {date}_{processLine}_{lot}_{status}_{sheetOrder}_{memo?}.csv
+    if len(parts) >= 5 and parts[0].isdigit() and len(parts[0]) == 6 and parts[4].isdigit():
+        return (2, parts[0], STATUS_WEIGHT.get(parts[3], -1), int(parts[4]), name)
+    return (1, datetime.fromtimestamp(mtime).isoformat(), 0, 0, name)
+
+
+def describe_file(name: str, st: os.stat_result) -> SampleFile:
+    parts = Path(name).stem.split("_")
+    order_key = filename_order_key(name, st.st_mtime)
+    if order_key[0] == 2:
+        return SampleFile(
+            name=name,
+            process=_process_type(parts[1]),
+            date=parts[0],
+            process_line=parts[1],
+            lot=parts[2],
+            status=parts[3],
+            sheet_order=int(parts[4]),
+            memo="_".join(parts[5:]) or None,
+            size=st.st_size,
+            mtime_ns=st.st_mtime_ns,
+            order_key=order_key,
+        )
+    return SampleFile(
+        name=name,
+        process=_process_type(name),
+        date=None,
+        process_line=None,
+        lot=None,
+        status=None,
+        sheet_order=None,
+        memo=None,
+        size=st.st_size,
+        mtime_ns=st.st_mtime_ns,
+        order_key=order_key,
+    )
+
+
+@dataclass(frozen=True)
+class LatestRule:
+    match: Callable[[str], bool]
+    sort_key: Callable[[SampleFile], tuple]
+
+
+# "최신" 선택 규칙 — 기존 엔드포인트의 glob/정렬 기준과 동일
+LATEST_RULES: dict[str, LatestRule] = {
+    "printing": LatestRule(
+        match=lambda name: "printing" in name.lower() or "프린팅" in name,
+        sort_key=lambda f: f.order_key,
+    ),
+    "dispensing": LatestRule(
+        match=lambda name: fnmatch(name, "*dispensing*.csv"),
+        sort_key=lambda f: (f.name,),
+    ),
+}
+
+
+class SampleIndex:
+    """SAMPLES_DIR의 CSV 메모리 인덱스. 조회는 디스크 접근 없이 인덱스에서만 답한다."""
+
+    def __init__(self, directory: Path, pattern: str = "*.csv") -> None:
+        self.directory = directory
+        self.pattern = pattern
+        self.exists = False
+        self._files: dict[str, SampleFile] = {}
+        # 규칙별 (정렬키, 파일명) 오름차순 목록 → 마지막 원소가 최신
+        self._latest: dict[str, list[tuple]] = {group: [] for group in LATEST_RULES}
+        self._by_process: dict[str | None, set[str]] = {}
+        # 전체 파일 정렬키 오름차순 (정렬키 마지막 원소 = 파일명) → newer_than()에서 bisect
+        self._ordered: list[tuple] = []
+        # 인덱스가 바뀔 때마다 증가 — 호출측은 값이 같으면 다시 조회하지 않아도 됨
+        self.version = 0
+        self._lock = threading.RLock()
+        self._loaded = False
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    def _accepts(self, name: str) -> bool:
+        return fnmatch(name, self.pattern)
+
+    def _insert(self, entry: SampleFile) -> None:
+        self._files[entry.name] = entry
+        self._by_process.setdefault(entry.process, set()).add(entry.name)
+        bisect.insort(self._ordered, entry.order_key)
+        self.version += 1
+        for group, rule in LATEST_RULES.items():
+            if rule.match(entry.name):
+                bisect.insort(self._latest[group], (rule.sort_key(entry), entry.name))
+
+    def _remove(self, name: str) -> SampleFile | None:
+        entry = self._files.pop(name, None)
+        if entry is None:
+            return None
+        self._by_process.get(entry.process, set()).discard(name)
+        i = bisect.bisect_left(self._ordered, entry.order_key)
+        if i < len(self._ordered) and self._ordered[i] == entry.order_key:
+            del self._ordered[i]
+        self.version += 1
+        for group, rule in LATEST_RULES.items():
+            if rule.match(name):
+                keys = self._latest[group]
+                item = (rule.sort_key(entry), name)
+                i = bisect.bisect_left(keys, item)
+                if i < len(keys) and keys[i] == item:
+                    del keys[i]
+        return entry
+
+    # ------------------------------------------------------------------
+    # 갱신 (감시 이벤트/폴링에서 호출)
+    # ------------------------------------------------------------------
+    def upsert(self, path: Path) -> None:
+        name = path.name
+        if path.parent != self.directory or not self._accepts(name):
+            return
+        try:
+            st = path.stat()
+        except OSError:
+            self.discard(path)
+            return
+        if not stat.S_ISREG(st.st_mode):
+            return
+        with self._lock:
+            old = self._files.get(name)
+            if old is not None and (old.size, old.mtime_ns) == (st.st_size, st.st_mtime_ns):
+                return
+            self._remove(name)
+            self._insert(describe_file(name, st))
+
+    def discard(self, path: Path) -> None:
+        if path.parent != self.directory:
+            return
+        with self._lock:
+            self._remove(path.name)
+
+    def rescan(self) -> None:
+        """디렉토리 전체 스캔 후 차이(생성/수정/삭제)만 반영."""
+        seen: dict[str, os.stat_result] = {}
+        exists = self.directory.is_dir()
+        if exists:
+            try:
+                with os.scandir(self.directory) as it:
+                    for de in it:
+                        if self._accepts(de.name) and de.is_file():
+                            try:
+                                seen[de.name] = de.stat()
+                            except OSError:
+                                continue
+            except OSError:
+                exists = False
+
+        with self._lock:
+            self.exists = exists
+            removed = [n for n in self._files if n not in seen]
+            changed = {
+                name: st
+                for name, st in seen.items()
+                if (old := self._files.get(name)) is None or (old.size, old.mtime_ns) != (st.st_size, st.st_mtime_ns)
+            }
+            if len(removed) + len(changed) > _BULK_REBUILD:
+                # 최초 로딩 등 대량 변경: insort 반복 대신 한 번에 재정렬
+                for name in removed:
+                    del self._files[name]
+                for name, st in changed.items():
+                    self._files[name] = describe_file(name, st)
+                self._rebuild()
+            else:
+                for name in removed:
+                    self._remove(name)
+                for name, st in changed.items():
+                    self._remove(name)
+                    self._insert(describe_file(name, st))
+            self._loaded = True
+
+    def _rebuild(self) -> None:
+        self.version += 1
+        self._ordered = sorted(f.order_key for f in self._files.values())
+        self._by_process = {}
+        for entry in self._files.values():
+            self._by_process.setdefault(entry.process, set()).add(entry.name)
+        for group, rule in LATEST_RULES.items():
+            self._latest[group] = sorted(
+                (rule.sort_key(f), f.name) for f in self._files.values() if rule.match(f.name)
+            )
+
+    def ensure_loaded(self) -> None:
+        if not self._loaded:
+            self.rescan()
+
+    # ------------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------------
+    def latest(self, group: str) -> SampleFile | None:
+        self.ensure_loaded()
+        with self._lock:
+            keys = self._latest[group]
+            return self._files[keys[-1][1]] if keys else None
+
+    def get(self, name: str) -> SampleFile | None:
+        self.ensure_loaded()
+        return self._files.get(name)
+
+    def newer_than(self, order_key: tuple | None, processes: tuple[str, ...]) -> list[SampleFile]:
+        """정렬키가 order_key보다 뒤인 파일 중 processes 공정만, 정렬키 오름차순 (None = 전체)."""
+        self.ensure_loaded()
+        with self._lock:
+            start = 0 if order_key is None else bisect.bisect_right(self._ordered, order_key)
+            entries = (self._files[key[-1]] for key in self._ordered[start:])
+            return [f for f in entries if f.process in processes]
+
+    def query(
+        self,
+        process: str | None = None,
+        date: str | None = None,
+        lot: str | None = None,
+        status: str | None = None,
+    ) -> list[SampleFile]:
+        """조건에 맞는 파일을 최신순(정렬키 내림차순)으로 반환."""
+        self.ensure_loaded()
+        with self._lock:
+            names = self._by_process.get(process, set()) if process else self._files.keys()
+            entries = [
+                self._files[n]
+                for n in names
+                if (date is None or self._files[n].date == date)
+                and (lot is None or self._files[n].lot == lot)
+                and (status is None or self._files[n].status == status)
+            ]
+        return sorted(entries, key=lambda f: f.order_key, reverse=True)
+
+
+class _IndexEventHandler(FileSystemEventHandler):
+    def __init__(self, index: SampleIndex) -> None:
+        super().__init__()
+        self.index = index
+
+    def on_created(self, event) -> None:
+        if not event.is_directory:
+            self.index.upsert(Path(event.src_path))
+
+    on_modified = on_created
+
+    def on_deleted(self, event) -> None:
+        if not event.is_directory:
+            self.index.discard(Path(event.src_path))
+
+    def on_moved(self, event) -> None:
+        if not event.is_directory:
+            self.index.discard(Path(event.src_path))
+            self.index.upsert(Path(event.dest_path))
+
+
+class SampleWatcher:
+    """watchdog 이벤트로 인덱스를 증분 갱신. watchdog이 없거나 실패하면 폴링 스레드로 대체."""
+
+    def __init__(self, index: SampleIndex, poll_interval: float = 2.0, use_watchdog: bool = True) -> None:
+        self.index = index
+        self.poll_interval = poll_interval
+        self.use_watchdog = use_watchdog
+        self.mode = "stopped"
+        self._observer = None
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        self.index.rescan()
+        if self.use_watchdog and Observer is not None and self.index.exists:
+            try:
+                observer = Observer()
+                observer.schedule(_IndexEventHandler(self.index), str(self.index.directory), recursive=False)
+                observer.start()
+                self._observer = observer
+                self.mode = "watchdog"
+                return
+            except Exception:  # inotify 한도 초과, 네트워크 드라이브 등
+                logger.exception("watchdog 시작 실패 → 폴링으로 전환")
+        if self.poll_interval > 0:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._poll, name="sample-index-poll", daemon=True)
+            self._thread.start()
+            self.mode = "polling"
+
+    def _poll(self) -> None:
+        # 생성/삭제/이름변경은 디렉토리 mtime으로 감지 → 그때만 전체 스캔
+        # 제자리 수정(파일 mtime만 변경)은 FULL_RESCAN_EVERY 주기마다 전체 스캔으로 반영
+        last_dir_mtime: int | None = None
+        polls = 0
+        while not self._stop.wait(self.poll_interval):
+            polls += 1
+            try:
+                dir_mtime = self.index.directory.stat().st_mtime_ns
+            except OSError:
+                dir_mtime = None
+            if dir_mtime == last_dir_mtime and polls % FULL_RESCAN_EVERY:
+                continue
+            try:
+                self.index.rescan()
+                last_dir_mtime = dir_mtime
+            except Exception:
+                logger.exception("샘플 폴더 폴링 실패")
+
+    def stop(self) -> None:
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout=5)
+            self._observer = None
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.mode = "stopped"
@@ -0,0 +1,306 @@
+from __future__ import annotations
+
+import json
+import logging
+import math
+import os
+import threading
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Iterable, Protocol
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_VERSION = 2
+
+WARMUP = 25  # 이 개수까지는 기준(평균/표준편차)만 쌓고 판정하지 않음
+EWMA_LAMBDA = 0.2
+EWMA_L = 3.0
+CUSUM_K = 0.5  # 기준편차(σ) 단위 허용량
+CUSUM_H = 5.0  # 결정구간(σ 단위)
+RECENT = 8  # Western Electric 규칙에 필요한 최근 z 개수
+MAX_ALARMS = 1000
+
+# 규칙 이름 → 설명 (알람 응답에 그대로 사용)
+RULES: dict[str, str] = {
+    "WE1": "1점이 ±3σ 밖",
+    "WE2": "연속 3점 중 2점이 같은 쪽 2σ 밖",
+    "WE3": "연속 5점 중 4점이 같은 쪽 1σ 밖",
+    "WE4": "연속 8점이 중심선 같은 쪽",
+    "EWMA": "EWMA 관리한계 이탈",
+    "CUSUM": "CUSUM 누적합 결정구간 초과",
+}
+
+
+@dataclass
+class Welford:
+    """누적 평균/분산 (1점당 O(1), 전체 이력 재계산 없음)."""
+
+    n: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+
+    def update(self, x: float) -> None:
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else 0.0
+
+
+@dataclass
+class Chart:
+    """채널 1개의 관리도 상태. 기준은 관리 상태(±3σ 이내) 점으로만 갱신한다."""
+
+    base: Welford = field(default_factory=Welford)
+    ewma: float | None = None
+    ewma_n: int = 0
+    cusum_hi: float = 0.0
+    cusum_lo: float = 0.0
+    recent: list[float] = field(default_factory=list)  # 최근 z (최대 RECENT개)
+    active: list[str] = field(default_factory=list)  # 직전 점에서 걸려 있던 규칙 (같은 구간 중복 알람 방지)
+    last: float | None = None
+    count: int = 0
+
+    def update(self, x: float) -> tuple[float | None, list[str]]:
+        """1점 반영 → (z, 새로 걸린 규칙). 기준 확정 전(WARMUP)에는 z=None."""
+        self.count += 1
+        self.last = x
+        base = self.base
+        if base.n < WARMUP or base.std == 0.0:
+            base.update(x)
+            return None, []
+
+        mu, sigma = base.mean, base.std
+        z = (x - mu) / sigma
+        self.recent = (self.recent + [z])[-RECENT:]
+        hits = self._western_electric()
+
+        # EWMA: 시작값 = 기준 평균, 한계폭은 점 수에 따라 점근
+        self.ewma = mu if self.ewma is None else self.ewma
+        self.ewma = EWMA_LAMBDA * x + (1.0 - EWMA_LAMBDA) * self.ewma
+        self.ewma_n += 1
+        width = EWMA_L * sigma * math.sqrt(
+            EWMA_LAMBDA / (2.0 - EWMA_LAMBDA) * (1.0 - (1.0 - EWMA_LAMBDA) ** (2 * self.ewma_n))
+        )
+        if abs(self.ewma - mu) > width:
+            hits.append("EWMA")
+
+        # 표준화 tabular CUSUM (결정구간 초과 시 알람 후 0으로 재시작)
+        self.cusum_hi = max(0.0, self.cusum_hi + z - CUSUM_K)
+        self.cusum_lo = max(0.0, self.cusum_lo - z - CUSUM_K)
+        if self.cusum_hi > CUSUM_H or self.cusum_lo > CUSUM_H:
+            hits.append("CUSUM")
+            self.cusum_hi = self.cusum_lo = 0.0
+
+        if abs(z) <= 3.0:
+            base.update(x)
+
+        new = [r for r in hits if r not in self.active or r == "CUSUM"]
+        self.active = hits
+        return z, new
+
+    def _western_electric(self) -> list[str]:
+        r = self.recent
+        hits = []
+        if abs(r[-1]) > 3.0:
+            hits.append("WE1")
+        for side in (1.0, -1.0):
+            if len(r) >= 3 and sum(1 for z in r[-3:] if z * side > 2.0) >= 2:
+                hits.append("WE2")
+            if len(r) >= 5 and sum(1 for z in r[-5:] if z * side > 1.0) >= 4:
+                hits.append("WE3")
+            if len(r) >= RECENT and all(z * side > 0.0 for z in r[-RECENT:]):
+                hits.append("WE4")
+        return hits
+
+    def summary(self) -> dict:
+        ready = self.base.n >= WARMUP and self.base.std > 0.0
+        return {
+            "count": self.count,
+            "baselineCount": self.base.n,
+            "ready": ready,
+            "mean": round(self.base.mean, 6),
+            "std": round(self.base.std, 6),
+            "ewma": round(self.ewma, 6) if self.ewma is not None else None,
+            "cusumHi": round(self.cusum_hi, 4),
+            "cusumLo": round(self.cusum_lo, 4),
+            "last": self.last,
+            "activeRules": list(self.active),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> Chart:
+        return cls(**{**data, "base": Welford(**data["base"])})
+
+
+# (채널, 값, 위치 라벨) — 위치 라벨은 알람에 그대로 표시 (예: "row 3", "set 12")
+Measurement = tuple[str, float, str]
+
+
+class SpcFile(Protocol):
+    """sync 대상 파일 (sample_index.SampleFile). order_key 오름차순 = 시간 순."""
+
+    @property
+    def name(self) -> str: ...
+
+    @property
+    def size(self) -> int: ...
+
+    @property
+    def mtime_ns(self) -> int: ...
+
+    @property
+    def order_key(self) -> tuple: ...
+
+
+class SpcMonitor:
+    """
+    파일 단위로 측정값을 받아 채널별 관리도를 O(1)씩 갱신.
+    마지막으로 처리한 파일의 정렬키(워터마크)와 관리도 상태는 체크포인트(JSON)에 남겨 재시작 후 이어서 판정한다.
+    체크포인트 크기는 채널/알람/실패 파일 수에만 비례 (처리한 파일 이력은 남기지 않음).
+    """
+
+    def __init__(self, checkpoint: Path | None) -> None:
+        self.checkpoint = checkpoint
+        self.charts: dict[str, Chart] = {}
+        # 처리한(성공/실패) 마지막 파일의 정렬키 — 이보다 뒤의 파일만 새 파일
+        self.watermark: tuple | None = None
+        # 추출 실패 파일 → 실패 당시 (size, mtime_ns). 파일이 바뀌면(기록 중이던 파일 완료 등) 다시 시도
+        self.failed: dict[str, tuple[int, int]] = {}
+        # 마지막 sync 때의 파일 목록 버전 (재시작 후 첫 sync는 항상 조회)
+        self.synced_version: int | None = None
+        self.alarms: deque[dict] = deque(maxlen=MAX_ALARMS)
+        self.seq = 0
+        self._lock = threading.Lock()
+        self._load()
+
+    # ------------------------------------------------------------------
+    # 체크포인트
+    # ------------------------------------------------------------------
+    def _load(self) -> None:
+        if self.checkpoint is None or not self.checkpoint.exists():
+            return
+        try:
+            data = json.loads(self.checkpoint.read_text(encoding="utf-8"))
+            if data.get("version") != CHECKPOINT_VERSION:
+                return
+            self.charts = {name: Chart.from_dict(c) for name, c in data["charts"].items()}
+            self.watermark = tuple(data["watermark"]) if data["watermark"] is not None else None
+            self.failed = {name: (int(size), int(mtime_ns)) for name, size, mtime_ns in data.get("failed", [])}
+            self.alarms.extend(data["alarms"])
+            self.seq = int(data["seq"])
+        except (OSError, ValueError, KeyError, TypeError):
+            logger.exception("SPC 체크포인트 로딩 실패 → 처음부터 시작")
+            self.charts, self.watermark, self.failed, self.seq = {}, None, {}, 0
+            self.alarms.clear()
+
+    def _save(self) -> None:
+        if self.checkpoint is None:
+            return
+        data = {
+            "version": CHECKPOINT_VERSION,
+            "seq": self.seq,
+            "watermark": self.watermark,
+            "failed": [[name, *sig] for name, sig in sorted(self.failed.items())],
+            "charts": {name: asdict(c) for name, c in self.charts.items()},
+            "alarms": list(self.alarms),
+        }
+        self.checkpoint.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.checkpoint.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, self.checkpoint)
+
+    # ------------------------------------------------------------------
+    # 갱신
+    # ------------------------------------------------------------------
+    def _feed(self, source: str, measurements: Iterable[Measurement]) -> None:
+        for channel, value, where in measurements:
+            chart = self.charts.get(channel)
+            if chart is None:
+                chart = self.charts[channel] = Chart()
+            z, rules = chart.update(float(value))
+            for rule in rules:
+                self.seq += 1
+                self.alarms.append({
+                    "seq": self.seq,
+                    "channel": channel,
+                    "rule": rule,
+                    "description": RULES[rule],
+                    "value": round(float(value), 6),
+                    "z": round(z, 3) if z is not None else None,
+                    "file": source,
+                    "where": where,
+                })
+
+    def sync(
+        self,
+        newer: Callable[[tuple | None], Iterable[SpcFile]],
+        lookup: Callable[[str], SpcFile | None],
+        extract: Callable[[SpcFile], Iterable[Measurement]],
+        version: int | None = None,
+    ) -> int:
+        """
+        워터마크 이후 파일(newer(워터마크), 정렬키 오름차순)만 반영. 반환: 새로 처리한 파일 수.
+        - version: 파일 목록 버전 (SampleIndex.version). 지난 sync와 같으면 목록 조회 없이 바로 끝
+        - extract가 실패한 파일(아직 기록 중인 파일 등)은 (size, mtime_ns)를 기억해 두고,
+          lookup(name)의 크기/수정시각이 바뀌면 다시 시도 (목록에서 사라지면 잊음)
+        """
+        with self._lock:
+            if version is not None and version == self.synced_version:
+                return 0
+            todo = list(newer(self.watermark))
+            names = {f.name for f in todo}
+            changed = False
+            for name, sig in list(self.failed.items()):
+                entry = lookup(name)
+                if entry is None:
+                    del self.failed[name]
+                    changed = True
+                elif (entry.size, entry.mtime_ns) != sig and name not in names:
+                    todo.append(entry)
+
+            done = 0
+            for entry in todo:
+                changed = True
+                if self.watermark is None or entry.order_key > self.watermark:
+                    self.watermark = entry.order_key
+                try:
+                    measurements = list(extract(entry))
+                except Exception:
+                    logger.exception("SPC 측정값 추출 실패 (파일이 바뀌면 재시도): %s", entry.name)
+                    self.failed[entry.name] = (entry.size, entry.mtime_ns)
+                    continue
+                self._feed(entry.name, measurements)
+                self.failed.pop(entry.name, None)
+                done += 1
+            if changed:
+                self._save()
+            self.synced_version = version
+            return done
+
+    def reset(self, channel: str) -> bool:
+        """채널 기준 재설정 (공정 변경 후 새 기준으로 다시 WARMUP)."""
+        with self._lock:
+            if channel not in self.charts:
+                return False
+            self.charts[channel] = Chart()
+            self._save()
+            return True
+
+    # ------------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------------
+    def alarms_since(self, since: int = 0) -> list[dict]:
+        with self._lock:
+            if since >= self.seq:
+                return []
+            return [a for a in self.alarms if a["seq"] > since]
+
+    def chart_summaries(self) -> dict[str, dict]:
+        with self._lock:
+            return {name: c.summary() for name, c in sorted(self.charts.items())}
@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+"""
+# [FILE] bench/__init__.py
+# [PURPOSE] 백엔드 성능 측정 스크립트 모음 (서비스 코드에서 import하지 않음)
+#
+# 실행: 백엔드 폴더(isens_backend_step1)에서 python -m bench.<스크립트명>
+"""
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+"""
+# [FILE] bench/bench_core.py
+# [PURPOSE] core.py 분석 파이프라인 단계별 성능 측정 (합성 CSV 사용)
+#
+# [STAGES]
+# - read_measurement_csv / pivot_row_values / build_step1_detail_summary / simulate_adjustment
+# - score_sheets (Job 전체 시트 1회 호출 = calls 1), simulate_sweep (100x100 printing_x/y 그리드 1회 = calls 1)
+# - parse_tabular_like / extract_printing_calc / compute_slitter_punch (입력은 extract_slitter_items 결과)
+#
+# [OUTPUT]
+# - 콘솔 표: 단계별 호출 수, 총 시간, 호출당 ms, 최대 메모리(tracemalloc peak, 결과 보관 상태)
+# - JSON 저장(--out): 커밋/환경 정보 + 단계별 수치 → --compare 로 이전 결과와 비교
+#
+# [NOTE]
+# - 시간은 tracemalloc 없이 별도 패스로 측정 (tracemalloc 오버헤드 제외), best-of --repeat
+# - 입력 준비(합성/디코딩 전 단계 결과)는 측정에서 제외
+#
+# 실행: python -m bench.bench_core --sheets 1000 --out bench/results/core.json [--compare old.json]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import subprocess
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence
+
+import numpy as np
+import pandas as pd
+
+import core
+from bench import synth
+
+# 시뮬레이션 입력: 프린팅 X 보정 + Row별 슬리터 Y 보정
+_SIM_OFFSETS = {
+    "printing_x": 0.02,
+    "printing_y": -0.01,
+    "slitter_y": [0.01] * 12,
+    "assembly_x": [0.0] * 12,
+    "assembly_y": [-0.005] * 12,
+}
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, cwd=Path(__file__).parent, timeout=5,
+        )
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _run_stage(fn: Callable, inputs: Sequence, repeat: int, mem_calls: int) -> Dict:
+    """
+    inputs 각각에 fn 적용. 시간(best-of repeat)과 peak 메모리를 따로 측정.
+    메모리는 앞 mem_calls개 입력만, 결과를 보관한 상태의 peak (tracemalloc은 수 배 느림)
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for x in inputs:
+            fn(x)
+        best = min(best, time.perf_counter() - t0)
+
+    tracemalloc.start()
+    kept = [fn(x) for x in inputs[:mem_calls]]
+    _cur, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+
+    n = len(inputs)
+    return {
+        "calls": n,
+        "total_s": round(best, 6),
+        "per_call_ms": round(best / n * 1000.0, 4) if n else None,
+        "peak_mb": round(peak / 1024 / 1024, 3),
+        "mem_calls": min(n, mem_calls),
+    }
+
+
+def run(n_sheets: int, n_process: int, seed: int, repeat: int, mem_calls: int) -> Dict:
+    sheets = [raw for _name, raw in synth.generate_sheets(n_sheets, seed)]
+    printing, slitter = synth.generate_process_files(n_process, seed)
+
+    # 각 단계 입력은 이전 단계 결과를 미리 만들어 둔다 (단계별 비용만 측정)
+    long_dfs = [core.read_measurement_csv(b) for b in sheets]
+    row_dfs = [core.pivot_row_values(d) for d in long_dfs]
+    printing_long = [core.parse_tabular_like(b) for b in printing]
+    slitter_items = [core.extract_slitter_items(core.parse_tabular_like(b)) for b in slitter]
+
+    stages: Dict[str, Dict] = {}
+    stages["read_measurement_csv"] = _run_stage(core.read_measurement_csv, sheets, repeat, mem_calls)
+    stages["pivot_row_values"] = _run_stage(core.pivot_row_values, long_dfs, repeat, mem_calls)
+    stages["build_step1_detail_summary"] = _run_stage(
+        lambda df: core.build_step1_detail_summary(df, th=None), row_dfs, repeat, mem_calls)
+    stages["score_sheets"] = _run_stage(lambda dfs: core.score_sheets(dfs, th=None), [row_dfs], repeat, 1)
+    stages["simulate_adjustment"] = _run_stage(
+        lambda df: core.simulate_adjustment(df, _SIM_OFFSETS, th=None), row_dfs, repeat, mem_calls)
+    grid = np.linspace(-0.1, 0.1, 100)
+    gx, gy = (a.ravel() for a in np.meshgrid(grid, grid))
+    rows = np.zeros((gx.size, 12))
+    stages["simulate_sweep"] = _run_stage(
+        lambda df: core.simulate_sweep(df, gx, gy, rows, rows, rows, th=None), row_dfs[:1], repeat, 1)
+    stages["parse_tabular_like"] = _run_stage(core.parse_tabular_like, printing + slitter, repeat, mem_calls)
+    stages["extract_printing_calc"] = _run_stage(core.extract_printing_calc, printing_long, repeat, mem_calls)
+    stages["compute_slitter_punch"] = _run_stage(core.compute_slitter_punch, slitter_items, repeat, mem_calls)
+
+    def _sheet_end_to_end(raw: bytes) -> None:
+        df = core.pivot_row_values(core.read_measurement_csv(raw))
+        core.build_step1_detail_summary(df, th=None)
+
+    stages["sheet_end_to_end"] = _run_stage(_sheet_end_to_end, sheets, 1, mem_calls)
+
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "parser_version": core.PARSER_VERSION,
+            "sheets": n_sheets,
+            "process_files": n_process,
+            "seed": seed,
+            "repeat": repeat,
+            "mem_calls": mem_calls,
+        },
+        "stages": stages,
+    }
+
+
+def _print_table(result: Dict, baseline: Dict | None = None) -> None:
+    base_stages = (baseline or {}).get("stages", {})
+    head = f"{'stage':<28} {'calls':>6} {'total[s]':>9} {'ms/call':>9} {'peak[MB]':>9}"
+    if baseline:
+        head += f" {'speedup':>8}"  # 호출당 시간 기준 (base / 현재)
+    print(head)
+    for name, s in result["stages"].items():
+        line = f"{name:<28} {s['calls']:>6} {s['total_s']:>9.3f} {s['per_call_ms']:>9.3f} {s['peak_mb']:>9.2f}"
+        b = base_stages.get(name)
+        if b and b.get("per_call_ms") and s["per_call_ms"]:
+            line += f" {b['per_call_ms'] / s['per_call_ms']:>7.2f}x"
+        print(line)
+
+
+def main(argv: List[str] | None = None) -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sheets", type=int, default=1000, help="조립시트 CSV 수")
+    ap.add_argument("--process-files", type=int, default=50, help="프린팅/슬리터 CSV 각각의 수")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--repeat", type=int, default=1, help="시간 측정 반복(best-of)")
+    ap.add_argument("--mem-calls", type=int, default=50, help="메모리 측정에 쓸 입력 수")
+    ap.add_argument("--out", type=Path, help="결과 JSON 저장 경로")
+    ap.add_argument("--compare", type=Path, help="비교할 이전 결과 JSON")
+    args = ap.parse_args(argv)
+
+    result = run(args.sheets, args.process_files, args.seed, args.repeat, args.mem_calls)
+    baseline = json.loads(args.compare.read_text(encoding="utf-8")) if args.compare else None
+
+    m = result["meta"]
+    print(f"commit={m['commit']} sheets={m['sheets']} process_files={m['process_files']} "
+          f"python={m['python']} pandas={m['pandas']} numpy={m['numpy']}")
+    if baseline:
+        print(f"baseline commit={baseline['meta'].get('commit')}")
+    _print_table(result, baseline)
+
+    if args.out:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        args.out.write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"saved → {args.out}")
+
+
+if __name__ == "__main__":
+    main()
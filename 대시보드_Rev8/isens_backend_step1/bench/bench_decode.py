@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+# [FILE] bench/bench_decode.py
+# [PURPOSE] 인코딩 판별 디코더(text_encoding) vs 기존 순차 시도 디코딩 비교
+#
+# - 샘플 CSV(production-dashboard/data/samples)를 N개 파일로 복제해 디코딩 시간 측정
+# - 변형: 원본(UTF-16 LE + BOM) / UTF-8(BOM 없음) / CP949
+# - 결과 텍스트 일치 여부도 함께 출력 (UTF-8 BOM 없음은 기존 방식이 UTF-16으로 오판하는 경우가 있음)
+#
+# 실행: python -m bench.bench_decode [--files 3000]
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from text_encoding import decode_bytes
+
+SAMPLES_DIR = Path(__file__).resolve().parents[3] / "production-dashboard" / "data" / "samples"
+
+
+def _legacy_decode(file_bytes: bytes) -> str:
+    """기존 core._decode_bytes (변경 전) 동작 그대로."""
+    for enc in ("utf-16", "utf-16-le", "utf-8-sig", "utf-8", "cp949"):
+        try:
+            return file_bytes.decode(enc)
+        except Exception:
+            continue
+    return file_bytes.decode("utf-8", errors="ignore")
+
+
+def _new_decode(file_bytes: bytes) -> str:
+    return decode_bytes(file_bytes, errors="ignore").text
+
+
+def _load_variants() -> Dict[str, List[bytes]]:
+    paths = sorted(SAMPLES_DIR.glob("*.csv"))
+    if not paths:
+        raise SystemExit(f"샘플 CSV 없음: {SAMPLES_DIR}")
+    raws = [p.read_bytes() for p in paths]
+    texts = [decode_bytes(b).text for b in raws]
+    return {
+        "utf16le_bom": raws,
+        "utf8": [t.encode("utf-8") for t in texts],
+        "cp949": [t.encode("cp949", errors="replace") for t in texts],
+    }
+
+
+def _time(fn: Callable[[bytes], str], blobs: List[bytes], n_files: int) -> float:
+    t0 = time.perf_counter()
+    for i in range(n_files):
+        fn(blobs[i % len(blobs)])
+    return time.perf_counter() - t0
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--files", type=int, default=3000, help="복제 파일 수")
+    args = ap.parse_args()
+
+    print(f"samples: {SAMPLES_DIR}  files={args.files}")
+    print(f"{'variant':<12} {'legacy[s]':>10} {'new[s]':>10} {'speedup':>8}  same_text  encoding")
+    for name, blobs in _load_variants().items():
+        same = sum(_legacy_decode(b) == _new_decode(b) for b in blobs)
+        encs = ",".join(sorted({decode_bytes(b).encoding for b in blobs}))
+        t_old = _time(_legacy_decode, blobs, args.files)
+        t_new = _time(_new_decode, blobs, args.files)
+        print(f"{name:<12} {t_old:>10.3f} {t_new:>10.3f} {t_old / t_new:>7.2f}x  {same}/{len(blobs)}  {encs}")
+
+
+if __name__ == "__main__":
+    main()
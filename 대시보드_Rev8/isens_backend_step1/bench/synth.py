@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+# [FILE] bench/synth.py
+# [PURPOSE] 벤치마크용 합성 계측 CSV 생성기 (장비 출력 형식 그대로: UTF-16 LE + BOM, 탭 구분, :BEGIN~:END)
+#
+# [OUTPUT]
+# - 조립시트(샘플검사) : 계산기 양면 / 거리 양면상하 / 타원 타발홀 12행 + 좌표(숫자만 있는 줄)
+# - 프린팅            : 계산기 타발기준/카본기준 4포인트 + 거리/각도 항목
+# - 슬리터            : 거리 전체폭/타발폭 좌/중/우, 6개 Row 샘플링
+#
+# [NOTE]
+# - 항목명 변형(좌/좌측, 중/센터, '_' 중복 "타발홀__좌측")을 섞어 실데이터 파서 분기를 모두 태운다
+# - 편차는 정규분포 + 일부 시트에 쏠림(bias)/기울기(tilt)/결측 주입 → OK/CHECK/NG가 고르게 나오도록
+# - 같은 seed면 같은 바이트가 나온다 (커밋 간 비교용)
+#
+# 실행: python -m bench.synth --out ./synth_csv --sheets 1000
+"""
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+ROWS = range(1, 13)
+
+
+def _fmt(v: Optional[float]) -> str:
+    return "" if v is None else f"{v:.4f}"
+
+
+def _item(label: str, actual: float, target: float, tol: Optional[float], calc: float, extra: str = "") -> str:
+    """장비 출력 1줄: "라벨"\t실측\t기준\t공차+\t공차-\t편차\t(추가)"""
+    t = _fmt(tol)
+    return f'"{label}"\t{_fmt(actual)}\t{_fmt(target)}\t{t}\t{t}\t{_fmt(calc)}\t{extra}'
+
+
+def _encode(lines: List[str]) -> bytes:
+    return ("\r\n".join([":BEGIN", *lines, ":END"]) + "\r\n").encode("utf-16")
+
+
+def _pick(rng: np.random.Generator, *choices: str) -> str:
+    return choices[int(rng.integers(len(choices)))]
+
+
+def _sheet_profile(rng: np.random.Generator) -> Tuple[float, float, float]:
+    """시트 단위 (X 쏠림, Y 쏠림, Row 기울기). 약 1/4 시트는 큰 쏠림."""
+    big = rng.random() < 0.25
+    bx = rng.normal(0, 0.06 if big else 0.02)
+    by = rng.normal(0, 0.06 if big else 0.02)
+    tilt = rng.normal(0, 0.004)
+    return bx, by, tilt
+
+
+def make_assembly_csv(rng: np.random.Generator, missing_rate: float = 0.01) -> bytes:
+    """조립시트(샘플검사) CSV 1개."""
+    bx, by, tilt = _sheet_profile(rng)
+    lines: List[str] = []
+
+    # 타원 타발홀 단축/면적 — 일부 Row는 "타발홀__좌측" 형태
+    for side in ("좌측", "우측"):
+        for r in ROWS:
+            if rng.random() < missing_rate:
+                continue
+            sep = "__" if rng.random() < 0.1 else "_"
+            dev = rng.normal(-0.06, 0.02)
+            lines.append(_item(f"타원 타발홀{sep}{side}_{r}: 단축", 4.0074 + dev, 4.0074, 0.1, dev))
+            area = rng.normal(-0.25, 0.04)
+            lines.append(_item(f"타원 타발홀{sep}{side}_{r}: 면적", 12.5656 + area, 12.5656, None, area))
+
+    # 계산기 양면 (조립 X) — 좌/좌측 표기 혼용, Row 사이 좌표값 줄
+    y0 = 163.9
+    for side, sign in (("좌", -1.0), ("우", 1.0)):
+        label_side = _pick(rng, side, side + "측")
+        for r in ROWS:
+            y = y0 - (r - 1) * 31.5
+            x = 0.55 if sign < 0 else 295.4
+            lines += [f"{x + rng.normal(0, 0.01):.4f}", f"{y + rng.normal(0, 0.05):.4f}"]
+            if rng.random() < missing_rate:
+                continue
+            dev = bx + sign * 0.01 + tilt * (r - 6.5) + rng.normal(0, 0.015)
+            lines.append(_item(f"계산기 양면_{label_side}_{r}: 숫자", 0.5 + dev, 0.5, 0.1, dev))
+
+    # 거리 양면상하 (조립 Y) — 중앙은 "중"/"센터" 혼용, 가끔 7번째 컬럼 추가값
+    center = _pick(rng, "중", "센터")
+    for r in ROWS:
+        for pos in ("좌", center, "우"):
+            if rng.random() < missing_rate:
+                continue
+            dev = by + tilt * (r - 6.5) + rng.normal(0, 0.015)
+            extra = f"{rng.normal(0, 0.01):.4f}" if pos == center and rng.random() < 0.5 else ""
+            lines.append(_item(f"거리 양면상하_{pos}_{r}: 거리 Y", 28.24 + dev, 28.24, 0.1, dev, extra))
+
+    return _encode(lines)
+
+
+def make_printing_csv(rng: np.random.Generator) -> bytes:
+    """프린팅 CSV 1개 (4포인트 계산기 + 거리/각도)."""
+    lines = [f"{v:.4f}" for v in (64.091, 385.2858, 0.4325, -320.0541, 295.0577, -319.6566)]
+    for ref, layer in (("타발기준", "카본"), ("타발기준", "절연"), ("카본기준", "절연")):
+        for axis in ("좌우", "상하"):
+            base = rng.normal(0, 0.04)
+            for pt in (1, 2, 3, 4):
+                v = base + rng.normal(0, 0.01)
+                # 계산기 항목은 편차 컬럼이 0, 실측=기준 (parse_tabular_like가 actual로 대체)
+                lines.append(f'"계산기 {ref}_{layer}{axis}_{pt}: 숫자"\t{v:.4f}\t{v:.4f}\t\t\t0\t')
+    for name in ("타발", "카본", "절연"):
+        for side, pt, axis, target in (("좌측", 1, "Y", 320.0), ("하측", 2, "X", 294.6),
+                                       ("우측", 3, "Y", 320.0), ("상측", 4, "X", 294.6)):
+            dev = rng.normal(0.04, 0.03)
+            lines.append(_item(f"거리 {name}_{side}_{pt}: 거리 {axis}", target + dev, target, 0.15, dev))
+    for name in ("타발각도", "카본각도", "절연각도"):
+        dev = rng.normal(0, 0.005)
+        lines.append(_item(f"각도 {name}: 각도", 90.0 + dev, 90.0, 1.0, dev))
+    return _encode(lines)
+
+
+def make_slitter_csv(rng: np.random.Generator, rows: Tuple[int, ...] = (1, 6, 7, 12)) -> bytes:
+    """로우 슬리터 CSV 1개 (전체폭/타발폭 × 좌/중/우)."""
+    lines: List[str] = []
+    total_bias = rng.normal(0.08, 0.02)
+    punch_bias = rng.normal(0.07, 0.03)
+    for r in rows:
+        for kind, target, bias in (("전체폭", 26.0, total_bias), ("타발폭", 11.54, punch_bias)):
+            for pos in ("우", "중", "좌"):
+                dev = bias + rng.normal(0, 0.015)
+                lines.append(_item(f"거리 {kind}_{pos}_{r}: 거리 Y", target + dev, target, 0.1, dev))
+    return _encode(lines)
+
+
+def sheet_filename(i: int, lots: int = 5) -> str:
+    """파일명 규칙(일자_라인명_로트명_상태_시트넘버.csv)에 맞는 이름."""
+    status = ("SET", "TEST", "PRD")[i % 3]
+    return f"0123_A_LOT{i % lots:02d}_{status}_{i // 3 + 1}.csv"
+
+
+def generate_sheets(n_sheets: int, seed: int = 0) -> List[Tuple[str, bytes]]:
+    """(파일명, 조립시트 CSV 바이트) n개."""
+    rng = np.random.default_rng(seed)
+    return [(sheet_filename(i), make_assembly_csv(rng)) for i in range(n_sheets)]
+
+
+def generate_process_files(n_files: int, seed: int = 0) -> Tuple[List[bytes], List[bytes]]:
+    """(프린팅 CSV 목록, 슬리터 CSV 목록)."""
+    rng = np.random.default_rng(seed + 1)
+    return [make_printing_csv(rng) for _ in range(n_files)], [make_slitter_csv(rng) for _ in range(n_files)]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--out", type=Path, required=True, help="출력 폴더")
+    ap.add_argument("--sheets", type=int, default=1000)
+    ap.add_argument("--process-files", type=int, default=10)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    args.out.mkdir(parents=True, exist_ok=True)
+    for name, raw in generate_sheets(args.sheets, args.seed):
+        (args.out / name).write_bytes(raw)
+    printing, slitter = generate_process_files(args.process_files, args.seed)
+    for i, raw in enumerate(printing, 1):
+        (args.out / f"printing_{i:03d}.csv").write_bytes(raw)
+    for i, raw in enumerate(slitter, 1):
+        (args.out / f"slitter_{i:03d}.csv").write_bytes(raw)
+    print(f"{args.sheets} sheets + {args.process_files} printing/slitter files → {args.out}")
+
+
+if __name__ == "__main__":
+    main()
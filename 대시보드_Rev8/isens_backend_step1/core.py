@@ -3,11 +3,18 @@ from __future__ import annotations
 
 import os
 import re
-from typing import Dict, Tuple, List, Optional
+from typing import Dict, Tuple, List, NamedTuple, Optional
 
 import numpy as np
 import pandas as pd
 
+from dispensing_sets import filtered_area_stats, last_by_index, pair_sets
+from label_grammar import DISPENSING, MEASUREMENT, TABULAR
+from text_encoding import decode_bytes
+
+# 파싱/피벗/디테일 결과가 달라지는 변경 시 올린다 (parse_cache 키에 포함 → 이전 캐시 무효화)
+PARSER_VERSION = 2
+
 # -----------------------------------------------------------------------------
 # Filename parser
 # 규칙: 일자_라인명_로트명_상태_시트넘버_메모(옵션).csv
@@ -44,16 +51,12 @@ def parse_filename(name: str) -> Dict:
 
 # -----------------------------------------------------------------------------
 # Measurement CSV parser (실데이터 안정 파서)
-# - 인코딩: UTF-16/UTF-8-sig/CP949 자동 시도
+# - 인코딩: BOM 판별(text_encoding) → UTF-16/UTF-8-sig/CP949
 # - 구분자: 탭(\t) 우선, 없으면 콤마(,), 세미콜론(;) 시도
 # - 항목명: '_' 여러 개 + ':'/'：' 콜론 모두 허용
 # -----------------------------------------------------------------------------
-# 패턴 예시:
-# "거리 양면상하_좌_1: 거리 Y"
-# "타원 타발홀__좌측_2: 단축"
-ITEM_RE = re.compile(
-    r'^\s*"?\s*(?P<test>.+?)_+(?P<pos>좌측|우측|좌|우|중|센터|L|R|C)_+(?P<row>\d+)\s*[:：]\s*(?P<metric>.+?)\s*"?\s*$'
-)
+# 항목명 문법은 label_grammar.MEASUREMENT (예: "거리 양면상하_좌_1: 거리 Y", "타원 타발홀__좌측_2: 단축")
+ITEM_RE = MEASUREMENT.regex
 
 _POS_MAP = {
     "좌측": "좌",
@@ -79,118 +82,148 @@ def _to_f(x) -> float:
         return np.nan
 
 def _decode_bytes(file_bytes: bytes) -> str:
-    for enc in ("utf-16", "utf-16-le", "utf-8-sig", "utf-8", "cp949"):
-        try:
-            return file_bytes.decode(enc)
-        except Exception:
-            continue
-    return file_bytes.decode("utf-8", errors="ignore")
+    return decode_bytes(file_bytes, errors="ignore").text
 
 def read_measurement_csv(file_bytes: bytes) -> pd.DataFrame:
     """
     반환 컬럼:
       - 검사종류, 위치(좌/중/우), Row(int), 측정항목, 계산값(float)
+
+    라인 단위 루프 대신 컬럼 단위(벡터화)로 처리한다.
+    - 구분자 split → 토큰 테이블(expand) 1회
+    - 계산값: 토큰 전체를 숫자 변환 후 오른쪽에서 첫 유효값
+    - 항목명: ITEM_RE를 str.extract로 1회 적용
     """
     text = _decode_bytes(file_bytes)
 
-    lines = []
-    for ln in text.splitlines():
-        t = ln.strip()
-        if not t or t == ":BEGIN":
-            continue
-        lines.append(ln)
+    lines = pd.Series(text.splitlines(), dtype=object)
+    stripped = lines.str.strip()
+    lines = lines[(stripped != "") & (stripped != ":BEGIN")].reset_index(drop=True)
 
     # delimiter guess: prefer tab
-    delim = "\t" if any("\t" in ln for ln in lines[:20]) else ","
-    if delim != "\t" and any(";" in ln for ln in lines[:20]):
+    head = lines.head(20).tolist()
+    delim = "\t" if any("\t" in ln for ln in head) else ","
+    if delim != "\t" and any(";" in ln for ln in head):
         delim = ";"
 
-    out_rows: List[Dict] = []
-    unmatched: List[str] = []
-
-    for ln in lines:
-        parts = [p.strip() for p in ln.split(delim)]
-        if not parts:
-            continue
-
-        item = parts[0].strip().strip('"').strip()
-        if not item:
-            continue
-
-        # 면적 항목 제외(대시보드 지표에서 사용 안 함)
-        if "면적" in item:
-            continue
-
-        # 계산값: 뒤에서부터 숫자 변환 가능한 값 찾기
-        calc = np.nan
-        for token in reversed(parts[1:]):
-            v = _to_f(token)
-            if pd.notna(v):
-                calc = v
-                break
-
-        m = ITEM_RE.match(item)
-        if not m:
-            if len(unmatched) < 50:
-                unmatched.append(item)
-            continue
-
-        d = m.groupdict()
-        test = (d.get("test") or "").strip()
-        pos_raw = (d.get("pos") or "").strip()
-        pos = _POS_MAP.get(pos_raw, pos_raw)
-        row = int(d.get("row"))
-        metric = (d.get("metric") or "").strip()
-
-        out_rows.append(
-            {
-                "검사종류": test,
-                "위치": pos,
-                "Row": row,
-                "측정항목": metric,
-                "계산값": float(calc) if pd.notna(calc) else np.nan,
-            }
-        )
-
-    df = pd.DataFrame(out_rows)
+    if lines.empty:
+        df = pd.DataFrame([])
+        df.attrs["unmatched_items"] = []
+        return df
+
+    tokens = lines.str.split(delim, expand=True, regex=False)
+    item = tokens[0].str.strip().str.strip('"').str.strip()
+
+    # 빈 항목 / 면적 항목 제외(대시보드 지표에서 사용 안 함)
+    keep = (item != "") & ~item.str.contains("면적", regex=False)
+    tokens = tokens[keep]
+    item = item[keep]
+
+    # 계산값: 뒤에서부터 숫자 변환 가능한 값 찾기
+    if tokens.shape[1] > 1:
+        nums = tokens.iloc[:, 1:].apply(
+            lambda c: pd.to_numeric(c.str.strip().str.strip('"').str.strip(), errors="coerce")
+        ).astype(float)
+        calc = nums.ffill(axis=1).iloc[:, -1]
+    else:
+        calc = pd.Series(np.nan, index=item.index)
+
+    m = item.str.extract(ITEM_RE).rename(columns=MEASUREMENT.columns("item"))
+    matched = m["test"].notna()
+    unmatched = item[~matched].head(50).tolist()
+
+    m = m[matched]
+    if m.empty:
+        df = pd.DataFrame([])
+        df.attrs["unmatched_items"] = unmatched
+        return df
+
+    df = pd.DataFrame(
+        {
+            "검사종류": m["test"].str.strip().to_numpy(dtype=object),
+            "위치": m["pos"].str.strip().map(lambda p: _POS_MAP.get(p, p)).to_numpy(dtype=object),
+            "Row": m["row"].astype("int64").to_numpy(),
+            "측정항목": m["metric"].str.strip().to_numpy(dtype=object),
+            "계산값": calc[matched].to_numpy(dtype=float),
+        }
+    )
     # 디버그용(원하면 나중에 화면에 노출 가능)
     df.attrs["unmatched_items"] = unmatched
     return df
 
 # -----------------------------------------------------------------------------
 # Pivot: Row별 주요 지표로 표준화 (Streamlit 로직 기반)
+# - (출력컬럼, 검사종류 키워드, 측정항목 키워드(OR), 위치)
+# - 검사종류/측정항목은 category 코드로 변환 후 카테고리 단위로만 문자열 매칭
 # -----------------------------------------------------------------------------
+ROW_VALUE_COLUMNS = [
+    "조립치우침L", "조립치우침R",
+    "상하치우침L", "상하치우침C", "상하치우침R",
+    "타발홀L", "타발홀R",
+]
+
+_PIVOT_SPECS = (
+    ("조립치우침L", "계산기 양면", ("숫자",), "좌"),
+    ("조립치우침R", "계산기 양면", ("숫자",), "우"),
+    ("상하치우침L", "거리 양면상하", ("거리", "Y"), "좌"),
+    ("상하치우침C", "거리 양면상하", ("거리", "Y"), "중"),
+    ("상하치우침R", "거리 양면상하", ("거리", "Y"), "우"),
+    ("타발홀L", "타원 타발홀", ("단축",), "좌"),
+    ("타발홀R", "타원 타발홀", ("단축",), "우"),
+)
+
+
+def _category_mask(cat: pd.Series, pred) -> np.ndarray:
+    """category 코드 컬럼 → 카테고리별 pred 결과를 행 단위 bool 배열로 브로드캐스트."""
+    hit = np.array([bool(pred(c)) for c in cat.cat.categories] + [False], dtype=bool)
+    return hit[cat.cat.codes.to_numpy()]  # code -1(결측) → 마지막 False
+
+
 def pivot_row_values(long_df: pd.DataFrame) -> pd.DataFrame:
-    df = long_df.copy()
+    df = long_df
     if df.empty:
-        return pd.DataFrame(columns=[
-            "Row","조립치우침L","조립치우침R","상하치우침L","상하치우침C","상하치우침R","타발홀L","타발홀R"
-        ])
+        return pd.DataFrame(columns=["Row"] + ROW_VALUE_COLUMNS)
 
-    def pick(test_name: str, metric_kw: Tuple[str, ...], pos: str) -> pd.Series:
-        sub = df[
-            (df["검사종류"].astype(str).str.contains(test_name, na=False))
-            & (df["측정항목"].apply(lambda x: any(k in str(x) for k in metric_kw)))
-            & (df["위치"] == pos)
-        ]
-        if sub.empty:
-            return pd.Series(dtype=float)
-        # Row별 abs 최대값을 대표값으로 사용
-        g = sub.groupby("Row")["계산값"]
-        return g.apply(lambda s: float(s.loc[s.abs().idxmax()]) if s.notna().any() else np.nan)
-
-    rows = sorted(set(pd.to_numeric(df["Row"], errors="coerce").dropna().astype(int).tolist()))
-    out = pd.DataFrame({"Row": rows}).set_index("Row")
-
-    out["조립치우침L"] = pick("계산기 양면", ("숫자",), "좌")
-    out["조립치우침R"] = pick("계산기 양면", ("숫자",), "우")
-    out["상하치우침L"] = pick("거리 양면상하", ("거리", "Y"), "좌")
-    out["상하치우침C"] = pick("거리 양면상하", ("거리", "Y"), "중")
-    out["상하치우침R"] = pick("거리 양면상하", ("거리", "Y"), "우")
-    out["타발홀L"] = pick("타원 타발홀", ("단축",), "좌")
-    out["타발홀R"] = pick("타원 타발홀", ("단축",), "우")
-
-    return out.reset_index()
+    rows = np.array(
+        sorted(set(pd.to_numeric(df["Row"], errors="coerce").dropna().astype(int).tolist())),
+        dtype="int64",
+    )
+
+    test_cat = df["검사종류"].astype(str).astype("category")
+    metric_cat = df["측정항목"].astype(str).astype("category")
+    pos = df["위치"].to_numpy(dtype=object)
+    row_ids = df["Row"].to_numpy()
+    vals = df["계산값"].to_numpy(dtype=float)
+
+    # 스펙별 선택 인덱스 → (컬럼번호, 원본순서) 배열로 결합
+    col_ids, sel_idx = [], []
+    for j, (_col, test_kw, metric_kw, p) in enumerate(_PIVOT_SPECS):
+        mask = (
+            _category_mask(test_cat, lambda t, kw=test_kw: kw in t)
+            & _category_mask(metric_cat, lambda m, kws=metric_kw: any(k in m for k in kws))
+            & (pos == p)
+        )
+        idx = np.flatnonzero(mask)
+        col_ids.append(np.full(len(idx), j))
+        sel_idx.append(idx)
+    cid = np.concatenate(col_ids)
+    idx = np.concatenate(sel_idx)
+
+    out = np.full((len(rows), len(ROW_VALUE_COLUMNS)), np.nan)
+    if len(idx):
+        r = row_ids[idx]
+        v = vals[idx]
+        # Row별 abs 최대값을 대표값으로 사용 (동률은 먼저 나온 값, 전부 NaN이면 NaN)
+        neg_abs = np.where(np.isnan(v), np.inf, -np.abs(v))
+        order = np.lexsort((idx, neg_abs, r, cid))
+        cid, r, v = cid[order], r[order], v[order]
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = (cid[1:] != cid[:-1]) | (r[1:] != r[:-1])
+        out[np.searchsorted(rows, r[first]), cid[first]] = v[first]
+
+    res = pd.DataFrame(out, columns=ROW_VALUE_COLUMNS)
+    res.insert(0, "Row", rows)
+    return res
 
 # -----------------------------------------------------------------------------
 # Scoring helpers
@@ -381,13 +414,8 @@ def _parse_numbers(s: str) -> List[float]:
 
 
 def _read_text_auto(file_bytes: bytes) -> str:
-    """바이트 → 텍스트 (여러 인코딩 시도)."""
-    for enc in ("utf-16", "utf-16-le", "utf-16-be", "utf-8-sig", "cp949", "utf-8"):
-        try:
-            return file_bytes.decode(enc)
-        except Exception:
-            continue
-    return file_bytes.decode("utf-8", errors="replace")
+    """바이트 → 텍스트 (BOM 판별 후 1회 디코딩)."""
+    return decode_bytes(file_bytes, errors="replace").text
 
 
 def _iter_rows_tabular(txt: str):
@@ -441,42 +469,126 @@ def parse_tabular_like(file_bytes: bytes) -> pd.DataFrame:
     return pd.DataFrame(rows, columns=["item", "actual", "target", "tol1", "tol2", "calc"])
 
 
-def extract_printing_calc(df_long: pd.DataFrame) -> Dict[Tuple, float]:
-    """(ref, layer, axis, point) → e(mm) 추출.
+class TabularItems(NamedTuple):
+    """parse_tabular_like 결과 1회 분류 → 계열별 테이블."""
+    printing_calc: Dict[Tuple, float]   # (ref, layer, axis, point) → e(mm)
+    distances: pd.DataFrame             # [group, side, axis, point, actual, target, dev]
+    slitter_items: pd.DataFrame         # [kind, pos, Row, axis, actual, target, dev]
+
 
-    item 패턴: '계산기 타발기준_카본좌우_1: ...'
+# 문법 필드 → 출력 컬럼
+_DIST_KEYS = {"group": "group", "side": "side", "axis": "axis", "point": "point"}
+_SLIT_KEYS = {"kind": "kind", "pos": "pos", "row": "Row", "axis": "axis"}
+
+
+def _tabular_table(m: pd.DataFrame, df_long: pd.DataFrame, kind: str,
+                   keys: Dict[str, str], int_col: str) -> pd.DataFrame:
+    """분류 결과 중 kind 행만 → [키 컬럼..., actual, target, dev] (없으면 빈 object 테이블).
+
+    keys: 문법 필드 → 출력 컬럼, int_col: 번호 컬럼(int 변환)
     """
-    out: Dict[Tuple, float] = {}
-    for _, r in df_long.iterrows():
-        item = str(r.get("item", ""))
-        m = re.match(r"^계산기\s+(.+?)_(.+?)_(\d+)\s*[：:]", item)
-        if not m:
-            continue
+    columns = list(keys.values()) + ["actual", "target", "dev"]
+    hit = m[kind].notna().to_numpy()
+    if not hit.any():
+        return pd.DataFrame([], columns=columns)
+    g = TABULAR.columns(kind)
+    f = m.loc[hit, list(g)].rename(columns=g)
+    src = df_long.loc[hit]
+    out = pd.DataFrame({col: f[field].to_numpy(dtype=object) for field, col in keys.items()})
+    out[int_col] = out[int_col].astype(int)
+    out["actual"] = src["actual"].to_numpy()
+    out["target"] = src["target"].to_numpy()
+    out["dev"] = src["calc"].to_numpy()
+    return out
 
-        ref = m.group(1).strip()
-        layerdir = m.group(2).strip()
-        pt = int(m.group(3))
 
-        m2 = re.match(r"^(카본|절연)(좌우|상하)$", layerdir)
-        if not m2:
-            continue
+def classify_tabular(df_long: pd.DataFrame) -> TabularItems:
+    """
+    parse_tabular_like() 결과를 TABULAR 문법으로 1회 분류해 세 계열을 함께 추출.
+    - printCalc: '계산기 (타발기준|카본기준)_(카본|절연)(좌우|상하)_{번호}'
+    - distance : '거리 (타발|카본|절연)_{방향}_{번호}: 거리 X|Y'
+    - slitter  : '거리 (전체폭|타발폭)_{위치}_{번호}: 거리 X|Y'
+    """
+    if df_long.empty or "item" not in df_long.columns:
+        df_long = pd.DataFrame([], columns=["item", "actual", "target", "calc"])
+
+    df_long = df_long.reset_index(drop=True)
+    m = df_long["item"].astype(str).str.extract(TABULAR.regex)
+
+    # (1) 프린팅 계산기: calc가 0/NaN이면 actual(목표와 같을 때) → target 순으로 대체
+    calc_map: Dict[Tuple, float] = {}
+    hit = m["printCalc"].notna().to_numpy()
+    if hit.any():
+        g = TABULAR.columns("printCalc")
+        f = m.loc[hit, list(g)].rename(columns=g)
+        src = df_long.loc[hit]
+        calc = pd.to_numeric(src["calc"], errors="coerce").to_numpy(dtype=float)
+        actual = pd.to_numeric(src["actual"], errors="coerce").to_numpy(dtype=float)
+        target = pd.to_numeric(src["target"], errors="coerce").to_numpy(dtype=float)
+
+        with np.errstate(invalid="ignore"):
+            val = calc.copy()
+            empty = np.isnan(val) | (np.abs(val) <= 1e-12)
+            use_actual = empty & ~np.isnan(actual) & (np.isnan(target) | (np.abs(target - actual) <= 1e-12))
+            val[use_actual] = actual[use_actual]
+            empty = np.isnan(val) | (np.abs(val) <= 1e-12)
+            use_target = empty & ~np.isnan(target)
+            val[use_target] = target[use_target]
+
+        axis = np.where(f["dir"].to_numpy() == "좌우", "X", "Y")
+        # 같은 키가 여러 파일에 있으면 마지막 값 (dict 순차 대입)
+        calc_map = dict(zip(
+            zip(f["ref"].str.strip(), f["layer"], axis.tolist(), f["point"].astype(int).tolist()),
+            val.tolist(),
+        ))
+
+    # (2) 거리 항목 / (3) 슬리터 항목
+    distances = _tabular_table(m, df_long, "distance", _DIST_KEYS, "point")
+    slitter = _tabular_table(m, df_long, "slitter", _SLIT_KEYS, "Row")
+    if not slitter.empty:
+        slitter["pos"] = slitter["pos"].map(lambda p: _SLIT_POS_MAP.get(p, p))
+
+    return TabularItems(calc_map, distances, slitter)
 
-        layer = m2.group(1)
-        axis = "X" if m2.group(2) == "좌우" else "Y"
 
-        calc_f = _to_f(r.get("calc"))
-        actual_f = _to_f(r.get("actual"))
-        target_f = _to_f(r.get("target"))
+def extract_printing_calc(df_long: pd.DataFrame) -> Dict[Tuple, float]:
+    """(ref, layer, axis, point) → e(mm) 추출. item 패턴: '계산기 타발기준_카본좌우_1: ...'"""
+    return classify_tabular(df_long).printing_calc
 
-        val = calc_f
-        if (pd.isna(val) or abs(val) <= 1e-12) and pd.notna(actual_f):
-            if pd.isna(target_f) or abs(target_f - actual_f) <= 1e-12:
-                val = actual_f
-        if (pd.isna(val) or abs(val) <= 1e-12) and pd.notna(target_f):
-            val = target_f
 
-        out[(ref, layer, axis, pt)] = val
-    return out
+def printing_max_deviation(calc_map: Dict[Tuple, float]) -> Tuple[float, Dict[int, float]]:
+    """
+    프린팅 maxDeviation — 타발기준 카본 좌우/상하 |값| 최대 (production-dashboard printing_parser와 같은 정의).
+    반환: (전체 최대, {포인트: 최대}), 값 없으면 (NaN, {})
+    """
+    per_pt: Dict[int, float] = {}
+    for (ref, layer, _axis, pt), val in calc_map.items():
+        if ref == "타발기준" and layer == "카본" and pd.notna(val):
+            per_pt[pt] = max(per_pt.get(pt, 0.0), abs(float(val)))
+    return (max(per_pt.values()) if per_pt else np.nan), per_pt
+
+
+def dispensing_area_cv(df_long: pd.DataFrame) -> float:
+    """
+    분주 CSV(parse_tabular_like 결과) → 이상치 제외 분주면적 CV(%)
+    (production-dashboard dispensing_parser의 stats.areaFiltered.cv 와 같은 정의, 소수 2자리).
+    - 세트 구성/통계는 dispensing_sets (production 파서와 같은 코드)
+    - 세트를 만들 수 없으면 NaN, 이상치를 빼고 남는 값이 없으면 0.0
+    """
+    if df_long.empty or "item" not in df_long.columns:
+        return np.nan
+    m = df_long["item"].astype(str).str.strip().str.strip('"').str.extract(DISPENSING.regex)
+    hit = m["area"].notna().to_numpy() & df_long["actual"].notna().to_numpy()
+    if not hit.any():
+        return np.nan
+    indices, values = last_by_index(
+        m.loc[hit, "area__index"].astype("int64").to_numpy(),
+        df_long.loc[hit, "actual"].astype(float).to_numpy(),
+    )
+    if indices.size // 2 == 0:
+        return np.nan
+    _, pairs = pair_sets(indices, values)
+    return filtered_area_stats(pairs)["cv"]
 
 
 def _worst_of_points(points: Tuple[int, ...], pvals: Dict[int, float]) -> float:
@@ -602,85 +714,134 @@ def compute_printing_layer(calc_map: Dict[Tuple, float], layer: str,
 
 def extract_slitter_items(df_long: pd.DataFrame) -> pd.DataFrame:
     """슬리터 CSV에서 거리 항목 추출."""
+    return classify_tabular(df_long).slitter_items
+
+
+# ─── 슬리터 배치 커널: 파일 N개 × 위치(좌/중/우) × Row 12를 한 번에 ───
+
+_SLIT_POSITIONS = ("좌", "중", "우")
+_SLIT_ROWS = np.arange(1, 13, dtype=float)
+
+
+def _interp_rows(xp: np.ndarray, fp: np.ndarray, n: np.ndarray, x: np.ndarray) -> np.ndarray:
+    """
+    시리즈 M개의 np.interp를 한 번에 (np.interp와 같은 산식 → 결과 동일).
+    xp/fp: (M, K) Row 오름차순, 시리즈별 유효 개수 n (나머지 칸 xp=inf) / x: (R,) → (M, R)
+    - 유효 0개 → NaN, 1개 → 그 값, 범위 밖 → 양 끝 값
+    """
+    m, k = xp.shape
+    if k == 0:
+        return np.full((m, len(x)), np.nan)
+    # j = x 이하인 마지막 xp 인덱스 (-1 = 왼쪽 범위 밖)
+    j = (xp[:, None, :] <= x[None, :, None]).sum(axis=2) - 1
+    last = np.maximum(n - 1, 0)[:, None]
+    lo = np.clip(j, 0, k - 1)
+    hi = np.minimum(lo + 1, k - 1)
+    x0 = np.take_along_axis(xp, lo, axis=1)
+    x1 = np.take_along_axis(xp, hi, axis=1)
+    y0 = np.take_along_axis(fp, lo, axis=1)
+    y1 = np.take_along_axis(fp, hi, axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        slope = (y1 - y0) / (x1 - x0)
+        out = slope * (x[None, :] - x0) + y0
+    out = np.where(x0 == x[None, :], y0, out)
+    out = np.where(j >= last, np.take_along_axis(fp, np.broadcast_to(last, j.shape), axis=1), out)
+    out = np.where(j < 0, fp[:, :1], out)
+    return np.where((n > 0)[:, None], out, np.nan)
+
+
+def _slitter_grid(items_list: List[pd.DataFrame], kind: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    파일별 slitter_items → ((N, 3, 12) Row 보간 dev, (N,) kind/Y 항목 유무).
+    위치·Row별 첫 행 사용, 측정 Row 사이는 선형 보간 / 범위 밖은 끝 값.
+    """
+    n_files = len(items_list)
+    lengths = [len(df) for df in items_list]
+    vals = np.full((n_files, len(_SLIT_POSITIONS), len(_SLIT_ROWS)), np.nan)
+    present = np.zeros(n_files, dtype=bool)
+    if not any(lengths):
+        return vals, present
+
+    allv = pd.concat([df for df in items_list if len(df)], ignore_index=True)
+    file_idx = np.repeat(np.arange(n_files), lengths)
+    sel = ((allv["kind"] == kind) & (allv["axis"] == "Y")).to_numpy()
+    present[file_idx[sel]] = True
+
+    # 시리즈 번호 = 파일 × 3 + 위치 (좌/중/우 외 위치는 제외)
+    pos = allv.loc[sel, "pos"].map({p: i for i, p in enumerate(_SLIT_POSITIONS)}).to_numpy(dtype=float)
+    known = ~np.isnan(pos)
+    sub = pd.DataFrame({
+        "s": (file_idx[sel] * len(_SLIT_POSITIONS))[known] + pos[known].astype(int),
+        "r": allv.loc[sel, "Row"].to_numpy(dtype=float)[known],
+        "v": allv.loc[sel, "dev"].to_numpy(dtype=float)[known],
+    })
+    sub = sub.drop_duplicates(["s", "r"], keep="first")    # 같은 Row는 첫 행
+    sub = sub[np.isfinite(sub["r"]) & np.isfinite(sub["v"])].sort_values(["s", "r"])
+
+    n_series = n_files * len(_SLIT_POSITIONS)
+    series = sub["s"].to_numpy()
+    counts = np.bincount(series, minlength=n_series)
+    k = int(counts.max()) if len(series) else 0
+    xp = np.full((n_series, k), np.inf)
+    fp = np.full((n_series, k), np.nan)
+    rank = np.arange(len(series)) - np.repeat(np.cumsum(counts) - counts, counts)
+    xp[series, rank] = sub["r"].to_numpy()
+    fp[series, rank] = sub["v"].to_numpy()
+
+    vals = _interp_rows(xp, fp, counts, _SLIT_ROWS).reshape(vals.shape)
+    return vals, present
+
+
+def _round_or_none(v: float, ndigits: int) -> Optional[float]:
+    return round(v, ndigits) if not np.isnan(v) else None
+
+
+def compute_slitter_punch_batch(items_list: List[pd.DataFrame],
+                                limit: float = LIMIT_SLIT, watch: float = WATCH_SLIT,
+                                th_dir: float = TH_DIR) -> List[List[Dict]]:
+    """슬리터 타발폭 Y축 12행 마진 — 파일별 slitter_items 목록 → 파일별 결과 (타발폭 항목 없는 파일은 [])."""
+    vals, present = _slitter_grid(items_list, "타발폭")
+
+    # worst 위치: |dev| 최대 (같으면 좌 → 중 → 우), 값이 하나도 없으면 "-"
+    worst = np.where(np.isnan(vals), -1.0, np.abs(vals)).argmax(axis=1)
+    best = np.take_along_axis(vals, worst[:, None, :], axis=1)[:, 0, :]
+    has = ~np.isnan(best)
+    with np.errstate(invalid="ignore"):
+        mag = np.abs(best)
+        move = limit - mag
+        move = np.where(has, np.where(move > 0.0, move, 0.0), np.nan)
+        rate = move / limit * 100.0
+        direction = np.select([~has, mag < th_dir, best > 0], ["-", "정위치", "상측쏠림"], "하측쏠림")
+        judge = np.select([~has, mag >= limit, mag >= watch], ["데이터없음", "조정 비권장", "관찰"], "양호")
+    pos_name = np.where(has, np.array(_SLIT_POSITIONS)[worst], "-")
+
     out = []
-    for _, r in df_long.iterrows():
-        item = str(r.get("item", ""))
-        m = re.match(
-            r"^거리\s+(전체폭|타발폭)_(좌측|우측|중앙|좌|우|중)_(\d+)\s*[：:]\s*거리\s*(X|Y)",
-            item,
-        )
-        if not m:
+    for i in range(len(items_list)):
+        if not present[i]:
+            out.append([])
             continue
-        kind = m.group(1)
-        pos_raw = m.group(2)
-        row = int(m.group(3))
-        axis = m.group(4)
-        pos = _SLIT_POS_MAP.get(pos_raw, pos_raw)
-        out.append([kind, pos, row, axis, r.get("actual", np.nan), r.get("target", np.nan), r.get("calc", np.nan)])
-    return pd.DataFrame(out, columns=["kind", "pos", "Row", "axis", "actual", "target", "dev"])
-
-
-def _interp_general(rows_arr, vals_arr, all_rows):
-    """일반 선형 보간 (numpy)."""
-    rows_a = np.asarray(rows_arr, dtype=float)
-    vals_a = np.asarray(vals_arr, dtype=float)
-    all_r = np.asarray(all_rows, dtype=float)
-    mask = np.isfinite(rows_a) & np.isfinite(vals_a)
-    rows_a = rows_a[mask]
-    vals_a = vals_a[mask]
-    if len(rows_a) == 0:
-        return np.full_like(all_r, np.nan, dtype=float)
-    if len(rows_a) == 1:
-        return np.full_like(all_r, float(vals_a[0]), dtype=float)
-    order = np.argsort(rows_a)
-    rows_a = rows_a[order]
-    vals_a = vals_a[order]
-    return np.interp(all_r, rows_a, vals_a)
+        b, mv, rt = best[i].tolist(), move[i].tolist(), rate[i].tolist()
+        d, jd, ps = direction[i].tolist(), judge[i].tolist(), pos_name[i].tolist()
+        out.append([
+            {
+                "Row": r + 1,
+                "쏠림방향": d[r],
+                "Y쏠림(mm)": _round_or_none(b[r], 4),
+                "이동가능(mm)": _round_or_none(mv[r], 4),
+                "잔여율(%)": _round_or_none(rt[r], 1),
+                "판정": jd[r],
+                "Pos(worst)": ps[r],
+            }
+            for r in range(len(_SLIT_ROWS))
+        ])
+    return out
 
 
 def compute_slitter_punch(df_items: pd.DataFrame,
                           limit: float = LIMIT_SLIT, watch: float = WATCH_SLIT,
                           th_dir: float = TH_DIR) -> List[Dict]:
-    """슬리터 타발폭 Y축 12행 마진 계산."""
-    sub = df_items[(df_items["kind"] == "타발폭") & (df_items["axis"] == "Y")].copy()
-    if sub.empty:
-        return []
-
-    all_rows = np.arange(1, 13, dtype=float)
-    pos_series = {}
-    for pos in ["좌", "중", "우"]:
-        s = sub[sub["pos"] == pos].groupby("Row")["dev"].apply(
-            lambda x: float(x.iloc[0]) if len(x) else np.nan
-        )
-        pos_series[pos] = _interp_general(
-            np.array(s.index, dtype=float),
-            np.array(s.values, dtype=float),
-            all_rows,
-        )
-
-    out = []
-    for i, r in enumerate(range(1, 13)):
-        vals = {pos: pos_series[pos][i] for pos in ["좌", "중", "우"] if pos in pos_series}
-        if any(pd.notna(v) for v in vals.values()):
-            best_pos = max(vals.keys(), key=lambda k: abs(vals[k]) if pd.notna(vals[k]) else -1)
-            best_v = float(vals[best_pos])
-        else:
-            best_pos = "-"
-            best_v = np.nan
-        move = (limit - abs(best_v)) if pd.notna(best_v) else np.nan
-        move = max(0.0, float(move)) if pd.notna(move) else np.nan
-        rate = (move / limit * 100.0) if pd.notna(move) else np.nan
-
-        out.append({
-            "Row": r,
-            "쏠림방향": _tilt_dir_y(best_v, th_dir),
-            "Y쏠림(mm)": round(float(best_v), 4) if pd.notna(best_v) else None,
-            "이동가능(mm)": round(float(move), 4) if pd.notna(move) else None,
-            "잔여율(%)": round(float(rate), 1) if pd.notna(rate) else None,
-            "판정": _judge_abs(best_v, watch, limit),
-            "Pos(worst)": best_pos,
-        })
-    return out
+    """슬리터 타발폭 Y축 12행 마진 계산 (파일 1개)."""
+    return compute_slitter_punch_batch([df_items], limit, watch, th_dir)[0]
 
 
 # =============================================================================
@@ -715,18 +876,7 @@ def extract_distances(df_long: pd.DataFrame) -> pd.DataFrame:
     parse_tabular_like() 결과에서 '거리 (타발|카본|절연)_{방향}_{번호}' 항목 추출.
     출력 columns: [group, side, axis, point, actual, target, dev]
     """
-    out = []
-    for _, r in df_long.iterrows():
-        item = str(r["item"])
-        m = re.match(
-            r"^거리\s+(타발|카본|절연)_(좌측|우측|상측|하측)_(\d+)\s*[：:]\s*거리\s*(X|Y)",
-            item,
-        )
-        if not m:
-            continue
-        group, side, pt, axis = m.group(1), m.group(2), int(m.group(3)), m.group(4)
-        out.append([group, side, axis, pt, r["actual"], r["target"], r["calc"]])
-    return pd.DataFrame(out, columns=["group", "side", "axis", "point", "actual", "target", "dev"])
+    return classify_tabular(df_long).distances
 
 
 # ─── (1) 원단 분석 ───
@@ -770,6 +920,26 @@ def compute_fabric(
 
 # ─── (2) 스텐실 분석 ───
 
+def stencil_points(dist_df: pd.DataFrame) -> Dict[str, Dict[str, List[float]]]:
+    """
+    스텐실 입력: 카본/절연 × 방향별 첫 행의 [target, actual, dev] (없는 방향은 키 없음, 결측값은 None → JSON 저장 가능).
+    여러 파일의 입력은 파일 순서대로 setdefault 하면 concat 후 첫 행 선택과 같다.
+    """
+    points: Dict[str, Dict[str, List[float]]] = {}
+    for group in ("카본", "절연"):
+        for side in _SIDES:
+            sub = dist_df[(dist_df["group"] == group) & (dist_df["side"] == side)]
+            if sub.empty:
+                continue
+            r = sub.iloc[0]
+            points.setdefault(group, {})[side] = [
+                float(r["target"]) if pd.notna(r["target"]) else None,
+                float(r["actual"]) if pd.notna(r["actual"]) else None,
+                float(r["dev"]) if pd.notna(r["dev"]) else None,
+            ]
+    return points
+
+
 def compute_stencil(
     dist_df: pd.DataFrame,
     layer_watch: float = LAYER_WATCH,
@@ -781,17 +951,20 @@ def compute_stencil(
     스텐실 분석: 레이어간 차이 + 비대칭.
     반환: (detail_rows, summary_rows)
     """
+    return compute_stencil_points(stencil_points(dist_df), layer_watch, layer_stop, asym_watch, asym_strong)
+
+
+def compute_stencil_points(
+    points: Dict[str, Dict[str, List[float]]],
+    layer_watch: float = LAYER_WATCH,
+    layer_stop: float = LAYER_STOP,
+    asym_watch: float = ASYM_WATCH,
+    asym_strong: float = ASYM_STRONG,
+) -> Tuple[list, list]:
+    """stencil_points() 결과 → (detail_rows, summary_rows)."""
 
     def _pick(group: str, side: str):
-        sub = dist_df[(dist_df["group"] == group) & (dist_df["side"] == side)]
-        if sub.empty:
-            return (np.nan, np.nan, np.nan)
-        r = sub.iloc[0]
-        return (
-            float(r["target"]) if pd.notna(r["target"]) else np.nan,
-            float(r["actual"]) if pd.notna(r["actual"]) else np.nan,
-            float(r["dev"]) if pd.notna(r["dev"]) else np.nan,
-        )
+        return tuple(points.get(group, {}).get(side, (np.nan, np.nan, np.nan)))
 
     # Part A: 방향별 레이어간 차이
     detail_rows = []
@@ -865,48 +1038,58 @@ def compute_slitter_total(
     슬리터 전체폭 균일성: Row별 좌/중/우 편차의 Range, Std.
     출력: list of dict [Row, 좌(dev), 중(dev), 우(dev), Range(mm), Std(mm), 판정]
     """
-    sub = df_items[(df_items["kind"] == "전체폭") & (df_items["axis"] == "Y")].copy()
-    if sub.empty:
-        return []
+    return compute_slitter_total_batch([df_items], warn_range, bad_range, warn_std, bad_std)[0]
 
-    all_rows = np.arange(1, 13, dtype=float)
-    pos_series = {}
-    for pos in ["좌", "중", "우"]:
-        s = sub[sub["pos"] == pos].groupby("Row")["dev"].apply(
-            lambda x: float(x.iloc[0]) if len(x) else np.nan
-        )
-        pos_series[pos] = _interp_general(
-            np.array(s.index, dtype=float),
-            np.array(s.values, dtype=float),
-            all_rows,
+
+def compute_slitter_total_batch(
+    items_list: List[pd.DataFrame],
+    warn_range: float = TOTAL_WARN_RANGE,
+    bad_range: float = TOTAL_BAD_RANGE,
+    warn_std: float = TOTAL_WARN_STD,
+    bad_std: float = TOTAL_BAD_STD,
+) -> List[List[Dict]]:
+    """슬리터 전체폭 균일성 — 파일별 slitter_items 목록 → 파일별 결과 (전체폭 항목 없는 파일은 [])."""
+    vals, present = _slitter_grid(items_list, "전체폭")
+
+    # Row별 좌/중/우 중 값이 있는 위치만으로 Range, Std(모표준편차)
+    finite = np.isfinite(vals)
+    cnt = finite.sum(axis=1)
+    has = cnt > 0
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rng = np.where(finite, vals, -np.inf).max(axis=1) - np.where(finite, vals, np.inf).min(axis=1)
+        mean = np.where(finite, vals, 0.0).sum(axis=1) / cnt
+        dev = np.where(finite, vals - mean[:, None, :], 0.0)
+        sd = np.sqrt((dev * dev).sum(axis=1) / cnt)
+    rng = np.where(has, rng, np.nan)
+    sd = np.where(has, sd, np.nan)
+
+    # 판정: Range/Std 중 나쁜 쪽 (양호 < 경계 < 이상)
+    with np.errstate(invalid="ignore"):
+        level = np.maximum(
+            (rng >= warn_range).astype(int) + (rng >= bad_range),
+            (sd >= warn_std).astype(int) + (sd >= bad_std),
         )
+    judge = np.where(has, np.array(["양호", "경계", "이상"])[level], "데이터없음")
 
     out = []
-    for i, r in enumerate(range(1, 13)):
-        vL = pos_series["좌"][i]
-        vC = pos_series["중"][i]
-        vR = pos_series["우"][i]
-        vals = np.array([vL, vC, vR], dtype=float)
-        finite = vals[np.isfinite(vals)]
-        if len(finite) == 0:
-            rng, sd, j = np.nan, np.nan, "데이터없음"
-        else:
-            rng = float(np.max(finite) - np.min(finite))
-            sd = float(np.std(finite))
-            jr = _judge_abs3(rng, warn_range, bad_range, danger_label="이상")
-            js = _judge_abs3(sd, warn_std, bad_std, danger_label="이상")
-            rank = {"데이터없음": 0, "양호": 1, "경계": 2, "이상": 3}
-            j = jr if rank.get(jr, 0) >= rank.get(js, 0) else js
-
-        out.append({
-            "Row": r,
-            "좌(dev)": round(float(vL), 4) if pd.notna(vL) else None,
-            "중(dev)": round(float(vC), 4) if pd.notna(vC) else None,
-            "우(dev)": round(float(vR), 4) if pd.notna(vR) else None,
-            "Range(mm)": round(float(rng), 4) if pd.notna(rng) else None,
-            "Std(mm)": round(float(sd), 4) if pd.notna(sd) else None,
-            "판정": j,
-        })
+    for i in range(len(items_list)):
+        if not present[i]:
+            out.append([])
+            continue
+        left, center, right = (vals[i, p].tolist() for p in range(len(_SLIT_POSITIONS)))
+        rg, st, jd = rng[i].tolist(), sd[i].tolist(), judge[i].tolist()
+        out.append([
+            {
+                "Row": r + 1,
+                "좌(dev)": _round_or_none(left[r], 4),
+                "중(dev)": _round_or_none(center[r], 4),
+                "우(dev)": _round_or_none(right[r], 4),
+                "Range(mm)": _round_or_none(rg[r], 4),
+                "Std(mm)": _round_or_none(st[r], 4),
+                "판정": jd[r],
+            }
+            for r in range(len(_SLIT_ROWS))
+        ])
     return out
 
 
@@ -927,77 +1110,109 @@ def direction_label(axis: str, value: float, deadband: float) -> str:
     return "-"
 
 
-def _argmax_abs(df: pd.DataFrame, cols: List[str]) -> Optional[Dict]:
-    """주어진 컬럼들에서 |값| 최대의 (rowId, side, value)를 찾는다."""
+# Row 값 행렬 (..., Row, 7) 컬럼 인덱스 — ROW_VALUE_COLUMNS 순서
+_IX_X = slice(0, 2)     # 조립치우침 L/R
+_IX_Y = slice(2, 5)     # 상하치우침 L/C/R
+_IX_P = slice(5, 7)     # 타발홀 L/R
+_SIDES_X = ("L", "R")
+_SIDES_Y = ("L", "C", "R")
+_SIDES_P = ("L", "R")
+_ROW_DF_COLUMNS = ["Row", *ROW_VALUE_COLUMNS]
+
+
+def _row_value_matrix(df: pd.DataFrame) -> np.ndarray:
+    """row_df → (n_rows, 7) float 행렬. 없는 컬럼/비숫자는 NaN."""
+    # pivot_row_values 출력 그대로(Row + 7컬럼)면 블록 1회 변환, 숫자로 안 바뀌는 값이 있으면 컬럼별 처리
+    if df.columns.tolist() == _ROW_DF_COLUMNS:
+        try:
+            return df.to_numpy(dtype=float, copy=True)[:, 1:]
+        except (TypeError, ValueError):
+            pass
+    out = np.full((len(df), len(ROW_VALUE_COLUMNS)), np.nan)
+    for j, c in enumerate(ROW_VALUE_COLUMNS):
+        if c in df.columns:
+            s = df[c]
+            out[:, j] = s.to_numpy(dtype=float) if s.dtype.kind in "fiu" else pd.to_numeric(s, errors="coerce").to_numpy(dtype=float)
+    return out
+
+
+def _nan_absmax(a: np.ndarray, axis=-1) -> np.ndarray:
+    """|a| 최대 (NaN 무시, 전부 NaN이면 NaN)."""
+    return np.fmax.reduce(np.abs(a), axis=axis)
+
+
+def _first_absmax_idx(a: np.ndarray, axis: int = -1) -> np.ndarray:
+    """|a| 최대 위치 (동률이면 앞쪽, 전부 NaN이면 -1)."""
+    aa = np.abs(a)
+    nan = np.isnan(aa)
+    idx = np.where(nan, -1.0, aa).argmax(axis=axis)
+    return np.where(nan.all(axis=axis), -1, idx)
+
+
+def _row_metrics(v: np.ndarray, ng_x: float, ng_y: float, check_x: float, check_y: float, check_p: float) -> Dict[str, np.ndarray]:
+    """
+    Row 단위 지표 — v: (..., n_rows, 7). 앞쪽 차원(시트 배치)은 그대로 유지.
+    sev_x/sev_y/severity, 대표 축(rep_is_x)/면 인덱스/값, 타발홀 severity, C_ASYM/diag, 상태 rank(NG=2/CHECK=1/OK=0)
+    """
+    vx, vy, vp = v[..., _IX_X], v[..., _IX_Y], v[..., _IX_P]
+    sev_x = _nan_absmax(vx)
+    sev_y = _nan_absmax(vy)
+    psev = _nan_absmax(vp)
+
+    # 대표 축: sev_x > sev_y => X, 그 외(동률/NaN 포함) Y
+    rep_is_x = sev_x > sev_y
+    ix_x = _first_absmax_idx(vx)
+    ix_y = _first_absmax_idx(vy)
+    rep_idx = np.where(rep_is_x, ix_x, ix_y)
+    val_x = np.take_along_axis(vx, np.maximum(ix_x, 0)[..., None], axis=-1)[..., 0]
+    val_y = np.take_along_axis(vy, np.maximum(ix_y, 0)[..., None], axis=-1)[..., 0]
+    rep_value = np.where(rep_idx < 0, np.nan, np.where(rep_is_x, val_x, val_y))
+
+    yl, yr = v[..., 2], v[..., 4]
+    c_asym = np.abs(yl - yr)
+    diag = np.abs(yl + yr) / 2.0  # 단순 proxy (compute_constraints와 동일)
+
+    ng = (sev_x >= ng_x) | (sev_y >= ng_y)
+    check = (sev_x >= check_x) | (sev_y >= check_y) | (psev >= check_p)
+    rank = np.where(ng, 2, np.where(check, 1, 0))
+
+    return {
+        "sev_x": sev_x, "sev_y": sev_y, "severity": np.fmax(sev_x, sev_y),
+        "rep_is_x": rep_is_x, "rep_idx": rep_idx, "rep_value": rep_value,
+        "psev": psev, "c_asym": c_asym, "diag": diag, "rank": rank,
+    }
+
+
+def _worst_of(v: np.ndarray, rows: np.ndarray, cols: slice, sides: Tuple[str, ...]) -> Optional[Dict]:
+    """컬럼 순서대로 |값| 최대(동률이면 앞 컬럼/앞 Row)의 (rowId, side, value)."""
+    sub = v[:, cols]
     best = None
-    for c in cols:
-        if c not in df.columns:
-            continue
-        s = pd.to_numeric(df[c], errors="coerce")
-        if not s.notna().any():
+    for j in range(sub.shape[1]):
+        i = int(_first_absmax_idx(sub[:, j], axis=0))
+        if i < 0:
             continue
-        idx = s.abs().idxmax()
-        v = float(s.loc[idx])
-        row_id = df.loc[idx, "Row"] if "Row" in df.columns else None
-        cand = (abs(v), c, v, row_id)
-        if best is None or cand[0] > best[0]:
-            best = cand
+        val = float(sub[i, j])
+        if best is None or abs(val) > abs(best[1]):
+            best = (j, val, rows[i])
     if best is None:
         return None
-    _abs, col, val, row_id = best
-    # side 파싱
-    side = "C" if col.endswith("C") else ("L" if col.endswith("L") else ("R" if col.endswith("R") else "-"))
-    return {"rowId": int(row_id) if pd.notna(row_id) else None, "side": side, "value": float(val), "col": col}
-
-
-def _row_severity_and_rep(df: pd.DataFrame) -> pd.DataFrame:
-    """Row별 severity(max(|X|,|Y|))와 대표 축/면/값을 생성."""
-    out = df.copy()
-    # numeric
-    for c in [
-        "조립치우침L","조립치우침R",
-        "상하치우침L","상하치우침C","상하치우침R",
-        "타발홀L","타발홀R",
-    ]:
-        if c in out.columns:
-            out[c] = pd.to_numeric(out[c], errors="coerce")
-
-    out["sev_x"] = out[[c for c in ["조립치우침L","조립치우침R"] if c in out.columns]].abs().max(axis=1)
-    out["sev_y"] = out[[c for c in ["상하치우침L","상하치우침C","상하치우침R"] if c in out.columns]].abs().max(axis=1)
-    out["severity"] = pd.concat([out["sev_x"], out["sev_y"]], axis=1).max(axis=1)
-
-    # 대표 축 선택: sev_x > sev_y => X, else Y (동률이면 Y)
-    rep_axis = np.where(out["sev_x"] > out["sev_y"], "X", "Y")
-    out["rep_axis"] = rep_axis
-
-    # 대표 side/value
-    def _pick_rep(row: pd.Series):
-        if row.get("rep_axis") == "X":
-            a = row.get("조립치우침L")
-            b = row.get("조립치우침R")
-            if pd.isna(a) and pd.isna(b):
-                return pd.Series({"rep_side": "-", "rep_value": np.nan})
-            if pd.isna(a):
-                return pd.Series({"rep_side": "R", "rep_value": float(b)})
-            if pd.isna(b):
-                return pd.Series({"rep_side": "L", "rep_value": float(a)})
-            return pd.Series({"rep_side": "L" if abs(float(a)) >= abs(float(b)) else "R", "rep_value": float(a) if abs(float(a)) >= abs(float(b)) else float(b)})
-        # Y
-        cand = {
-            "L": row.get("상하치우침L"),
-            "C": row.get("상하치우침C"),
-            "R": row.get("상하치우침R"),
-        }
-        cand = {k: v for k, v in cand.items() if v is not None and pd.notna(v)}
-        if not cand:
-            return pd.Series({"rep_side": "-", "rep_value": np.nan})
-        k = max(cand.keys(), key=lambda kk: abs(float(cand[kk])))
-        return pd.Series({"rep_side": k, "rep_value": float(cand[k])})
-
-    rep = out.apply(_pick_rep, axis=1)
-    out["rep_side"] = rep["rep_side"]
-    out["rep_value"] = rep["rep_value"]
-    return out
+    j, val, row_id = best
+    col = ROW_VALUE_COLUMNS[cols.start + j]
+    return {"rowId": int(row_id) if pd.notna(row_id) else None, "side": sides[j], "value": val, "col": col}
+
+
+def _desc_nan_last(a: np.ndarray) -> np.ndarray:
+    """내림차순 정렬 키 (NaN은 맨 뒤)."""
+    return np.where(np.isnan(a), np.inf, -a)
+
+
+def _asc_nan_last(a: np.ndarray) -> np.ndarray:
+    return np.where(np.isnan(a), np.inf, a)
+
+
+def _row_order_key(row: pd.Series) -> np.ndarray:
+    """Row 오름차순 키 — 원래 Row 값 그대로 비교(문자열 Row는 사전순, 이전 sort_values와 동일), NaN은 맨 뒤."""
+    return _asc_nan_last(row.rank(method="dense").to_numpy(dtype=float))
 
 
 def build_step1_detail_summary(
@@ -1009,7 +1224,10 @@ def build_step1_detail_summary(
     tilt_thresh_y: float = 0.03,
     bow_thresh_y: float = 0.03,
 ) -> Dict:
-    """React 디테일(진단/TopN/미니카드)을 위한 요약 스키마 생성."""
+    """
+    React 디테일(진단/TopN/미니카드)을 위한 요약 스키마 생성.
+    Row 값 7컬럼을 (n_rows, 7) 행렬로 한 번 변환한 뒤 배열 연산으로 계산한다.
+    """
     th = th or {}
     ng_x = _th(th, "ng_x", default=0.15)
     ng_y = _th(th, "ng_y", default=0.15)
@@ -1019,8 +1237,7 @@ def build_step1_detail_summary(
     th_asym = _th(th, "th_asym", "casym", "asym", default=0.10)
     th_diag = _th(th, "th_diag", "diag", default=0.10)
 
-    df = row_df.copy()
-    if df.empty:
+    if row_df.empty:
         return {
             "diagnosis": {"sheetStatus": "-", "summary": "Row 데이터가 없습니다.", "worstX": None, "worstY": None, "tags": []},
             "problemRowsTop5": [],
@@ -1028,26 +1245,29 @@ def build_step1_detail_summary(
             "mini": {"x": None, "y": None},
         }
 
+    v = _row_value_matrix(row_df)
+    rows = row_df["Row"].to_numpy()
+    row_key = _row_order_key(row_df["Row"])
+    row_num = pd.to_numeric(row_df["Row"], errors="coerce").to_numpy(dtype=float)
+    has_x = any(c in row_df.columns for c in ROW_VALUE_COLUMNS[_IX_X])
+    has_y = any(c in row_df.columns for c in ROW_VALUE_COLUMNS[_IX_Y])
+    has_p = any(c in row_df.columns for c in ROW_VALUE_COLUMNS[_IX_P])
+
+    m = _row_metrics(v, ng_x, ng_y, check_x, check_y, check_p)
+
     # worstX / worstY
-    worst_x = _argmax_abs(df, ["조립치우침L", "조립치우침R"])
-    worst_y = _argmax_abs(df, ["상하치우침L", "상하치우침C", "상하치우침R"])
+    worst_x = _worst_of(v, rows, _IX_X, _SIDES_X)
+    worst_y = _worst_of(v, rows, _IX_Y, _SIDES_Y)
 
     wx_val = worst_x["value"] if worst_x else np.nan
     wy_val = worst_y["value"] if worst_y else np.nan
 
-    # constraints (시트 단위): Row별 compute_constraints를 최대값으로 집계
-    cas, dig = [], []
-    for _i, r in df.iterrows():
-        c_asym, diag = compute_constraints(r)
-        cas.append(c_asym)
-        dig.append(diag)
-    c_asym_sheet = worst_abs(cas)
-    diag_sheet = worst_abs(dig)
-    _pL = pd.to_numeric(df["타발홀L"], errors="coerce").dropna().tolist() if "타발홀L" in df.columns else []
-    _pR = pd.to_numeric(df["타발홀R"], errors="coerce").dropna().tolist() if "타발홀R" in df.columns else []
-    punch_w_sheet = worst_abs(_pL + _pR)
-
-    st_raw = sheet_status(abs(wx_val) if pd.notna(wx_val) else np.nan, abs(wy_val) if pd.notna(wy_val) else np.nan, c_asym_sheet, diag_sheet, punch_w_sheet, th)
+    # constraints (시트 단위): Row별 C_ASYM/diag 최대값
+    c_asym_sheet = float(np.fmax.reduce(m["c_asym"]))
+    diag_sheet = float(np.fmax.reduce(m["diag"]))
+    punch_w = float(np.fmax.reduce(m["psev"]))
+
+    st_raw = sheet_status(abs(wx_val) if pd.notna(wx_val) else np.nan, abs(wy_val) if pd.notna(wy_val) else np.nan, c_asym_sheet, diag_sheet, punch_w, th)
     sheet_st = "NG" if st_raw == "MUST" else st_raw
 
     # tags (구조화)
@@ -1064,9 +1284,6 @@ def build_step1_detail_summary(
         tags.append({"name": "Y", "value": float(abs(wy_val)), "limit": float(check_y)})
 
     # punch tag
-    pL = pd.to_numeric(df.get("타발홀L"), errors="coerce") if "타발홀L" in df.columns else pd.Series(dtype=float)
-    pR = pd.to_numeric(df.get("타발홀R"), errors="coerce") if "타발홀R" in df.columns else pd.Series(dtype=float)
-    punch_w = worst_abs(list(pL.dropna().tolist()) + list(pR.dropna().tolist()))
     if pd.notna(punch_w) and punch_w >= check_p:
         tags.append({"name": "Punch", "value": float(punch_w), "limit": float(check_p)})
 
@@ -1092,57 +1309,48 @@ def build_step1_detail_summary(
 
     summary = _summary()
 
-    # mini card data (Row-level view uses L/R or L/C/R points)
+    # mini card data (Row-level view uses L/R or L/C/R points) — 대표는 worst row 우선
+    def _mini_row(worst: Optional[Dict]) -> Tuple[int, np.ndarray]:
+        rid = worst["rowId"] if worst and worst.get("rowId") is not None else int(rows[0])
+        hit = np.flatnonzero(row_num == int(rid))
+        return int(rid), v[hit[0] if hit.size else 0]
+
+    def _points(sides: Tuple[str, ...], vals: np.ndarray) -> List[Dict]:
+        pts = [{"pos": side, "value": float(x)} for side, x in zip(sides, vals) if pd.notna(x)]
+        if pts:
+            worst_idx = max(range(len(pts)), key=lambda i: abs(float(pts[i]["value"])))
+            for i in range(len(pts)):
+                pts[i]["isWorst"] = (i == worst_idx)
+        return pts
+
     def _mini_x():
-        if not ("조립치우침L" in df.columns or "조립치우침R" in df.columns):
+        if not has_x:
             return None
-        # 대표는 worst row 우선 (타입 불일치 방어: int 비교)
-        rid = worst_x["rowId"] if worst_x and worst_x.get("rowId") is not None else int(df["Row"].iloc[0])
-        matched = df[pd.to_numeric(df["Row"], errors="coerce") == int(rid)]
-        if matched.empty:
-            matched = df.head(1)
-        rr = matched.iloc[0]
-        xL = pd.to_numeric(rr.get("조립치우침L"), errors="coerce")
-        xR = pd.to_numeric(rr.get("조립치우침R"), errors="coerce")
+        rid, rr = _mini_row(worst_x)
+        xL, xR = rr[0], rr[1]
         x_center = float((xL + xR) / 2.0) if pd.notna(xL) and pd.notna(xR) else float(xL if pd.notna(xL) else (xR if pd.notna(xR) else np.nan))
         x_skew = float((xR - xL) / 2.0) if pd.notna(xL) and pd.notna(xR) else np.nan
         flags = []
         if pd.notna(x_skew):
             if abs(x_skew) >= float(max(2 * deadband_x, 0.03)):
                 flags.append({"type": "SKEW", "text": "R면 더 큼" if x_skew > 0 else "L면 더 큼", "value": float(x_skew), "thresh": float(max(2 * deadband_x, 0.03))})
-        pts = []
-        for side, v in [("L", xL), ("R", xR)]:
-            if pd.notna(v):
-                pts.append({"pos": side, "value": float(v)})
-        # worst mark
-        if pts:
-            worst_idx = max(range(len(pts)), key=lambda i: abs(float(pts[i]["value"])))
-            for i in range(len(pts)):
-                pts[i]["isWorst"] = (i == worst_idx)
-
         return {
             "axis": "X",
             "ng": float(ng_x),
             "deadband": float(deadband_x),
             "centerValue": float(x_center) if pd.notna(x_center) else None,
             "direction": direction_label("X", x_center, deadband_x),
-            "points": pts,
+            "points": _points(_SIDES_X, rr[_IX_X]),
             "flags": flags,
-            "rowId": int(rid),
+            "rowId": rid,
         }
 
     def _mini_y():
-        if not any(c in df.columns for c in ["상하치우침L", "상하치우침C", "상하치우침R"]):
+        if not has_y:
             return None
-        rid = worst_y["rowId"] if worst_y and worst_y.get("rowId") is not None else int(df["Row"].iloc[0])
-        matched = df[pd.to_numeric(df["Row"], errors="coerce") == int(rid)]
-        if matched.empty:
-            matched = df.head(1)
-        rr = matched.iloc[0]
-        yL = pd.to_numeric(rr.get("상하치우침L"), errors="coerce")
-        yC = pd.to_numeric(rr.get("상하치우침C"), errors="coerce")
-        yR = pd.to_numeric(rr.get("상하치우침R"), errors="coerce")
-        vals = [v for v in [yL, yC, yR] if pd.notna(v)]
+        rid, rr = _mini_row(worst_y)
+        yL, yC, yR = rr[2], rr[3], rr[4]
+        vals = [float(x) for x in (yL, yC, yR) if pd.notna(x)]
         y_center = float(np.median(vals)) if vals else np.nan
         y_tilt = float((yR - yL) / 2.0) if pd.notna(yL) and pd.notna(yR) else np.nan
         y_bow = float(yC - (yL + yR) / 2.0) if pd.notna(yC) and pd.notna(yL) and pd.notna(yR) else np.nan
@@ -1151,100 +1359,58 @@ def build_step1_detail_summary(
             flags.append({"type": "TILT", "text": "우측이 더 상측" if y_tilt > 0 else "좌측이 더 상측", "value": float(y_tilt), "thresh": float(tilt_thresh_y)})
         if pd.notna(y_bow) and abs(y_bow) >= float(bow_thresh_y):
             flags.append({"type": "BOW", "text": "가운데가 더 상측(뜸)" if y_bow > 0 else "가운데가 더 하측(처짐)", "value": float(y_bow), "thresh": float(bow_thresh_y)})
-
-        pts = []
-        for side, v in [("L", yL), ("C", yC), ("R", yR)]:
-            if pd.notna(v):
-                pts.append({"pos": side, "value": float(v)})
-        if pts:
-            worst_idx = max(range(len(pts)), key=lambda i: abs(float(pts[i]["value"])))
-            for i in range(len(pts)):
-                pts[i]["isWorst"] = (i == worst_idx)
-
         return {
             "axis": "Y",
             "ng": float(ng_y),
             "deadband": float(deadband_y),
             "centerValue": float(y_center) if pd.notna(y_center) else None,
             "direction": direction_label("Y", y_center, deadband_y),
-            "points": pts,
+            "points": _points(_SIDES_Y, rr[_IX_Y]),
             "flags": flags,
-            "rowId": int(rid),
+            "rowId": rid,
         }
 
     mini_x = _mini_x()
     mini_y = _mini_y()
 
-    # Problem Rows Top5
-    tmp = _row_severity_and_rep(df)
-
-    # rowStatus (선택) — 대표값 기준
-    def _row_status(row: pd.Series) -> str:
-        # NG if any exceed ng
-        x_ok = True
-        y_ok = True
-        if pd.notna(row.get("sev_x")):
-            x_ok = float(row.get("sev_x")) < float(ng_x)
-        if pd.notna(row.get("sev_y")):
-            y_ok = float(row.get("sev_y")) < float(ng_y)
-        if not (x_ok and y_ok):
-            return "NG"
-        # CHECK if exceed check or punch
-        if pd.notna(row.get("sev_x")) and float(row.get("sev_x")) >= float(check_x):
-            return "CHECK"
-        if pd.notna(row.get("sev_y")) and float(row.get("sev_y")) >= float(check_y):
-            return "CHECK"
-        # punch
-        psev = worst_abs([row.get("타발홀L"), row.get("타발홀R")])
-        if pd.notna(psev) and float(psev) >= float(check_p):
-            return "CHECK"
-        return "OK"
-
-    tmp["rowStatus"] = tmp.apply(_row_status, axis=1)
-    status_rank = tmp["rowStatus"].map({"NG": 2, "CHECK": 1, "OK": 0}).fillna(0)
-    tmp["_sr"] = status_rank
-    top5_df = tmp.sort_values(["_sr", "severity", "Row"], ascending=[False, False, True]).head(5)
-
+    # Problem Rows Top5 — 상태(NG>CHECK>OK) ↓, severity ↓, Row ↑ (NaN은 뒤로, 동률은 원래 순서)
+    status_txt = np.array(["OK", "CHECK", "NG"])[m["rank"]]
+    order = np.lexsort((row_key, _desc_nan_last(m["severity"]), -m["rank"]))[:5]
     top5 = []
-    for _, r in top5_df.iterrows():
-        axis = r.get("rep_axis")
-        side = r.get("rep_side")
-        val = r.get("rep_value")
-        db = deadband_x if axis == "X" else deadband_y
-        dir_txt = direction_label(axis, val, db)
+    for i in order:
+        is_x = bool(m["rep_is_x"][i])
+        axis = "X" if is_x else "Y"
+        ri = int(m["rep_idx"][i])
+        side = "-" if ri < 0 else (_SIDES_X if is_x else _SIDES_Y)[ri]
+        val = m["rep_value"][i]
+        sev = m["severity"][i]
         top5.append({
-            "rowId": int(r.get("Row")) if pd.notna(r.get("Row")) else None,
+            "rowId": int(row_num[i]) if pd.notna(row_num[i]) else None,
             "axis": axis,
             "side": side,
             "value": float(val) if pd.notna(val) else None,
-            "direction": dir_txt,
-            "rowStatus": str(r.get("rowStatus")),
-            "severity": float(r.get("severity")) if pd.notna(r.get("severity")) else None,
+            "direction": direction_label(axis, val, deadband_x if is_x else deadband_y),
+            "rowStatus": str(status_txt[i]),
+            "severity": float(sev) if pd.notna(sev) else None,
         })
 
-    # Punch Top3
+    # Punch Top3 — severity ↓, Row ↑ 상위 3개 중 값 있는 Row만
     punch_rows = []
-    if "타발홀L" in df.columns or "타발홀R" in df.columns:
-        ptmp = df[[c for c in ["Row","타발홀L","타발홀R"] if c in df.columns]].copy()
-        ptmp["타발홀L"] = pd.to_numeric(ptmp.get("타발홀L"), errors="coerce") if "타발홀L" in ptmp.columns else np.nan
-        ptmp["타발홀R"] = pd.to_numeric(ptmp.get("타발홀R"), errors="coerce") if "타발홀R" in ptmp.columns else np.nan
-        ptmp["severity"] = ptmp[[c for c in ["타발홀L","타발홀R"] if c in ptmp.columns]].abs().max(axis=1)
-        ptmp = ptmp.sort_values(["severity","Row"], ascending=[False, True]).head(3)
-        for _, r in ptmp.iterrows():
-            a = r.get("타발홀L")
-            b = r.get("타발홀R")
-            if pd.isna(a) and pd.isna(b):
+    if has_p:
+        p_idx = _first_absmax_idx(v[:, _IX_P])
+        for i in np.lexsort((row_key, _desc_nan_last(m["psev"])))[:3]:
+            if p_idx[i] < 0:
                 continue
-            side = "L" if (pd.notna(a) and (pd.isna(b) or abs(float(a)) >= abs(float(b)))) else "R"
-            val = float(a) if side == "L" else float(b)
+            side = _SIDES_P[p_idx[i]]
+            val = float(v[i, _IX_P.start + p_idx[i]])
             punch_rows.append({
-                "rowId": int(r.get("Row")) if pd.notna(r.get("Row")) else None,
+                "rowId": int(row_num[i]) if pd.notna(row_num[i]) else None,
                 "axis": "PUNCH",
                 "side": side,
                 "value": val,
                 "direction": "기준초과" if abs(val) >= check_p else "정상",
                 "rowStatus": "CHECK" if abs(val) >= check_p else "OK",
-                "severity": float(r.get("severity")) if pd.notna(r.get("severity")) else None,
+                "severity": float(m["psev"][i]),
             })
 
     # worst objects with direction
@@ -1285,50 +1451,204 @@ def build_step1_detail_summary(
     }
 
 
+# =============================================================================
+# [STEP1] Job 단위 일괄 점수 — 시트 리스트(상태/점수/worst/tags)를 (시트, Row, 7) 배열 한 번으로 계산
+# - 결과는 시트별 build_step1_detail_summary + sheet_status + quality_score_xy 조합과 동일
+# - 디테일 화면(Top5/미니카드)은 기존 시트별 경로 사용
+# =============================================================================
+SHEET_TAG_NAMES = ("C_ASYM", "diag", "X", "Y", "Punch")
+
+
+def stack_row_values(row_dfs: List[pd.DataFrame]) -> np.ndarray:
+    """row_df 목록 → (n_sheets, max_rows, 7). Row 수가 모자란 시트는 NaN으로 채움."""
+    n_rows = max((len(d) for d in row_dfs), default=0)
+    out = np.full((len(row_dfs), n_rows, len(ROW_VALUE_COLUMNS)), np.nan)
+    for k, d in enumerate(row_dfs):
+        if len(d):
+            out[k, : len(d)] = _row_value_matrix(d)
+    return out
+
+
+def _sheet_scores(v: np.ndarray, th: Dict[str, float], c_init: float = np.nan) -> Dict[str, np.ndarray]:
+    """
+    시트 단위 판정 — v: (..., n_rows, 7) → 앞쪽 차원 형태의 배열. sheet_status + quality_score_xy와 같은 규칙.
+    worst_x/worst_y/punch(|worst|, 값 없으면 NaN), c_asym/diag(Row 최대, 값 없으면 c_init), ng/check(bool), score
+    """
+    ng_x = _th(th, "ng_x", default=0.15)
+    ng_y = _th(th, "ng_y", default=0.15)
+    check_x = _th(th, "tag_x", "x_tag", default=0.10)
+    check_y = _th(th, "tag_y", "y_tag", default=0.10)
+    check_p = _th(th, "tag_punch", "punch", default=0.10)
+    th_asym = _th(th, "th_asym", "casym", default=0.10)
+    th_diag = _th(th, "th_diag", "diag", default=0.10)
+
+    def _absmax(cols: slice) -> np.ndarray:
+        return np.fmax.reduce(np.abs(v[..., cols]), axis=(-2, -1), initial=np.nan)
+
+    wx, wy, pw = _absmax(_IX_X), _absmax(_IX_Y), _absmax(_IX_P)
+    yl, yr = v[..., 2], v[..., 4]
+    c_asym = np.fmax.reduce(np.abs(yl - yr), axis=-1, initial=c_init)
+    diag = np.fmax.reduce(np.abs(yl + yr) / 2.0, axis=-1, initial=c_init)  # 단순 proxy (compute_constraints와 동일)
+
+    ng = (wx >= ng_x) | (wy >= ng_y)
+    check = (wx >= check_x) | (wy >= check_y) | (c_asym >= th_asym) | (diag >= th_diag) | (pw >= check_p)
+    score = _xy_score(wx, wy, ng, check, ng_x, ng_y)
+
+    return {"worst_x": wx, "worst_y": wy, "punch": pw, "c_asym": c_asym, "diag": diag, "ng": ng, "check": check, "score": score}
+
+
+def _xy_score(wx: np.ndarray, wy: np.ndarray, ng: np.ndarray, check: np.ndarray, ng_x: float, ng_y: float) -> np.ndarray:
+    """quality_score_xy와 같은 식 (worst 없으면 0으로 간주)."""
+    rx = np.minimum(np.nan_to_num(wx) / ng_x, 1.5) if ng_x > 0 else np.zeros_like(wx)
+    ry = np.minimum(np.nan_to_num(wy) / ng_y, 1.5) if ng_y > 0 else np.zeros_like(wy)
+    risk = np.maximum(rx, ry)
+    score = 100.0 - 60.0 * np.minimum(risk, 1.0) - 40.0 * np.maximum(0.0, risk - 1.0)
+    score = np.where(check & ~ng, np.minimum(score, 79.9), score)
+    return np.clip(np.where(ng, 0.0, score), 0.0, 100.0)
+
+
+def score_sheets(row_dfs: List[pd.DataFrame], th: Dict[str, float] | None = None) -> Dict[str, np.ndarray]:
+    """
+    여러 시트 일괄 판정. 반환 배열은 모두 길이 n_sheets (입력 순서).
+    - status : "NG" / "CHECK" / "OK" / "-"(Row 없음)
+    - score  : qualityScore (NG=0, CHECK<=79.9)
+    - worst_x/worst_y/punch : |worst| (값 없으면 NaN), c_asym/diag : 시트 최대값
+    - tags   : (n_sheets, 5) bool — SHEET_TAG_NAMES 순서
+    """
+    th = th or {}
+    check_x = _th(th, "tag_x", "x_tag", default=0.10)
+    check_y = _th(th, "tag_y", "y_tag", default=0.10)
+    check_p = _th(th, "tag_punch", "punch", default=0.10)
+    # 태그 임계값 키는 build_step1_detail_summary 기준 (상태 판정보다 "asym" 별칭 1개 더 허용)
+    tag_asym = _th(th, "th_asym", "casym", "asym", default=0.10)
+    th_diag = _th(th, "th_diag", "diag", default=0.10)
+
+    v = stack_row_values(row_dfs)
+    empty = np.array([d.empty for d in row_dfs], dtype=bool)
+    sc = _sheet_scores(v, th)
+    status = np.where(empty, "-", np.where(sc["ng"], "NG", np.where(sc["check"], "CHECK", "OK"))).astype(object)
+    tags = np.stack([
+        sc["c_asym"] >= tag_asym,
+        sc["diag"] >= th_diag,
+        sc["worst_x"] >= check_x,
+        sc["worst_y"] >= check_y,
+        sc["punch"] >= check_p,
+    ], axis=-1)
+
+    return {
+        "status": status,
+        "score": sc["score"],
+        "worst_x": sc["worst_x"],
+        "worst_y": sc["worst_y"],
+        "punch": sc["punch"],
+        "c_asym": sc["c_asym"],
+        "diag": sc["diag"],
+        "tags": tags,
+    }
+
+
+def row_metrics(row_dfs: List[pd.DataFrame]) -> Dict[str, np.ndarray]:
+    """
+    Row 단위 지표 (추이 저장용) — 모두 (n_sheets, max_rows), 값 없으면 NaN.
+    row(Row 번호, 없으면 0) / worst_x, worst_y, punch(|값| 최대) / c_asym(|Y좌-Y우|) / diag(|Y좌+Y우|/2)
+    """
+    v = stack_row_values(row_dfs)
+    rows = np.zeros(v.shape[:2], dtype=int)
+    for k, d in enumerate(row_dfs):
+        if len(d):
+            rows[k, : len(d)] = pd.to_numeric(d["Row"], errors="coerce").fillna(0).to_numpy(dtype=int)
+
+    def _absmax(cols: slice) -> np.ndarray:
+        return np.fmax.reduce(np.abs(v[..., cols]), axis=-1, initial=np.nan)
+
+    yl, yr = v[..., 2], v[..., 4]
+    return {
+        "row": rows,
+        "worst_x": _absmax(_IX_X),
+        "worst_y": _absmax(_IX_Y),
+        "punch": _absmax(_IX_P),
+        "c_asym": np.abs(yl - yr),
+        "diag": np.abs(yl + yr) / 2.0,
+    }
+
+
 # =============================================================================
 # [STEP3] 보정 시뮬레이션 — 장비 오프셋 적용 및 추천값 산출
 # =============================================================================
 
-def _metrics_from_df(df: pd.DataFrame, th=None):
-    """row_df → (worstX, worstY, punchW, cAsym, diag, status, score, rows_list)"""
-    wx = worst_abs(df["조립치우침L"].tolist() + df["조립치우침R"].tolist())
-    wy = worst_abs(df["상하치우침L"].tolist() + df["상하치우침C"].tolist() + df["상하치우침R"].tolist())
-    pw = worst_abs(df["타발홀L"].tolist() + df["타발홀R"].tolist())
+SIM_OFFSET_ROWS = 12  # Row별 오프셋 배열 길이 (13번째 Row부터는 마지막 값 사용)
+_SIM_ADJ_COLUMNS = frozenset(ROW_VALUE_COLUMNS[_IX_X] + ROW_VALUE_COLUMNS[_IX_Y])
 
-    c_asym_max = 0.0
-    diag_max = 0.0
-    for _, r in df.iterrows():
-        ca, dg = compute_constraints(r)
-        if pd.notna(ca):
-            c_asym_max = max(c_asym_max, ca)
-        if pd.notna(dg):
-            diag_max = max(diag_max, dg)
-
-    st = sheet_status(wx, wy, c_asym_max, diag_max, pw, th)
-    st_for_score = "MUST" if st == "NG" else st
-    score = quality_score_xy(
-        wx if pd.notna(wx) else 0.0,
-        wy if pd.notna(wy) else 0.0,
-        st_for_score, th=th,
-    )
 
-    rows_out = []
-    for _, r in df.iterrows():
-        row_dict = {}
-        for c in df.columns:
-            v = r[c]
-            row_dict[c] = round(float(v), 4) if pd.notna(v) and isinstance(v, (int, float, np.floating, np.integer)) else v
-        rows_out.append(row_dict)
+def _round4_cell(v):
+    return round(float(v), 4) if pd.notna(v) and isinstance(v, (int, float, np.floating, np.integer)) else v
+
 
+def _sim_rows(df: pd.DataFrame, adj: np.ndarray | None = None) -> List[Dict]:
+    """row_df → rows 목록 (숫자는 소수 4자리). adj가 있으면 X/Y 5컬럼은 보정 후 값으로 대체."""
+    cols = {}
+    for c in df.columns:
+        if adj is not None and c in _SIM_ADJ_COLUMNS:
+            cols[c] = adj[:, ROW_VALUE_COLUMNS.index(c)].tolist()
+        else:
+            cols[c] = df[c].tolist()
+    return [{c: _round4_cell(vals[i]) for c, vals in cols.items()} for i in range(len(df))]
+
+
+def _sim_status(sc: Dict[str, np.ndarray]) -> np.ndarray:
+    # sheet_status 원래 라벨(MUST) 유지
+    return np.where(sc["ng"], "MUST", np.where(sc["check"], "CHECK", "OK")).astype(object)
+
+
+def _sim_summary(sc: Dict[str, np.ndarray], status: np.ndarray, k: int) -> Dict:
+    wx, wy = float(sc["worst_x"][k]), float(sc["worst_y"][k])
     return {
-        "worstX": round(float(wx), 4) if pd.notna(wx) else None,
-        "worstY": round(float(wy), 4) if pd.notna(wy) else None,
-        "score": round(float(score), 1),
-        "status": st,
-        "rows": rows_out,
+        "worstX": round(wx, 4) if wx == wx else None,
+        "worstY": round(wy, 4) if wy == wy else None,
+        "score": round(float(sc["score"][k]), 1),
+        "status": status[k],
     }
 
 
+def offset_arrays(offsets_list: List[Dict[str, object]]) -> Tuple[np.ndarray, ...]:
+    """
+    오프셋 dict 목록 → (printing_x (n,), printing_y (n,), slitter_y (n,12), assembly_x (n,12), assembly_y (n,12)).
+    Row별 배열은 12개로 0 패딩(초과분은 무시).
+    """
+    def _rows(key: str) -> np.ndarray:
+        out = np.zeros((len(offsets_list), SIM_OFFSET_ROWS))
+        for k, o in enumerate(offsets_list):
+            vals = list(o.get(key) or [])[:SIM_OFFSET_ROWS]
+            out[k, : len(vals)] = vals
+        return out
+
+    px = np.array([float(o.get("printing_x", 0.0) or 0.0) for o in offsets_list])
+    py = np.array([float(o.get("printing_y", 0.0) or 0.0) for o in offsets_list])
+    return px, py, _rows("slitter_y"), _rows("assembly_x"), _rows("assembly_y")
+
+
+def apply_offsets(
+    v: np.ndarray,
+    printing_x: np.ndarray,
+    printing_y: np.ndarray,
+    slitter_y: np.ndarray,
+    assembly_x: np.ndarray,
+    assembly_y: np.ndarray,
+) -> np.ndarray:
+    """
+    Row 값 행렬 v (..., n_rows, 7)에 후보 n개의 오프셋 적용 → (n, ..., n_rows, 7). 앞쪽 차원(시트)에는 같은 오프셋.
+    X(L/R) -= printing_x + assembly_x[r], Y(L/C/R) -= printing_y + slitter_y[r] + assembly_y[r], 타발홀은 그대로.
+    """
+    ridx = np.minimum(np.arange(v.shape[-2]), SIM_OFFSET_ROWS - 1)
+    shape = (len(printing_x),) + (1,) * (v.ndim - 2) + (v.shape[-2], 1)
+    ox = (printing_x[:, None] + assembly_x[:, ridx]).reshape(shape)
+    oy = (printing_y[:, None] + slitter_y[:, ridx] + assembly_y[:, ridx]).reshape(shape)
+    out = np.repeat(v[None], len(printing_x), axis=0)
+    out[..., _IX_X] -= ox
+    out[..., _IX_Y] -= oy
+    return out
+
+
 def simulate_adjustment(
     row_df: pd.DataFrame,
     offsets: Dict[str, object],
@@ -1347,90 +1667,202 @@ def simulate_adjustment(
     -------
     {"before": {...}, "after": {...}, "perRow": [...]}
     """
-    px = float(offsets.get("printing_x", 0.0) or 0.0)
-    py = float(offsets.get("printing_y", 0.0) or 0.0)
-    sy = list(offsets.get("slitter_y") or [])
-    ax = list(offsets.get("assembly_x") or [])
-    ay = list(offsets.get("assembly_y") or [])
-    # 12개로 패딩
-    while len(sy) < 12:
-        sy.append(0.0)
-    while len(ax) < 12:
-        ax.append(0.0)
-    while len(ay) < 12:
-        ay.append(0.0)
-
-    before = _metrics_from_df(row_df, th)
-
-    adj = row_df.copy()
-    for i in range(len(adj)):
-        idx = i if i < 12 else 11
-        adj.iloc[i, adj.columns.get_loc("조립치우침L")] = (
-            _safe_sub(row_df.iloc[i]["조립치우침L"], px + ax[idx])
-        )
-        adj.iloc[i, adj.columns.get_loc("조립치우침R")] = (
-            _safe_sub(row_df.iloc[i]["조립치우침R"], px + ax[idx])
-        )
-        adj.iloc[i, adj.columns.get_loc("상하치우침L")] = (
-            _safe_sub(row_df.iloc[i]["상하치우침L"], py + sy[idx] + ay[idx])
-        )
-        adj.iloc[i, adj.columns.get_loc("상하치우침C")] = (
-            _safe_sub(row_df.iloc[i]["상하치우침C"], py + sy[idx] + ay[idx])
-        )
-        adj.iloc[i, adj.columns.get_loc("상하치우침R")] = (
-            _safe_sub(row_df.iloc[i]["상하치우침R"], py + sy[idx] + ay[idx])
-        )
+    v = _row_value_matrix(row_df)
+    adj = apply_offsets(v, *offset_arrays([offsets]))[0]
 
-    after = _metrics_from_df(adj, th)
+    # before/after를 (2, n_rows, 7) 한 번으로 판정 (Row별 C_ASYM/diag 최대는 0부터 시작)
+    both = np.stack([v, adj])
+    sc = _sheet_scores(both, th or {}, c_init=0.0)
+    status = _sim_status(sc)
+    before = {**_sim_summary(sc, status, 0), "rows": _sim_rows(row_df)}
+    after = {**_sim_summary(sc, status, 1), "rows": _sim_rows(row_df, adj)}
 
     # perRow 비교
-    per_row = []
-    for i in range(len(row_df)):
-        r_orig = row_df.iloc[i]
-        r_adj = adj.iloc[i]
-        row_num = int(r_orig.get("Row", i + 1))
-        bx = worst_abs([r_orig.get("조립치우침L"), r_orig.get("조립치우침R")])
-        by = worst_abs([r_orig.get("상하치우침L"), r_orig.get("상하치우침C"), r_orig.get("상하치우침R")])
-        ax_ = worst_abs([r_adj.get("조립치우침L"), r_adj.get("조립치우침R")])
-        ay_ = worst_abs([r_adj.get("상하치우침L"), r_adj.get("상하치우침C"), r_adj.get("상하치우침R")])
-        per_row.append({
-            "row": row_num,
-            "beforeX": round(float(bx), 4) if pd.notna(bx) else None,
-            "beforeY": round(float(by), 4) if pd.notna(by) else None,
-            "afterX": round(float(ax_), 4) if pd.notna(ax_) else None,
-            "afterY": round(float(ay_), 4) if pd.notna(ay_) else None,
-        })
+    sev_x = _nan_absmax(both[..., _IX_X])
+    sev_y = _nan_absmax(both[..., _IX_Y])
+    row_ids = row_df["Row"].tolist() if "Row" in row_df.columns else list(range(1, len(row_df) + 1))
+
+    def _r4(x) -> Optional[float]:
+        return round(float(x), 4) if x == x else None
+
+    per_row = [
+        {
+            "row": int(row_ids[i]),
+            "beforeX": _r4(sev_x[0, i]),
+            "beforeY": _r4(sev_y[0, i]),
+            "afterX": _r4(sev_x[1, i]),
+            "afterY": _r4(sev_y[1, i]),
+        }
+        for i in range(len(row_df))
+    ]
 
     return {"before": before, "after": after, "perRow": per_row}
 
 
-def _safe_sub(v, offset):
-    """NaN-safe 뺄셈."""
-    fv = pd.to_numeric(v, errors="coerce")
-    if pd.isna(fv):
-        return np.nan
-    return float(fv) - float(offset)
+def simulate_sweep(
+    row_df: pd.DataFrame,
+    printing_x: np.ndarray,
+    printing_y: np.ndarray,
+    slitter_y: np.ndarray,
+    assembly_x: np.ndarray,
+    assembly_y: np.ndarray,
+    th: Dict[str, float] | None = None,
+) -> Dict[str, np.ndarray]:
+    """
+    후보 오프셋 n개의 After 지표를 한 번에 계산 (offset_arrays 형식 입력).
+    반환: worstX/worstY (|worst|, NaN=값 없음), score, status — 각 (n,), simulate_adjustment의 after와 같은 값
+    """
+    adj = apply_offsets(_row_value_matrix(row_df), printing_x, printing_y, slitter_y, assembly_x, assembly_y)
+    sc = _sheet_scores(adj, th or {}, c_init=0.0)
+    return {"worstX": sc["worst_x"], "worstY": sc["worst_y"], "score": sc["score"], "status": _sim_status(sc)}
+
+
+# 장비 보정 한계 (mm) — step: 최소 조정 단위(화면 WheelSlider와 동일), range: ±최대 조정량
+OFFSET_LIMITS: Dict[str, Dict[str, float]] = {
+    "printing": {"step": 0.001, "range": 0.3},
+    "slitter": {"step": 0.01, "range": 0.3},
+    "assembly": {"step": 0.01, "range": 0.3},
+}
+
+
+RECOMMEND_MODES = ("heuristic", "optimize")
+
+
+def _r4_list(a) -> List[float]:
+    return [round(float(x), 4) + 0.0 for x in a]  # + 0.0: -0.0 → 0.0
+
+
+def _recommend_heuristic(v: np.ndarray, slitter_available: bool) -> Dict:
+    """기존 3단계 규칙 (프린팅 = worst/2, 슬리터/조립기 = Row 잔여 평균)."""
+    n = min(len(v), SIM_OFFSET_ROWS)
+
+    # Step 1: 프린팅 전역 — 부호 포함 worst (동률이면 Row 순서상 앞쪽)
+    def _half_worst(cols: slice) -> float:
+        flat = v[:, cols].ravel()
+        i = int(_first_absmax_idx(flat))
+        return round(float(flat[i]) / 2.0, 4) if i >= 0 else 0.0
+
+    printing_x = _half_worst(_IX_X)
+    printing_y = _half_worst(_IX_Y)
+
+    def _row_mean(vals: np.ndarray) -> np.ndarray:
+        cnt = (~np.isnan(vals)).sum(axis=1)
+        return np.where(cnt > 0, np.nansum(vals, axis=1) / np.maximum(cnt, 1), 0.0)
+
+    vx, vy = v[:n, _IX_X], v[:n, _IX_Y]
+
+    # Step 2: 슬리터 Row별 Y (프린팅 적용 후)
+    # Row 평균은 np.round (기존 round(np.float64)와 같은 반올림)
+    slitter_y = np.zeros(SIM_OFFSET_ROWS)
+    if slitter_available:
+        slitter_y[:n] = np.round(_row_mean(vy - printing_y), 4)
+
+    # Step 3: 조립기 Row별 X+Y (프린팅+슬리터 적용 후)
+    assembly_x = np.zeros(SIM_OFFSET_ROWS)
+    assembly_y = np.zeros(SIM_OFFSET_ROWS)
+    assembly_x[:n] = np.round(_row_mean(vx - printing_x), 4)
+    assembly_y[:n] = np.round(_row_mean(vy - printing_y - slitter_y[:n, None]), 4)
+
+    return {
+        "printing_x": printing_x,
+        "printing_y": printing_y,
+        "slitter_y": slitter_y.tolist(),
+        "assembly_x": assembly_x.tolist(),
+        "assembly_y": assembly_y.tolist(),
+    }
+
+
+def _slot_bounds(vals: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(..., n_rows, k) 값 → Row 오프셋 슬롯(12개)별 (최소, 최대), 형태 (..., 12). 13번째 Row부터는 12번째 슬롯에 합침, 값 없으면 NaN."""
+    row_lo = np.fmin.reduce(vals, axis=-1, initial=np.nan)
+    row_hi = np.fmax.reduce(vals, axis=-1, initial=np.nan)
+    n = min(vals.shape[-2], SIM_OFFSET_ROWS)
+    lo = np.full(vals.shape[:-2] + (SIM_OFFSET_ROWS,), np.nan)
+    hi = np.full(vals.shape[:-2] + (SIM_OFFSET_ROWS,), np.nan)
+    lo[..., :n] = row_lo[..., :n]
+    hi[..., :n] = row_hi[..., :n]
+    if vals.shape[-2] > SIM_OFFSET_ROWS:
+        lo[..., -1] = np.fmin.reduce(row_lo[..., SIM_OFFSET_ROWS - 1 :], axis=-1, initial=np.nan)
+        hi[..., -1] = np.fmax.reduce(row_hi[..., SIM_OFFSET_ROWS - 1 :], axis=-1, initial=np.nan)
+    return lo, hi
+
+
+def _snap(x: np.ndarray, lim: Dict[str, float]) -> np.ndarray:
+    """장비 단위로 반올림 + 범위 제한."""
+    k = round(lim["range"] / lim["step"])
+    return np.clip(np.round(x / lim["step"]), -k, k) * lim["step"]
+
+
+def _solve_axis(vals: np.ndarray, glob: Dict[str, float], locs: List[Dict[str, float]]) -> Tuple[float, List[np.ndarray]]:
+    """
+    축 1개 minimax — 잔차 = 값 - (전역 g + Row 로컬 오프셋 합), 목표: 모든 Row의 |잔차| 최대값 최소화.
+    g 후보(전역 장비 step 격자) 전체를 (G, 12) 배열로 평가: Row 로컬은 장비 순서대로 남은 양을 단위/범위 내에서 분담.
+    동률이면 로컬 이동량 합 → |g| 작은 쪽.
+    """
+    lo, hi = _slot_bounds(vals)
+    has = ~np.isnan(lo)
+    mid = np.where(has, (lo + hi) / 2.0, 0.0)
+    half = (hi - lo) / 2.0
+
+    k = round(glob["range"] / glob["step"])
+    g = np.arange(-k, k + 1) * glob["step"]
+    rem = np.where(has, mid[None, :] - g[:, None], 0.0)
+    offs = []
+    for lim in locs:
+        o = _snap(rem, lim)
+        offs.append(o)
+        rem = rem - o
+
+    worst = np.fmax.reduce(np.where(has, half + np.abs(rem), np.nan), axis=1, initial=np.nan)
+    moved = sum((np.abs(o).sum(axis=1) for o in offs), np.zeros_like(g))
+    best = np.lexsort((np.abs(g), np.round(moved, 6), np.round(np.nan_to_num(worst), 6)))[0]
+    return float(g[best]), [o[best] for o in offs]
+
+
+def _recommend_optimize(v: np.ndarray, slitter_available: bool, limits: Dict[str, Dict[str, float]]) -> Dict:
+    """X/Y는 서로 독립(X: 프린팅+조립기, Y: 프린팅+슬리터+조립기) → 축별 minimax = qualityScore 최대."""
+    px, (ax,) = _solve_axis(v[:, _IX_X], limits["printing"], [limits["assembly"]])
+    if slitter_available:
+        py, (sy, ay) = _solve_axis(v[:, _IX_Y], limits["printing"], [limits["slitter"], limits["assembly"]])
+    else:
+        py, (ay,) = _solve_axis(v[:, _IX_Y], limits["printing"], [limits["assembly"]])
+        sy = np.zeros(SIM_OFFSET_ROWS)
+    return {
+        "printing_x": round(px, 4) + 0.0,
+        "printing_y": round(py, 4) + 0.0,
+        "slitter_y": _r4_list(sy),
+        "assembly_x": _r4_list(ax),
+        "assembly_y": _r4_list(ay),
+    }
+
+
+def _merge_limits(limits: Dict[str, Dict[str, float]] | None) -> Dict[str, Dict[str, float]]:
+    return {name: {**base, **((limits or {}).get(name) or {})} for name, base in OFFSET_LIMITS.items()}
 
 
 def compute_recommended_offsets(
     row_df: pd.DataFrame,
     slitter_available: bool = True,
+    mode: str = "heuristic",
+    limits: Dict[str, Dict[str, float]] | None = None,
+    th: Dict[str, float] | None = None,
 ) -> Dict:
     """
-    Worst Row 기준 3단계 추천 오프셋 산출.
+    추천 오프셋 산출.
 
-    Step 1 (프린팅 전역):
-      worst_x_val = 부호 포함 worst X값 → printing_x = -(worst_x_val / 2)
-      worst_y_val = 부호 포함 worst Y값 → printing_y = -(worst_y_val / 2)
+    mode="heuristic" (기존, Worst Row 기준 3단계):
+      Step 1 (프린팅 전역): printing_x/y = 부호 포함 worst X/Y값 / 2
+      Step 2 (슬리터 Row별 Y): 프린팅 적용 후 각 Row의 잔여 Y 평균
+      Step 3 (조립기 Row별 X+Y): 프린팅+슬리터 적용 후 각 Row의 잔여 평균
 
-    Step 2 (슬리터 Row별 Y):
-      프린팅 적용 후, 각 Row의 잔여 Y 평균 → slitter_y[r] = -mean(잔여 L, C, R)
-
-    Step 3 (조립기 Row별 X+Y):
-      프린팅+슬리터 적용 후, 각 Row의 잔여 → assembly_x/y
+    mode="optimize":
+      프린팅/슬리터/조립기를 함께 풀어 최대 |잔차|(worstX/worstY) 최소화 = qualityScore 최대.
+      장비 단위/범위는 OFFSET_LIMITS (limits로 장비별 덮어쓰기).
+      결과에 predicted {worstX, worstY, score, status} (simulate_adjustment의 after와 동일) 추가.
     """
-    nrows = len(row_df)
-    if nrows == 0:
+    if mode not in RECOMMEND_MODES:
+        raise ValueError(f"unknown mode: {mode}")
+    if mode == "heuristic" and len(row_df) == 0:
         return {
             "printing_x": 0.0, "printing_y": 0.0,
             "slitter_y": [0.0] * 12,
@@ -1438,66 +1870,127 @@ def compute_recommended_offsets(
             "assembly_y": [0.0] * 12,
         }
 
-    # --- Step 1: 프린팅 전역 (Worst Row 기준) ---
-    # X: 부호 포함으로 worst 찾기
-    all_x = []
-    for _, r in row_df.iterrows():
-        for col in ("조립치우침L", "조립치우침R"):
-            v = pd.to_numeric(r.get(col), errors="coerce")
-            if pd.notna(v):
-                all_x.append(float(v))
-    worst_x_val = max(all_x, key=abs) if all_x else 0.0
-    printing_x = round(worst_x_val / 2.0, 4)
-
-    all_y = []
-    for _, r in row_df.iterrows():
-        for col in ("상하치우침L", "상하치우침C", "상하치우침R"):
-            v = pd.to_numeric(r.get(col), errors="coerce")
-            if pd.notna(v):
-                all_y.append(float(v))
-    worst_y_val = max(all_y, key=abs) if all_y else 0.0
-    printing_y = round(worst_y_val / 2.0, 4)
-
-    # --- Step 2: 슬리터 Row별 Y (프린팅 적용 후) ---
-    slitter_y_out = [0.0] * 12
-    if slitter_available:
-        for i in range(min(nrows, 12)):
-            r = row_df.iloc[i]
-            residuals = []
-            for col in ("상하치우침L", "상하치우침C", "상하치우침R"):
-                v = pd.to_numeric(r.get(col), errors="coerce")
-                if pd.notna(v):
-                    residuals.append(float(v) - printing_y)
-            if residuals:
-                slitter_y_out[i] = round(np.mean(residuals), 4)
-
-    # --- Step 3: 조립기 Row별 X+Y (프린팅+슬리터 적용 후) ---
-    assembly_x_out = [0.0] * 12
-    assembly_y_out = [0.0] * 12
-    for i in range(min(nrows, 12)):
-        r = row_df.iloc[i]
-        # X 잔여
-        x_res = []
-        for col in ("조립치우침L", "조립치우침R"):
-            v = pd.to_numeric(r.get(col), errors="coerce")
-            if pd.notna(v):
-                x_res.append(float(v) - printing_x)
-        if x_res:
-            assembly_x_out[i] = round(np.mean(x_res), 4)
-
-        # Y 잔여 (프린팅 + 슬리터 적용 후)
-        y_res = []
-        for col in ("상하치우침L", "상하치우침C", "상하치우침R"):
-            v = pd.to_numeric(r.get(col), errors="coerce")
-            if pd.notna(v):
-                y_res.append(float(v) - printing_y - slitter_y_out[i])
-        if y_res:
-            assembly_y_out[i] = round(np.mean(y_res), 4)
+    v = _row_value_matrix(row_df)
+    if mode == "heuristic":
+        return _recommend_heuristic(v, slitter_available)
 
-    return {
-        "printing_x": printing_x,
-        "printing_y": printing_y,
-        "slitter_y": slitter_y_out,
-        "assembly_x": assembly_x_out,
-        "assembly_y": assembly_y_out,
+    rec = _recommend_optimize(v, slitter_available, _merge_limits(limits))
+    sc = _sheet_scores(apply_offsets(v, *offset_arrays([rec])), th or {}, c_init=0.0)
+    rec["predicted"] = _sim_summary(sc, _sim_status(sc), 0)
+    return rec
+
+
+def _lattice(lim: Dict[str, float]) -> np.ndarray:
+    k = round(lim["range"] / lim["step"])
+    return np.arange(-k, k + 1) * lim["step"]
+
+
+def _best_candidate(mean: np.ndarray, moved: np.ndarray) -> int:
+    """평균 점수 최대, 동률이면 이동량 최소 (현재 값도 후보에 있으므로 점수가 나빠지지 않음)."""
+    return int(np.lexsort((np.round(moved, 6), -np.round(mean, 6)))[0])
+
+
+def compute_job_recommended_offsets(
+    row_dfs: List[pd.DataFrame],
+    slitter_available: bool = True,
+    limits: Dict[str, Dict[str, float]] | None = None,
+    th: Dict[str, float] | None = None,
+    max_rounds: int = 4,
+) -> Dict:
+    """
+    여러 시트(Job/로트)에 공통으로 적용할 오프셋 1세트 — 프린팅 1개 + Row별 슬리터/조립기.
+
+    목표: 전체 시트 평균 qualityScore 최대 (NG 시트는 0점 → NG 구제가 우선).
+      시트마다 쏠림이 달라 worst 시트 하나에 맞추면(minimax) 나머지 시트가 나빠지므로,
+      시트×Row 슬롯별 (최소, 최대) (n_sheets, 12) 배열만으로 후보 점수를 한 번에 계산해 좌표 탐색:
+        1) 프린팅 X/Y: 장비 step 격자 전체를 후보로 평가
+        2) Row 슬롯별 로컬(조립기 X, 슬리터+조립기 Y): 로컬 합 격자를 장비 순서대로 분담해 평가
+      0 오프셋에서 시작하고 현재 값보다 좋아질 때만 바꾸므로 before보다 평균 점수가 낮아지지 않음.
+      (C_ASYM/타발홀 CHECK는 오프셋과 무관, diag CHECK는 탐색에서 제외 → after는 _sheet_scores로 정확히 재계산)
+
+    반환: {"offsets": {...}, "before": {...}, "after": {...}}
+      before/after: 시트별 배열 worst_x/worst_y/score/ng/check (_sheet_scores) + status(MUST/CHECK/OK), 입력 순서
+    """
+    th = th or {}
+    lim = _merge_limits(limits)
+    ng_x = _th(th, "ng_x", default=0.15)
+    ng_y = _th(th, "ng_y", default=0.15)
+    check_x = _th(th, "tag_x", "x_tag", default=0.10)
+    check_y = _th(th, "tag_y", "y_tag", default=0.10)
+
+    v = stack_row_values(row_dfs)
+    before = _sheet_scores(v, th, c_init=0.0)
+    fixed_check = (before["c_asym"] >= _th(th, "th_asym", "casym", default=0.10)) | (
+        before["punch"] >= _th(th, "tag_punch", "punch", default=0.10))
+
+    bounds = {"x": _slot_bounds(v[..., _IX_X]), "y": _slot_bounds(v[..., _IX_Y])}
+    chains = {"x": [lim["assembly"]], "y": [lim["slitter"], lim["assembly"]] if slitter_available else [lim["assembly"]]}
+    glob = {"x": 0.0, "y": 0.0}
+    locs = {ax: [np.zeros(SIM_OFFSET_ROWS) for _ in chains[ax]] for ax in chains}
+
+    def _shift(ax: str) -> np.ndarray:
+        return glob[ax] + sum(locs[ax])
+
+    def _worst(ax: str, t: np.ndarray) -> np.ndarray:
+        """슬롯별 총 이동량 t (..., 12) → 시트별 |잔차| 최대 (..., n_sheets)."""
+        lo, hi = bounds[ax]
+        t = t[..., None, :]
+        return np.fmax.reduce(np.fmax(hi - t, t - lo), axis=-1, initial=np.nan)
+
+    def _mean(ax: str, w: np.ndarray) -> np.ndarray:
+        """후보별 ax축 worst (K, n_sheets), 다른 축은 현재 값 → 후보별 평균 점수 (K,)."""
+        other = _worst("y" if ax == "x" else "x", _shift("y" if ax == "x" else "x"))
+        wx, wy = (w, other) if ax == "x" else (other, w)
+        ng = (wx >= ng_x) | (wy >= ng_y)
+        check = fixed_check | (wx >= check_x) | (wy >= check_y)
+        return _xy_score(wx, wy, ng, check, ng_x, ng_y).mean(axis=-1)
+
+    g_cand = _lattice(lim["printing"])
+    for _ in range(max_rounds):
+        changed = False
+        for ax in ("x", "y"):
+            # 1) 프린팅 (전역) — 모든 슬롯이 같이 움직이므로 시트별 max(hi - 로컬) - g, g - min(lo - 로컬)만 필요
+            lo, hi = bounds[ax]
+            loc = sum(locs[ax])
+            top = np.fmax.reduce(hi - loc, axis=-1, initial=np.nan)
+            bot = np.fmin.reduce(lo - loc, axis=-1, initial=np.nan)
+            g = g_cand[:, None]
+            best = _best_candidate(_mean(ax, np.fmax(top - g, g - bot)), np.abs(g_cand))
+            changed |= bool(g_cand[best] != glob[ax])
+            glob[ax] = float(g_cand[best])
+
+            # 2) Row 슬롯별 로컬 — 합 격자 후보를 장비 순서대로 단위/범위 내에서 분담
+            fine = min(l["step"] for l in chains[ax])
+            k = round(sum(l["range"] for l in chains[ax]) / fine)
+            rem = np.arange(-k, k + 1) * fine
+            parts = []
+            for l in chains[ax]:
+                o = _snap(rem, l)
+                parts.append(o)
+                rem = rem - o
+            cand = sum(parts)
+            moved = sum(np.abs(o) for o in parts)
+            for r in range(SIM_OFFSET_ROWS):
+                t = _shift(ax)
+                resid = np.fmax(hi - t, t - lo)
+                resid[:, r] = np.nan
+                other = np.fmax.reduce(resid, axis=-1, initial=np.nan)  # 나머지 슬롯 최대 (n_sheets,)
+                tr = (glob[ax] + cand)[:, None]
+                w = np.fmax(other, np.fmax(hi[:, r] - tr, tr - lo[:, r]))
+                best = _best_candidate(_mean(ax, w), moved)
+                for o, p in zip(locs[ax], parts):
+                    changed |= bool(o[r] != p[best])
+                    o[r] = p[best]
+        if not changed:
+            break
+
+    rec = {
+        "printing_x": round(glob["x"], 4) + 0.0,
+        "printing_y": round(glob["y"], 4) + 0.0,
+        "slitter_y": _r4_list(locs["y"][0] if slitter_available else np.zeros(SIM_OFFSET_ROWS)),
+        "assembly_x": _r4_list(locs["x"][0]),
+        "assembly_y": _r4_list(locs["y"][-1]),
     }
+    after = _sheet_scores(apply_offsets(v, *offset_arrays([rec]))[0], th, c_init=0.0)
+    before["status"], after["status"] = _sim_status(before), _sim_status(after)
+    return {"offsets": rec, "before": before, "after": after}
@@ -0,0 +1,357 @@
+# -*- coding: utf-8 -*-
+"""
+# [FILE] ingest.py
+# [PURPOSE] Step1 측정 CSV 배치 파싱 — 파일별 decode/parse/pivot/detail을 프로세스 풀로 분산
+#           Step2 공정마진 — 프린팅/슬리터 파일별 분석을 같은 풀에서 동시 실행 (+ 프린팅 합산)
+#
+# [INPUT]
+# - (upload_index, filename, raw bytes) 목록
+# - 공정마진: 프린팅/슬리터 (filename, raw bytes) 목록
+#
+# [OUTPUT]
+# - 업로드 순서와 같은 순서의 파일별 결과 dict
+#   성공: {idx, filename, meta, row_df, detail}
+#   실패: {idx, filename, meta, reason}
+# - 공정마진: ProcessMargin (main에서 ProcessData로 저장)
+#
+# [CONFIG] (환경변수)
+# - ISENS_INGEST_WORKERS   : 워커 프로세스 수 (기본 CPU 수, 0/1이면 풀 미사용)
+# - ISENS_INGEST_MIN_FILES : 이 개수 미만 업로드는 풀 없이 스레드 1개에서 처리 (기본 8)
+#                            (공정마진은 프린팅+슬리터 파일 수 기준)
+#
+# [NOTE]
+# - 워커 함수는 core만 import하는 이 모듈에 둔다(spawn 방식에서 main/FastAPI 재import 방지)
+# - 중복 시트 최신 선택(_extract_time_key)은 main에서 결과를 모은 뒤 업로드 순서대로 수행
+# - 같은 내용의 파일은 parse_cache(원본 해시 기준)에서 바로 꺼내고 워커로 보내지 않음
+#   (detail은 th=None 기본 임계값 기준이므로 캐시 가능)
+"""
+from __future__ import annotations
+
+import ast
+import asyncio
+import math
+import os
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import pandas as pd
+from starlette.concurrency import run_in_threadpool
+
+import core
+from parse_cache import PARSE_CACHE
+
+
+INGEST_WORKERS = int(os.environ.get("ISENS_INGEST_WORKERS", os.cpu_count() or 1))
+INGEST_MIN_FILES = int(os.environ.get("ISENS_INGEST_MIN_FILES", "8"))
+
+_POOL: Optional[ProcessPoolExecutor] = None
+
+
+def _get_pool() -> Optional[ProcessPoolExecutor]:
+    """워커 풀(지연 생성). 워커 수가 1 이하면 None."""
+    global _POOL
+    if INGEST_WORKERS <= 1:
+        return None
+    if _POOL is None:
+        _POOL = ProcessPoolExecutor(max_workers=INGEST_WORKERS)
+    return _POOL
+
+
+def shutdown_pool() -> None:
+    global _POOL
+    if _POOL is not None:
+        _POOL.shutdown(wait=False, cancel_futures=True)
+        _POOL = None
+
+
+# =============================================================================
+# 파일 1개 처리 (워커 프로세스에서 실행)
+# =============================================================================
+def _check_filename(idx: int, filename: str) -> Tuple[Dict, Optional[Dict]]:
+    """파일명 메타 파싱 → (meta, 실패 결과 or None)."""
+    meta = core.parse_filename(filename)
+
+    # 파일명 파싱 실패(필수 메타 없음) 처리
+    if meta.get("시트넘버") is None or not meta.get("일자") or not meta.get("라인명") or not meta.get("로트명"):
+        return meta, {"idx": idx, "filename": filename, "meta": meta, "reason": "filename_parse_failed"}
+    return meta, None
+
+
+def parse_measurement_file(idx: int, filename: str, raw: bytes) -> Dict:
+    """측정 CSV 1개 → 메타/Row 데이터/디테일. (시트 리스트 점수는 main에서 core.score_sheets로 일괄 계산)"""
+    meta, failed = _check_filename(idx, filename)
+    if failed is not None:
+        return failed
+
+    try:
+        long_df = core.read_measurement_csv(raw)
+        row_df = core.pivot_row_values(long_df)
+        detail = core.build_step1_detail_summary(row_df, th=None)  # th는 추후 settings에서 주입
+    except Exception as e:
+        return {"idx": idx, "filename": filename, "meta": meta, "reason": f"parse_failed: {type(e).__name__}"}
+
+    return {"idx": idx, "filename": filename, "meta": meta, "row_df": row_df, "detail": detail}
+
+
+def _parse_chunk(items: List[Tuple[int, str, bytes]]) -> List[Dict]:
+    return [parse_measurement_file(i, fn, raw) for i, fn, raw in items]
+
+
+# =============================================================================
+# 배치 처리 (이벤트 루프 비블로킹)
+# =============================================================================
+async def _iter_parsed(items: List[Tuple[int, str, bytes]]) -> AsyncIterator[Dict]:
+    """
+    파일 목록을 병렬 처리하면서 결과를 입력 순서대로 즉시 내보낸다.
+    - 파일 수가 적거나 풀이 없으면 스레드풀에서 파일 1개씩 처리
+    - 그 외에는 워커당 약 4개 청크로 나눠 IPC 오버헤드를 줄이고,
+      먼저 끝난 청크는 앞 청크가 끝날 때까지 버퍼링
+    """
+    if not items:
+        return
+
+    pool = _get_pool()
+    if pool is None or len(items) < INGEST_MIN_FILES:
+        for item in items:
+            yield await run_in_threadpool(parse_measurement_file, *item)
+        return
+
+    chunk = max(1, math.ceil(len(items) / (INGEST_WORKERS * 4)))
+    loop = asyncio.get_running_loop()
+    futures = [
+        loop.run_in_executor(pool, _parse_chunk, items[i : i + chunk])
+        for i in range(0, len(items), chunk)
+    ]
+    try:
+        for fut in futures:
+            for res in await fut:
+                yield res
+    finally:
+        for fut in futures:
+            fut.cancel()
+
+
+async def iter_measurement_files(items: List[Tuple[int, str, bytes]]) -> AsyncIterator[Dict]:
+    """
+    업로드 순서대로 파일별 결과를 내보낸다(스트리밍 업로드용).
+    - 원본 바이트 해시가 parse_cache에 있으면 파싱 없이 바로 결과 생성
+    - 나머지만 워커로 보내고, 성공 결과는 캐시에 저장
+    """
+    keys: Dict[int, str] = {}
+    cached: Dict[int, Dict] = {}
+    misses: List[Tuple[int, str, bytes]] = []
+    for idx, filename, raw in items:
+        key = PARSE_CACHE.key(raw, "measurement")
+        hit = PARSE_CACHE.get(key)
+        if hit is None:
+            keys[idx] = key
+            misses.append((idx, filename, raw))
+        else:
+            cached[idx] = hit
+
+    parsed_iter = _iter_parsed(misses)
+    try:
+        for idx, filename, _raw in items:
+            hit = cached.get(idx)
+            if hit is None:
+                res = await anext(parsed_iter)
+                if "reason" not in res:
+                    PARSE_CACHE.put(keys[idx], {k: res[k] for k in ("row_df", "detail")})
+                yield res
+                continue
+            meta, failed = _check_filename(idx, filename)
+            yield failed if failed is not None else {"idx": idx, "filename": filename, "meta": meta, **hit}
+    finally:
+        await parsed_iter.aclose()
+
+
+async def ingest_measurement_files(items: List[Tuple[int, str, bytes]]) -> List[Dict]:
+    """파일 목록을 병렬 처리하고 업로드 순서대로 결과 전체를 반환한다."""
+    return [res async for res in iter_measurement_files(items)]
+
+
+# =============================================================================
+# Step2 공정마진 (워커 프로세스에서 실행되는 단위 작업)
+# - 파일끼리 독립: 프린팅 파일별 5대 분석(원단/스텐실/카본/절연/간섭), 슬리터 파일별 파싱/분류
+# - 슬리터 타발폭/전체폭은 전체 파일의 항목을 모아 core 배치 커널 1회 (파일 수와 무관하게 numpy 연산 몇 번)
+# - 파일별 결과는 원본 해시 기준 parse_cache에 저장 → 같은 파일은 다시 계산하지 않음
+# - 프린팅 합산(파일 전체) 결과는 파일별 결과만으로 조립 (merge_printing: concat/재분류 없음, 추가 업로드에도 사용)
+# =============================================================================
+@dataclass
+class ProcessMargin:
+    printing_calcs: List[Dict[Tuple, float]] = field(default_factory=list)   # 파일별 calc (업로드 순서)
+    printing_entries: List[Dict] = field(default_factory=list)               # 파일별 분석 (업로드 순서, 합산용)
+    printing_by_file: Dict[str, Dict] = field(default_factory=dict)          # { filename: 파일별 분석 }
+    slitter_by_file: Dict[str, List[Dict]] = field(default_factory=dict)
+    slitter_total_by_file: Dict[str, List[Dict]] = field(default_factory=dict)
+
+
+def _printing_layer(calc_map: Dict[Tuple, float], layer: str, ref: str) -> Tuple[str, List[Dict]]:
+    rp_name, rp = core._pick_row_points(calc_map, layer=layer, ref=ref)
+    return rp_name, core.compute_printing_layer(calc_map, layer, ref=ref, row_points=rp)
+
+
+def _printing_layers(calc_map: Dict[Tuple, float]) -> Dict:
+    """카본/절연(타발기준) + 간섭(카본기준) 12행 — 해당 항목이 없으면 빈 결과."""
+    out = {
+        "carbon": [], "rowPointsCarbon": "",
+        "insulation": [], "rowPointsInsulation": "",
+        "interference": [], "rowPointsInterference": "",
+    }
+    layers = {k[1] for k in calc_map}
+    if "카본" in layers:
+        out["rowPointsCarbon"], out["carbon"] = _printing_layer(calc_map, "카본", "타발기준")
+    if "절연" in layers:
+        out["rowPointsInsulation"], out["insulation"] = _printing_layer(calc_map, "절연", "타발기준")
+    if any(k[0] == "카본기준" for k in calc_map):
+        out["rowPointsInterference"], out["interference"] = _printing_layer(calc_map, "절연", "카본기준")
+    return out
+
+
+def printing_calc_from_entry(entry: Dict) -> Dict[Tuple, float]:
+    """저장된 파일별 분석의 printingCalc(문자열 키) → (ref, layer, axis, point) 키 calc."""
+    return {ast.literal_eval(k): v for k, v in entry["printingCalc"].items()}
+
+
+def _printing_file_margin(raw: bytes) -> Tuple[Dict[Tuple, float], Dict]:
+    """
+    프린팅 파일 1개 → (calc_map, 파일별 분석).
+    파일별 분석은 JSON 저장용: 5대 분석 결과 + 합산 재조립 입력(printingCalc, stencilPoints)
+    """
+    items = core.classify_tabular(core.parse_tabular_like(raw))
+    dist = items.distances
+    entry = {
+        "printingCalc": {str(k): v for k, v in items.printing_calc.items()},
+        "fabric": core.compute_fabric(dist) if not dist.empty else [],
+        "stencilPoints": core.stencil_points(dist) if not dist.empty else {},
+        "stencilDetail": [],
+        "stencilSummary": [],
+    }
+    if not dist.empty:
+        entry["stencilDetail"], entry["stencilSummary"] = core.compute_stencil_points(entry["stencilPoints"])
+    entry.update(_printing_layers(items.printing_calc))
+    return items.printing_calc, entry
+
+
+def merge_printing(calcs: List[Dict[Tuple, float]], entries: List[Dict]) -> Dict:
+    """
+    파일별 분석(업로드 순서) → 합산 분석. 전체 파일 concat 후 분석한 결과와 같다.
+    - calc: 같은 키는 뒤 파일 값 / 원단: 파일 순서대로 이어붙임 / 스텐실: 방향별 첫 파일 값
+    """
+    calc_map: Dict[Tuple, float] = {}
+    for cm in calcs:
+        calc_map.update(cm)
+
+    points: Dict[str, Dict[str, List[float]]] = {}
+    for e in entries:
+        for group, sides in e["stencilPoints"].items():
+            for side, vals in sides.items():
+                points.setdefault(group, {}).setdefault(side, vals)
+
+    out = {
+        "printingCalc": calc_map,
+        "fabric": [r for e in entries for r in e["fabric"]],
+        "stencilDetail": [],
+        "stencilSummary": [],
+    }
+    # 스텐실은 거리 항목이 있는 파일이 하나라도 있을 때만 (파일별 stencilDetail이 비어 있지 않음)
+    if any(e["stencilDetail"] for e in entries):
+        out["stencilDetail"], out["stencilSummary"] = core.compute_stencil_points(points)
+    out.update(_printing_layers(calc_map))
+    return out
+
+
+def _slitter_items(raw: bytes) -> pd.DataFrame:
+    """슬리터 파일 1개 → slitter_items (타발폭/전체폭 계산은 전체 파일을 모아 배치 커널 1회)."""
+    return core.classify_tabular(core.parse_tabular_like(raw)).slitter_items
+
+
+class _InlineExecutor(Executor):
+    """풀 미사용 시 제출 즉시 현재 스레드에서 실행 (실행 계획은 같고 순서대로 처리)."""
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        fut: Future = Future()
+        try:
+            fut.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            fut.set_exception(e)
+        return fut
+
+
+def _resolved(value: Any) -> Future:
+    fut: Future = Future()
+    fut.set_result(value)
+    return fut
+
+
+def _submit_cached(executor: Executor, kind: str, fn, raw: bytes) -> Tuple[Optional[str], Future]:
+    """parse_cache 적중이면 바로 완료된 Future, 아니면 (저장할 키, 제출한 Future)."""
+    key = PARSE_CACHE.key(raw, kind)
+    hit = PARSE_CACHE.get(key)
+    if hit is not None:
+        return None, _resolved(hit)
+    return key, executor.submit(fn, raw)
+
+
+def _process_margin(
+    printing: List[Tuple[str, bytes]],
+    slitter: List[Tuple[str, bytes]],
+    executor: Executor,
+) -> ProcessMargin:
+    """실행 계획 (스레드에서 호출, 결과 대기는 이 스레드에서만 블로킹)."""
+    jobs = [
+        (name, *_submit_cached(executor, "printing-margin", _printing_file_margin, raw))
+        for name, raw in printing
+    ]
+    slit_jobs = [
+        (name, *_submit_cached(executor, "slitter-items", _slitter_items, raw))
+        for name, raw in slitter
+    ]
+
+    out = ProcessMargin()
+    try:
+        # 업로드 순서대로 결과 반영 (같은 파일명은 뒤 파일이 덮어씀)
+        for name, key, fut in jobs:
+            res = fut.result()
+            if key is not None:
+                PARSE_CACHE.put(key, res)
+            calc_map, entry = res
+            out.printing_calcs.append(calc_map)
+            out.printing_entries.append(entry)
+            out.printing_by_file[name] = entry
+
+        slit_names, slit_items = [], []
+        for name, key, fut in slit_jobs:
+            items = fut.result()
+            if key is not None:
+                PARSE_CACHE.put(key, items)
+            if not items.empty:     # 슬리터 항목이 없는 파일은 결과 없음
+                slit_names.append(name)
+                slit_items.append(items)
+    finally:
+        for _name, _key, fut in [*jobs, *slit_jobs]:
+            fut.cancel()
+
+    # 슬리터 파일 전체를 (파일, 위치, Row) 배열 1개로 → 타발폭/전체폭 한 번에
+    punch = core.compute_slitter_punch_batch(slit_items)
+    total = core.compute_slitter_total_batch(slit_items)
+    for name, p_rows, t_rows in zip(slit_names, punch, total):
+        out.slitter_by_file[name] = p_rows
+        out.slitter_total_by_file[name] = t_rows
+    return out
+
+
+async def compute_process_margin(
+    printing: List[Tuple[str, bytes]],
+    slitter: List[Tuple[str, bytes]],
+) -> ProcessMargin:
+    """
+    프린팅/슬리터 (filename, raw) → ProcessMargin.
+    - 파일별 작업을 모두 풀에 제출 → 전체 소요 ≈ 가장 느린 파일
+    - 파일 수가 적거나 풀이 없으면 같은 계획을 스레드 1개에서 순서대로 실행
+    """
+    pool = _get_pool()
+    if pool is None or len(printing) + len(slitter) < INGEST_MIN_FILES:
+        return await run_in_threadpool(_process_margin, printing, slitter, _InlineExecutor())
+    return await run_in_threadpool(_process_margin, printing, slitter, pool)
@@ -0,0 +1,380 @@
+# -*- coding: utf-8 -*-
+"""
+# [FILE] jobstore.py
+# [PURPOSE] 업로드 Job 저장소 — 메모리 LRU 앞단 + (옵션) SQLite 디스크 영속화
+#
+# [STORE]
+# - MemoryJobStore : 프로세스 메모리만 사용 (기존 _JOBS dict 동작, 최대 Job 수 제한)
+# - SqliteJobStore : 메모리 LRU(시트 수 기준) + SQLite 파일
+#                    · 서버 재시작 후에도 jobId로 조회 가능
+#                    · 메모리에 없는 Job은 시트 키만 먼저 복원, 시트 본문은 조회 시점에 로드
+#                    · DB 용량 한도 초과 시 오래된 Job부터 삭제
+#
+# [CONFIG] (환경변수)
+# - ISENS_JOB_STORE        : "sqlite"(기본) | "memory"
+# - ISENS_JOB_DB           : SQLite 파일 경로 (기본 ./data/jobs.sqlite3)
+# - ISENS_JOB_DB_MAX_MB    : DB에 보관할 시트 데이터 총량 한도(MB, 기본 512)
+# - ISENS_JOB_CACHE_SHEETS : 메모리에 올려둘 시트 수 한도 (기본 5000)
+# - ISENS_MAX_JOBS         : memory 저장소의 최대 Job 수 (기본 5)
+#
+# [USAGE] (dict 호환)
+# - store.get(job_id) / store.put(job) (= store[job_id] = job) / len(store)
+# - job.process_data 변경 후 store.save_process(job)
+"""
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from dataclasses import asdict, dataclass, field, fields
+from typing import Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+# =============================================================================
+# 데이터 모델
+# =============================================================================
+@dataclass
+class SheetData:
+    sheet_key: str
+    meta: Dict
+    row_df: pd.DataFrame
+    detail: Dict
+    score: float
+    # row_df.to_dict("records") 결과 캐시 (저장 대상 아님, 첫 조회 시 1회 생성)
+    _rows: Optional[List[Dict]] = field(default=None, init=False, repr=False, compare=False)
+
+    def rows(self) -> List[Dict]:
+        if self._rows is None:
+            self._rows = self.row_df.to_dict("records")
+        return self._rows
+
+
+@dataclass
+class ProcessData:
+    """프린팅/슬리터 공정마진 데이터 — 5대 분석"""
+    printing_calc: Dict           # {(ref, layer, axis, pt): value}
+    carbon_rows: List[Dict]       # 카본 프린팅 12행 마진
+    insulation_rows: List[Dict]   # 절연 프린팅 12행 마진
+    slitter_rows: List[Dict]      # 슬리터 타발폭 12행 마진
+    row_points_carbon: str        # 선택된 매핑명 (카본)
+    row_points_insulation: str    # 선택된 매핑명 (절연)
+    # 추가: 원단, 스텐실, 간섭, 전체폭
+    fabric_rows: List[Dict] = None          # (1) 원단 분석
+    stencil_detail: List[Dict] = None       # (2) 스텐실 레이어간 차이
+    stencil_summary: List[Dict] = None      # (2) 스텐실 비대칭
+    interference_rows: List[Dict] = None    # (4) 간섭 12행
+    row_points_interference: str = ""       # 간섭 매핑명
+    slitter_total_rows: List[Dict] = None   # (5b) 전체폭 균일성
+    # v4.8: 파일별 분리 데이터 (Compare 페이지용)
+    slitter_by_file: Dict = None           # { filename: [12 rows] }
+    slitter_total_by_file: Dict = None     # { filename: [12 rows] }
+    slitter_filenames: List = None         # 슬리터 파일명 목록
+    printing_filenames: List = None        # 프린팅 파일명 목록
+    printing_by_file: Dict = None          # { filename: 파일별 5대 분석 + printingCalc/stencilPoints }
+
+
+@dataclass
+class JobData:
+    job_id: str
+    created_at: float
+    sheets: Dict[str, SheetData]  # sheet_key -> SheetData
+    process_data: Optional[ProcessData] = None  # 공정마진 데이터 (업로드 시 저장)
+
+
+# =============================================================================
+# 직렬화 (JSON — float는 repr 기준 왕복 손실 없음, NaN 허용)
+# =============================================================================
+def _json_default(o):
+    if isinstance(o, (np.integer, np.floating, np.bool_)):
+        return o.item()
+    raise TypeError(f"JSON 직렬화 불가: {type(o).__name__}")
+
+
+def _dumps(obj) -> str:
+    return json.dumps(obj, ensure_ascii=False, default=_json_default)
+
+
+def _df_to_json(df: pd.DataFrame) -> str:
+    return _dumps({"columns": [str(c) for c in df.columns], "data": {str(c): df[c].tolist() for c in df.columns}})
+
+
+def _df_from_json(s: str) -> pd.DataFrame:
+    d = json.loads(s)
+    if not d["data"] or not any(d["data"].values()):
+        return pd.DataFrame(columns=d["columns"])
+    out = pd.DataFrame({c: d["data"][c] for c in d["columns"]})
+    for c in out.columns:
+        if c != "Row":
+            out[c] = out[c].astype(float)
+    return out
+
+
+def _process_from_json(s: Optional[str]) -> Optional[ProcessData]:
+    if not s:
+        return None
+    d = json.loads(s)
+    names = {f.name for f in fields(ProcessData)}
+    return ProcessData(**{k: v for k, v in d.items() if k in names})
+
+
+# =============================================================================
+# 저장소: 메모리
+# =============================================================================
+class MemoryJobStore:
+    """프로세스 메모리 저장소 — 최대 Job 수를 넘으면 오래된 Job부터 제거."""
+
+    def __init__(self, max_jobs: int = 5):
+        self.max_jobs = max_jobs
+        self._jobs: Dict[str, JobData] = {}
+
+    def get(self, job_id: str) -> Optional[JobData]:
+        return self._jobs.get(job_id)
+
+    def __setitem__(self, job_id: str, job: JobData) -> None:
+        self._jobs[job_id] = job
+        self._evict_old_jobs()
+
+    def put(self, job: JobData) -> None:
+        self[job.job_id] = job
+
+    def __contains__(self, job_id: str) -> bool:
+        return job_id in self._jobs
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def save_process(self, job: JobData) -> None:
+        pass  # 객체를 그대로 보관하므로 별도 저장 불필요
+
+    def _evict_old_jobs(self) -> None:
+        if len(self._jobs) <= self.max_jobs:
+            return
+        # 오래된 job부터 제거
+        items = sorted(self._jobs.items(), key=lambda kv: kv[1].created_at)
+        for job_id, _job in items[: max(0, len(self._jobs) - self.max_jobs)]:
+            self._jobs.pop(job_id, None)
+
+
+# =============================================================================
+# 저장소: SQLite + 메모리 LRU
+# =============================================================================
+class LazySheets(MutableMapping):
+    """디스크에서 복원된 Job의 시트 맵 — 키 목록만 보유, 값은 첫 조회 시 로드."""
+
+    def __init__(self, keys: List[str], loader: Callable[[str], Optional[SheetData]]):
+        self._keys = list(keys)
+        self._key_set = set(self._keys)
+        self._loaded: Dict[str, SheetData] = {}
+        self._loader = loader
+
+    @property
+    def loaded_count(self) -> int:
+        return len(self._loaded)
+
+    def __getitem__(self, key: str) -> SheetData:
+        if key not in self._key_set:
+            raise KeyError(key)
+        sd = self._loaded.get(key)
+        if sd is None:
+            sd = self._loader(key)
+            if sd is None:
+                raise KeyError(key)
+            self._loaded[key] = sd
+        return sd
+
+    def __setitem__(self, key: str, sd: SheetData) -> None:
+        if key not in self._key_set:
+            self._keys.append(key)
+            self._key_set.add(key)
+        self._loaded[key] = sd
+
+    def __delitem__(self, key: str) -> None:
+        self._keys.remove(key)
+        self._key_set.discard(key)
+        self._loaded.pop(key, None)
+
+    def __contains__(self, key) -> bool:
+        return key in self._key_set
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._keys))
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id      TEXT PRIMARY KEY,
+    created_at  REAL NOT NULL,
+    process     TEXT,
+    nbytes      INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS sheets (
+    job_id      TEXT NOT NULL,
+    sheet_key   TEXT NOT NULL,
+    ord         INTEGER NOT NULL,
+    meta        TEXT NOT NULL,
+    row_df      TEXT NOT NULL,
+    detail      TEXT NOT NULL,
+    score       REAL,
+    PRIMARY KEY (job_id, sheet_key)
+);
+"""
+
+
+class SqliteJobStore:
+    """
+    메모리 LRU 앞단 + SQLite 영속 저장소.
+    - 캐시 히트: OrderedDict 조회 1회 (기존 dict와 동일 수준)
+    - 캐시 미스: jobs/sheets 키만 읽어 LazySheets로 복원, 시트 본문은 get 시점에 1건씩 로드
+    """
+
+    def __init__(self, path: str, max_db_bytes: int, cache_sheets: int):
+        self.path = path
+        self.max_db_bytes = max_db_bytes
+        self.cache_sheets = cache_sheets
+        self._lock = threading.RLock()
+        self._cache: "OrderedDict[str, JobData]" = OrderedDict()
+
+        d = os.path.dirname(os.path.abspath(path))
+        os.makedirs(d, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    # ── 조회 ──
+    def get(self, job_id: str) -> Optional[JobData]:
+        with self._lock:
+            job = self._cache.get(job_id)
+            if job is not None:
+                self._cache.move_to_end(job_id)
+                return job
+            job = self._load_job(job_id)
+            if job is not None:
+                self._cache[job_id] = job
+                self._evict_cache()
+            return job
+
+    def __contains__(self, job_id: str) -> bool:
+        return self.get(job_id) is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return int(self._conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0])
+
+    # ── 저장 ──
+    def __setitem__(self, job_id: str, job: JobData) -> None:
+        """Job 전체(시트 + 공정 데이터)를 저장하고 캐시에 올린다."""
+        rows = []
+        nbytes = 0
+        for ord_, (skey, sd) in enumerate(job.sheets.items()):
+            meta_s, row_s, detail_s = _dumps(sd.meta), _df_to_json(sd.row_df), _dumps(sd.detail)
+            nbytes += len(row_s) + len(detail_s)
+            rows.append((job_id, skey, ord_, meta_s, row_s, detail_s, float(sd.score)))
+        proc_s = _dumps(asdict(job.process_data)) if job.process_data is not None else None
+
+        with self._lock:
+            with self._conn:
+                self._conn.execute("DELETE FROM sheets WHERE job_id = ?", (job_id,))
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO jobs (job_id, created_at, process, nbytes) VALUES (?, ?, ?, ?)",
+                    (job_id, float(job.created_at), proc_s, nbytes),
+                )
+                self._conn.executemany("INSERT INTO sheets VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            self._cache[job_id] = job
+            self._cache.move_to_end(job_id)
+            self._evict_cache()
+            self._evict_disk()
+
+    def put(self, job: JobData) -> None:
+        self[job.job_id] = job
+
+    def save_process(self, job: JobData) -> None:
+        proc_s = _dumps(asdict(job.process_data)) if job.process_data is not None else None
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE jobs SET process = ? WHERE job_id = ?", (proc_s, job.job_id))
+
+    # ── 내부 ──
+    def _load_job(self, job_id: str) -> Optional[JobData]:
+        r = self._conn.execute("SELECT created_at, process FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if r is None:
+            return None
+        keys = [k for (k,) in self._conn.execute(
+            "SELECT sheet_key FROM sheets WHERE job_id = ? ORDER BY ord", (job_id,)
+        )]
+        return JobData(
+            job_id=job_id,
+            created_at=float(r[0]),
+            sheets=LazySheets(keys, lambda skey: self._load_sheet(job_id, skey)),
+            process_data=_process_from_json(r[1]),
+        )
+
+    def _load_sheet(self, job_id: str, sheet_key: str) -> Optional[SheetData]:
+        with self._lock:
+            r = self._conn.execute(
+                "SELECT meta, row_df, detail, score FROM sheets WHERE job_id = ? AND sheet_key = ?",
+                (job_id, sheet_key),
+            ).fetchone()
+        if r is None:
+            return None
+        return SheetData(
+            sheet_key=sheet_key,
+            meta=json.loads(r[0]),
+            row_df=_df_from_json(r[1]),
+            detail=json.loads(r[2]),
+            score=float(r[3]) if r[3] is not None else float("nan"),
+        )
+
+    def _evict_cache(self) -> None:
+        """메모리 상주 시트 수가 한도를 넘으면 LRU Job부터 메모리에서 내린다(디스크는 유지)."""
+        def _n(job: JobData) -> int:
+            return job.sheets.loaded_count if isinstance(job.sheets, LazySheets) else len(job.sheets)
+
+        total = sum(_n(j) for j in self._cache.values())
+        while total > self.cache_sheets and len(self._cache) > 1:
+            _jid, job = self._cache.popitem(last=False)
+            total -= _n(job)
+
+    def _evict_disk(self) -> None:
+        """DB 시트 데이터 총량이 한도를 넘으면 오래된 Job부터 삭제."""
+        total = int(self._conn.execute("SELECT COALESCE(SUM(nbytes), 0) FROM jobs").fetchone()[0])
+        if total <= self.max_db_bytes:
+            return
+        victims = []
+        for job_id, nb in self._conn.execute("SELECT job_id, nbytes FROM jobs ORDER BY created_at"):
+            if total <= self.max_db_bytes:
+                break
+            victims.append(job_id)
+            total -= int(nb)
+        # 가장 최근 Job은 한도를 넘어도 유지
+        newest = self._conn.execute("SELECT job_id FROM jobs ORDER BY created_at DESC LIMIT 1").fetchone()
+        victims = [v for v in victims if newest is None or v != newest[0]]
+        with self._conn:
+            for job_id in victims:
+                self._conn.execute("DELETE FROM sheets WHERE job_id = ?", (job_id,))
+                self._conn.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+                self._cache.pop(job_id, None)
+
+
+def create_job_store():
+    """환경변수 설정에 따라 저장소 생성."""
+    kind = os.environ.get("ISENS_JOB_STORE", "sqlite").lower()
+    if kind == "memory":
+        return MemoryJobStore(max_jobs=int(os.environ.get("ISENS_MAX_JOBS", "5")))
+    path = os.environ.get(
+        "ISENS_JOB_DB",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "jobs.sqlite3"),
+    )
+    return SqliteJobStore(
+        path,
+        max_db_bytes=int(float(os.environ.get("ISENS_JOB_DB_MAX_MB", "512")) * 1024 * 1024),
+        cache_sheets=int(os.environ.get("ISENS_JOB_CACHE_SHEETS", "5000")),
+    )
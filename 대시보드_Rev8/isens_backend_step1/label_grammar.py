@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+# [FILE] label_grammar.py
+# [PURPOSE] 계측 CSV 항목명(라벨) 문법 → 계열별 결합 정규식 1개
+#
+# - CSV 계열마다 {분류: 정규식}을 분류별 이름 그룹 alternation 하나로 컴파일
+# - 라벨 1개를 match 1회로 분류 + 필드 추출 (앞쪽 규칙 우선)
+# - pandas str.extract에도 그대로 사용 가능 (columns()로 컬럼명 정리)
+# - 새 공정/항목은 아래 계열 표에 규칙만 추가
+#
+# NOTE: production-dashboard/src/backend/parsers/label_grammar.py 와 동일 규칙을 유지할 것
+"""
+from __future__ import annotations
+
+import re
+from typing import Dict, List, Mapping, NamedTuple, Optional, Tuple
+
+_GROUP_RE = re.compile(r"\(\?P<(\w+)>")
+_SEP = "__"   # 결합 정규식 그룹 이름 = 분류 + _SEP + 필드 (파이썬 re는 그룹 이름 중복 불가)
+
+
+class LabelMatch(NamedTuple):
+    kind: str
+    fields: Dict[str, str]
+
+
+class LabelGrammar:
+    """{분류: 정규식} → 결합 정규식. 규칙 안의 이름 그룹이 필드가 된다."""
+
+    def __init__(self, rules: Mapping[str, str]) -> None:
+        parts = []
+        self._fields: Dict[str, Tuple[Tuple[str, str], ...]] = {}
+        for kind, pattern in rules.items():
+            fields = tuple(_GROUP_RE.findall(pattern))
+            prefixed = _GROUP_RE.sub(lambda m, k=kind: f"(?P<{k}{_SEP}{m.group(1)}>", pattern)
+            parts.append(f"(?P<{kind}>{prefixed})")
+            self._fields[kind] = tuple((f"{kind}{_SEP}{f}", f) for f in fields)
+        # 바깥 그룹(분류)이 가장 늦게 닫히므로 match.lastgroup = 분류
+        self.regex = re.compile("|".join(parts))
+        self._scans: Dict[str, re.Pattern] = {}
+
+    @property
+    def kinds(self) -> Tuple[str, ...]:
+        return tuple(self._fields)
+
+    def match(self, label: str) -> Optional[LabelMatch]:
+        m = self.regex.match(label)
+        if m is None:
+            return None
+        kind = m.lastgroup
+        return LabelMatch(kind, {field: m.group(name) for name, field in self._fields[kind]})
+
+    def scan(self, block: str, kind: str, field: str) -> List[Tuple[str, str]]:
+        """
+        탭 구분 행 블록(줄바꿈으로 이은 텍스트) → 첫 칸(라벨)이 kind 규칙에 맞는 행의 (field 값, 둘째 칸) 목록.
+        블록 전체를 findall 1회로 분류 — 행마다 라벨 strip/따옴표 제거 후 match() 한 것과 같은 결과.
+        """
+        regex = self._scans.get(kind)
+        if regex is None:
+            # 라벨 앞쪽 공백/따옴표는 건너뛰고, 라벨 칸(_label)과 둘째 칸(_value)을 함께 잡음
+            regex = self._scans[kind] = re.compile(
+                rf'^[^\S\n]*"*(?P<_label>(?:{self.regex.pattern})[^\t\n]*)\t"?(?P<_value>[^\t\n"]*)', re.M
+            )
+        groups = regex.groupindex
+        k, f = groups[kind] - 1, groups[f"{kind}{_SEP}{field}"] - 1
+        # 규칙이 첫 칸 밖(탭 너머)에서 맞은 행은 라벨 칸에 탭이 섞임 → 제외 (앞쪽 규칙이 맞은 행도 제외)
+        return [(t[f], t[-1]) for t in regex.findall(block) if t[k] and "\t" not in t[0]]
+
+    def columns(self, kind: str) -> Dict[str, str]:
+        """결합 정규식 그룹 이름 → 필드 이름 (pandas str.extract 결과 컬럼 정리용)."""
+        return dict(self._fields[kind])
+
+
+# -----------------------------------------------------------------------------
+# CSV 계열별 문법 (라벨은 앞뒤 공백/따옴표 제거 후 적용)
+# -----------------------------------------------------------------------------
+# "계산기 타발기준_카본좌우_1: 숫자"
+# 라벨 어디든 '타발기준_카본좌우_'/'타발기준_카본상하_' 포함 + 첫 '_{숫자}:' = row,
+# '좌우'가 라벨 어디든 있으면 axis="좌우", 없으면 None(상하) — 기존 부분 문자열 판정과 같은 범위
+PRINTING = LabelGrammar({
+    "carbon": r"(?=[^\t\n]*?타발기준_카본(?:좌우|상하)_)(?:(?=[^\t\n]*?(?P<axis>좌우))|).*?_(?P<row>\d+):",
+})
+
+# "닫힌 스플라인 분주면적_1: 면적"
+# 라벨 어디든 '분주면적' 포함 + 첫 '_{숫자}:' = index (기존 부분 문자열 판정과 같은 범위)
+DISPENSING = LabelGrammar({
+    "area": r"(?=[^\t\n]*?분주면적).*?_(?P<index>\d+):",
+})
+
+# "계산기 양면_좌측_1: 숫자" (X), "거리 양면상하_중_1: 거리 Y" (Y)
+ASSEMBLY = LabelGrammar({
+    "worstX": r"계산기 양면_(?:.*?_)?(?P<row>\d+):",
+    "worstY": r"거리 양면상하_(?:.*?_)?(?P<row>\d+):",
+})
+
+# 일반 측정 항목: "거리 양면상하_좌_1: 거리 Y", "타원 타발홀__좌측_2: 단축" (원본 라벨 그대로 적용 가능)
+MEASUREMENT = LabelGrammar({
+    "item": (
+        r'^\s*"?\s*(?P<test>.+?)_+(?P<pos>좌측|우측|좌|우|중|센터|L|R|C)_+(?P<row>\d+)'
+        r'\s*[:：]\s*(?P<metric>.+?)\s*"?\s*$'
+    ),
+})
+
+# 프린팅/슬리터 CSV (parse_tabular_like item):
+# "계산기 타발기준_카본좌우_1: 숫자", "거리 타발_좌측_1: 거리 Y", "거리 전체폭_좌_1: 거리 Y"
+TABULAR = LabelGrammar({
+    "printCalc": r"^계산기\s+(?P<ref>[^_]+)_\s*(?P<layer>카본|절연)(?P<dir>좌우|상하)\s*_(?P<point>\d+)\s*[：:]",
+    "distance": r"^거리\s+(?P<group>타발|카본|절연)_(?P<side>좌측|우측|상측|하측)_(?P<point>\d+)\s*[：:]\s*거리\s*(?P<axis>X|Y)",
+    "slitter": r"^거리\s+(?P<kind>전체폭|타발폭)_(?P<pos>좌측|우측|중앙|좌|우|중)_(?P<row>\d+)\s*[：:]\s*거리\s*(?P<axis>X|Y)",
+})
@@ -9,7 +9,7 @@
 #
 # [OUTPUT]
 # - 시트 리스트 요약(sheets) + jobId
-# - 시트 디테일(row 데이터 + 진단/Top5/미니카드)
+# - 시트 디테일(row 데이터 + 진단/Top5/미니카드), 여러 시트 일괄 조회(batch)
 #
 # [CALLER]
 # - React 프론트엔드가 이 API를 호출(추후 연결)
@@ -22,80 +22,54 @@
 """
 from __future__ import annotations
 
+import json
 import os
 import time
 import uuid
-from dataclasses import dataclass
+from dataclasses import replace
 from typing import Dict, List, Optional, Tuple
 
 from fastapi import FastAPI, File, UploadFile, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
 
-import pandas as pd
+import numpy as np
 
 # =============================================================================
 # [STEP1] 로직 엔진 import (계산/판정/요약)
 # =============================================================================
 import core
+import ingest
+import jobstore
+import parse_cache
+import trendstore
+from jobstore import JobData, ProcessData, SheetData
 
 
 # =============================================================================
-# [STEP1] In-memory store (최소 제품용)
-# - React 붙이기 전까지는 메모리에만 저장해도 충분
-# - 나중에 필요하면 디스크 캐시/DB로 확장
+# [STEP1] Job 저장소
+# - 메모리 LRU 앞단 + SQLite 영속화(기본) — 재시작 후에도 jobId 유지
+# - ISENS_JOB_STORE=memory 이면 기존처럼 메모리에만 최대 5개 보관
 # =============================================================================
-@dataclass
-class SheetData:
-    sheet_key: str
-    meta: Dict
-    row_df: pd.DataFrame
-    detail: Dict
-    score: float
-
-
-@dataclass
-class ProcessData:
-    """프린팅/슬리터 공정마진 데이터 — 5대 분석"""
-    printing_calc: Dict           # {(ref, layer, axis, pt): value}
-    carbon_rows: List[Dict]       # 카본 프린팅 12행 마진
-    insulation_rows: List[Dict]   # 절연 프린팅 12행 마진
-    slitter_rows: List[Dict]      # 슬리터 타발폭 12행 마진
-    row_points_carbon: str        # 선택된 매핑명 (카본)
-    row_points_insulation: str    # 선택된 매핑명 (절연)
-    # 추가: 원단, 스텐실, 간섭, 전체폭
-    fabric_rows: List[Dict] = None          # (1) 원단 분석
-    stencil_detail: List[Dict] = None       # (2) 스텐실 레이어간 차이
-    stencil_summary: List[Dict] = None      # (2) 스텐실 비대칭
-    interference_rows: List[Dict] = None    # (4) 간섭 12행
-    row_points_interference: str = ""       # 간섭 매핑명
-    slitter_total_rows: List[Dict] = None   # (5b) 전체폭 균일성
-    # v4.8: 파일별 분리 데이터 (Compare 페이지용)
-    slitter_by_file: Dict = None           # { filename: [12 rows] }
-    slitter_total_by_file: Dict = None     # { filename: [12 rows] }
-    slitter_filenames: List = None         # 슬리터 파일명 목록
-    printing_filenames: List = None        # 프린팅 파일명 목록
-
-
-@dataclass
-class JobData:
-    job_id: str
-    created_at: float
-    sheets: Dict[str, SheetData]  # sheet_key -> SheetData
-    process_data: Optional[ProcessData] = None  # 공정마진 데이터 (업로드 시 저장)
-
-
-_JOBS: Dict[str, JobData] = {}
-_MAX_JOBS = 5  # 메모리 보호
-
-
-def _evict_old_jobs():
-    if len(_JOBS) <= _MAX_JOBS:
-        return
-    # 오래된 job부터 제거
-    items = sorted(_JOBS.items(), key=lambda kv: kv[1].created_at)
-    for job_id, _job in items[: max(0, len(_JOBS) - _MAX_JOBS)]:
-        _JOBS.pop(job_id, None)
+_JOBS = jobstore.create_job_store()
+
+# =============================================================================
+# [STEP1] 품질 추이 저장소 — 업로드된 시트/프린팅 지표를 Job과 별개로 계속 누적
+# =============================================================================
+_TRENDS = trendstore.create_trend_store()
+
+
+def _record_sheet_trends(entries: List[Tuple[str, Dict]], uploaded_at: float) -> None:
+    _TRENDS.record_sheets([(skey, parsed["meta"], parsed["row_df"]) for skey, parsed in entries], uploaded_at)
+
+
+def _record_printing_trends(filenames: List[str], calcs: List[Dict], uploaded_at: float) -> None:
+    """프린팅 파일별 maxDeviation (+ 포인트별) 기록 (calcs = 파일별 printing calc)."""
+    for fname, calc_map in zip(filenames, calcs):
+        value, per_pt = core.printing_max_deviation(calc_map)
+        _TRENDS.record_file("printingMaxDeviation", fname, value, per_pt, uploaded_at)
 
 
 # =============================================================================
@@ -144,6 +118,79 @@ def _sheet_key(meta: Dict) -> str:
     )
 
 
+def _merge_latest(sheets_map: Dict[str, Tuple[int, Tuple[int, int], Dict]], parsed: Dict) -> bool:
+    """
+    중복 시트 최신 선택 — 업로드 순서대로 호출해야 한다.
+    반환: parsed가 해당 sheet_key의 현재 값이 되었으면 True
+    """
+    idx = parsed["idx"]
+    skey = _sheet_key(parsed["meta"])
+    time_key = _extract_time_key(parsed["filename"])
+    prev = sheets_map.get(skey)
+    if prev is None:
+        sheets_map[skey] = (idx, time_key, parsed)
+        return True
+
+    prev_idx, prev_time, _prev = prev
+    # 시간이 있으면 시간 비교, 없으면 업로드 순서 비교
+    if time_key[0] and prev_time[0]:
+        newer = time_key[1] >= prev_time[1]
+    elif time_key[0] and not prev_time[0]:
+        newer = True
+    else:
+        # 둘 다 시간 없으면 업로드 순서 마지막
+        newer = idx >= prev_idx
+    if newer:
+        sheets_map[skey] = (idx, time_key, parsed)
+    return newer
+
+
+def _sheet_summaries(entries: List[Tuple[str, Dict]]) -> List[Dict]:
+    """(sheet_key, parsed) 목록 → 시트 리스트 행(sheets[] 항목). 상태/점수/worst/tags는 core.score_sheets 일괄 계산."""
+    sc = core.score_sheets([parsed["row_df"] for _skey, parsed in entries], th=None)
+    out = []
+    for i, (skey, parsed) in enumerate(entries):
+        wx, wy = float(sc["worst_x"][i]), float(sc["worst_y"][i])
+        out.append({
+            "sheetKey": skey,
+            "meta": parsed["meta"],
+            "status": sc["status"][i],
+            "qualityScore": float(sc["score"][i]),
+            "worstX": wx if wx == wx else None,
+            "worstY": wy if wy == wy else None,
+            # tags는 이름만 내려줌(프론트가 툴팁은 detail에서 사용)
+            "tags": [name for name, on in zip(core.SHEET_TAG_NAMES, sc["tags"][i]) if on],
+        })
+    return out
+
+
+def _sheet_data(skey: str, parsed: Dict, summary: Dict) -> SheetData:
+    return SheetData(
+        sheet_key=skey, meta=parsed["meta"], row_df=parsed["row_df"],
+        detail=parsed["detail"], score=summary["qualityScore"],
+    )
+
+
+def _sheet_sort_key(x: Dict) -> Tuple[float, int]:
+    # 기본 정렬: score 낮은(위험) 순, 그 다음 시트넘버
+    sc = x.get("qualityScore")
+    sc = float(sc) if sc is not None else 999.0
+    sn = x.get("meta", {}).get("시트넘버")
+    sn = int(sn) if sn is not None else 999999
+    return (sc, sn)
+
+
+async def _read_upload_files(files: List[UploadFile], failed_samples: List[Dict]) -> List[Tuple[int, str, bytes]]:
+    """UploadFile → (upload_index, filename, raw). 읽기 실패는 failed_samples에 추가."""
+    items = []
+    for idx, f in enumerate(files):
+        try:
+            items.append((idx, f.filename, await f.read()))
+        except Exception as e:
+            failed_samples.append({"filename": f.filename, "reason": f"parse_failed: {type(e).__name__}"})
+    return items
+
+
 # =============================================================================
 # [API] FastAPI 앱
 # =============================================================================
@@ -159,6 +206,11 @@ app.add_middleware(
 )
 
 
+@app.on_event("shutdown")
+def _shutdown_ingest_pool():
+    ingest.shutdown_pool()
+
+
 # =============================================================================
 # [API CONTRACT] Step1 · 업로드
 # =============================================================================
@@ -178,89 +230,30 @@ async def upload_measurements(
     created_at = time.time()
 
     failed_samples = []
-    sheets_map: Dict[str, Tuple[int, Tuple[int, int], Dict, pd.DataFrame]] = {}
-    # sheet_key -> (upload_index, time_key, meta, row_df)
+    sheets_map: Dict[str, Tuple[int, Tuple[int, int], Dict]] = {}
+    # sheet_key -> (upload_index, time_key, parsed)
 
-    for idx, f in enumerate(files):
-        try:
-            raw = await f.read()
-            meta = core.parse_filename(f.filename)
-            skey = _sheet_key(meta)
+    # 파일 읽기(비동기) → 파싱/피벗/디테일은 ingest 워커 풀에서 병렬 처리
+    items = await _read_upload_files(files, failed_samples)
 
-            # 파일명 파싱 실패(필수 메타 없음) 처리
-            if meta.get("시트넘버") is None or not meta.get("일자") or not meta.get("라인명") or not meta.get("로트명"):
-                failed_samples.append({"filename": f.filename, "reason": "filename_parse_failed"})
-                continue
-
-            long_df = core.read_measurement_csv(raw)
-            row_df = core.pivot_row_values(long_df)
-
-            # 중복 시트: 최신 선택
-            time_key = _extract_time_key(f.filename)
-            prev = sheets_map.get(skey)
-            if prev is None:
-                sheets_map[skey] = (idx, time_key, meta, row_df)
-            else:
-                prev_idx, prev_time, _prev_meta, _prev_df = prev
-                # 시간이 있으면 시간 비교, 없으면 업로드 순서 비교
-                if time_key[0] and prev_time[0]:
-                    if time_key[1] >= prev_time[1]:
-                        sheets_map[skey] = (idx, time_key, meta, row_df)
-                elif time_key[0] and not prev_time[0]:
-                    sheets_map[skey] = (idx, time_key, meta, row_df)
-                else:
-                    # 둘 다 시간 없으면 업로드 순서 마지막
-                    if idx >= prev_idx:
-                        sheets_map[skey] = (idx, time_key, meta, row_df)
-
-        except Exception as e:
-            failed_samples.append({"filename": f.filename, "reason": f"parse_failed: {type(e).__name__}"})
+    for parsed in await ingest.ingest_measurement_files(items):
+        if "reason" in parsed:
+            failed_samples.append({"filename": parsed["filename"], "reason": parsed["reason"]})
+            continue
+        _merge_latest(sheets_map, parsed)
 
     # job store build
     job = JobData(job_id=job_id, created_at=created_at, sheets={})
 
-    sheets_out = []
-    for skey, (_idx, _tkey, meta, row_df) in sheets_map.items():
-        detail = core.build_step1_detail_summary(row_df, th=None)  # th는 추후 settings에서 주입
-        st = detail.get("diagnosis", {}).get("sheetStatus", "-")
-        worstX = detail.get("diagnosis", {}).get("worstX") or {}
-        worstY = detail.get("diagnosis", {}).get("worstY") or {}
-
-        wx = abs(float(worstX.get("value"))) if worstX.get("value") is not None else float("nan")
-        wy = abs(float(worstY.get("value"))) if worstY.get("value") is not None else float("nan")
-
-        # score: NG면 0, 그 외는 기존 함수 사용
-        st_for_score = "MUST" if st == "NG" else st
-        score = core.quality_score_xy(wx if wx == wx else 0.0, wy if wy == wy else 0.0, st_for_score, th=None)
-
-        job.sheets[skey] = SheetData(sheet_key=skey, meta=meta, row_df=row_df, detail=detail, score=score)
-
-        # tags는 구조화된 tags의 name만 내려줌(프론트가 툴팁은 detail에서 사용)
-        tags = [t.get("name") for t in (detail.get("diagnosis", {}).get("tags") or []) if isinstance(t, dict)]
-        sheets_out.append(
-            {
-                "sheetKey": skey,
-                "meta": meta,
-                "status": st,
-                "qualityScore": score,
-                "worstX": wx if wx == wx else None,
-                "worstY": wy if wy == wy else None,
-                "tags": tags,
-            }
-        )
-
-    # 기본 정렬: score 낮은(위험) 순, 그 다음 시트넘버
-    def _sort_key(x):
-        sc = x.get("qualityScore")
-        sc = float(sc) if sc is not None else 999.0
-        sn = x.get("meta", {}).get("시트넘버")
-        sn = int(sn) if sn is not None else 999999
-        return (sc, sn)
+    entries = [(skey, parsed) for skey, (_idx, _tkey, parsed) in sheets_map.items()]
+    sheets_out = _sheet_summaries(entries)
+    for (skey, parsed), summary in zip(entries, sheets_out):
+        job.sheets[skey] = _sheet_data(skey, parsed, summary)
 
-    sheets_out.sort(key=_sort_key)
+    sheets_out.sort(key=_sheet_sort_key)
 
-    _JOBS[job_id] = job
-    _evict_old_jobs()
+    await run_in_threadpool(_JOBS.put, job)
+    await run_in_threadpool(_record_sheet_trends, entries, created_at)
 
     return {
         "jobId": job_id,
@@ -270,9 +263,88 @@ async def upload_measurements(
     }
 
 
+@app.post("/api/v1/measurements/upload-stream")
+async def upload_measurements_stream(
+    files: List[UploadFile] = File(...),
+):
+    """
+    기능: /upload 스트리밍 버전 — 시트 요약을 계산되는 즉시 한 줄씩 전송(NDJSON)
+    입력: files (CSV 여러 개)
+    출력: application/x-ndjson, 한 줄 = JSON 1개
+      {"type": "job", "jobId", "total"}                       : 시작 (job 저장/디테일 조회는 done 이후)
+      {"type": "sheet", ...sheets[] 항목}                     : 시트 1개 (중복 시트 최신 갱신 시 같은 sheetKey 재전송)
+      {"type": "failed", "filename", "reason"}                : 파싱 실패 1건
+      {"type": "done", jobId, parsed, failedSamples, sheets}  : /upload 응답과 동일(정렬 완료)
+    job은 전체 시트 확정 후 한 번만 저장 — 중간에 연결이 끊기면 빈/부분 job을 남기지 않는다.
+    """
+    if not files:
+        raise HTTPException(status_code=400, detail="업로드 파일이 없습니다.")
+
+    job_id = str(uuid.uuid4())
+    job = JobData(job_id=job_id, created_at=time.time(), sheets={})
+
+    failed_samples = []
+    items = await _read_upload_files(files, failed_samples)
+
+    def _line(obj: Dict) -> str:
+        return json.dumps(obj, ensure_ascii=False) + "\n"
+
+    async def _gen():
+        sheets_map: Dict[str, Tuple[int, Tuple[int, int], Dict]] = {}
+        yield _line({"type": "job", "jobId": job_id, "total": len(files)})
+        for f in failed_samples:
+            yield _line({"type": "failed", **f})
+
+        # 업로드 순서대로 도착 → 중복 시트 최신 선택 규칙이 /upload와 동일
+        async for parsed in ingest.iter_measurement_files(items):
+            if "reason" in parsed:
+                fail = {"filename": parsed["filename"], "reason": parsed["reason"]}
+                failed_samples.append(fail)
+                yield _line({"type": "failed", **fail})
+                continue
+            if not _merge_latest(sheets_map, parsed):
+                continue
+            skey = _sheet_key(parsed["meta"])
+            summary = _sheet_summaries([(skey, parsed)])[0]
+            job.sheets[skey] = _sheet_data(skey, parsed, summary)
+            yield _line({"type": "sheet", **summary})
+
+        # 전체 시트 확정 후 저장소 반영
+        await run_in_threadpool(_JOBS.put, job)
+        entries = [(skey, parsed) for skey, (_i, _t, parsed) in sheets_map.items()]
+        await run_in_threadpool(_record_sheet_trends, entries, job.created_at)
+
+        sheets_out = sorted(_sheet_summaries(entries), key=_sheet_sort_key)
+        yield _line({
+            "type": "done",
+            "jobId": job_id,
+            "parsed": {"count": len(sheets_out), "failed": len(failed_samples)},
+            "failedSamples": failed_samples[:10],
+            "sheets": sheets_out,
+        })
+
+    return StreamingResponse(_gen(), media_type="application/x-ndjson")
+
+
 # =============================================================================
 # [API CONTRACT] Step1 · 시트 디테일
 # =============================================================================
+SHEET_FIELDS = ("rows", "detail", "mini")
+
+
+def _sheet_payload(sd: SheetData, fields: Tuple[str, ...] = ("rows", "detail")) -> Dict:
+    """시트 응답 본문. rows는 SheetData에 캐시된 records 재사용."""
+    out: Dict = {"sheetKey": sd.sheet_key, "meta": sd.meta}
+    if "rows" in fields:
+        out["rows"] = sd.rows()
+    if "detail" in fields:
+        out["detail"] = sd.detail
+    if "mini" in fields:
+        out["mini"] = sd.detail.get("mini")
+    out["qualityScore"] = sd.score
+    return out
+
+
 @app.get("/api/v1/measurements/sheets/{job_id}/{sheet_key}")
 def get_sheet_detail(job_id: str, sheet_key: str):
     """
@@ -288,15 +360,40 @@ def get_sheet_detail(job_id: str, sheet_key: str):
     if sd is None:
         raise HTTPException(status_code=404, detail="sheetKey를 찾을 수 없습니다.")
 
-    rows = sd.row_df.to_dict("records")
+    return _sheet_payload(sd)
 
-    return {
-        "sheetKey": sd.sheet_key,
-        "meta": sd.meta,
-        "rows": rows,
-        "detail": sd.detail,
-        "qualityScore": sd.score,
-    }
+
+class SheetBatchRequest(BaseModel):
+    sheetKeys: List[str]
+    fields: Optional[List[str]] = None   # None이면 rows+detail (단건 API와 동일)
+
+
+@app.post("/api/v1/measurements/sheets/{job_id}/batch")
+def get_sheet_details_batch(job_id: str, req: SheetBatchRequest):
+    """
+    기능: 여러 시트 디테일을 한 번에 반환 (Compare 화면 등 N회 왕복 방지)
+    입력: job_id, { sheetKeys[], fields?: ["rows"|"detail"|"mini"] }
+    출력: { jobId, sheets[] (요청 순서), missing[] (없는 sheetKey) }
+    """
+    job = _JOBS.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="jobId를 찾을 수 없습니다. 먼저 업로드를 진행하세요.")
+
+    fields = tuple(req.fields) if req.fields is not None else ("rows", "detail")
+    bad = [f for f in fields if f not in SHEET_FIELDS]
+    if bad:
+        raise HTTPException(status_code=400, detail=f"지원하지 않는 fields: {bad} (가능: {list(SHEET_FIELDS)})")
+
+    sheets_out: List[Dict] = []
+    missing: List[str] = []
+    for skey in dict.fromkeys(req.sheetKeys):  # 중복 키 제거(순서 유지)
+        sd = job.sheets.get(skey)
+        if sd is None:
+            missing.append(skey)
+        else:
+            sheets_out.append(_sheet_payload(sd, fields))
+
+    return {"jobId": job_id, "sheets": sheets_out, "missing": missing}
 
 
 # =============================================================================
@@ -337,7 +434,7 @@ def get_sheet_margin(job_id: str, sheet_key: str):
     abs_y = abs(float(worst_y_info.get("value", 0))) if worst_y_info.get("value") is not None else 0.0
 
     # Punch worst
-    rows = sd.row_df.to_dict("records")
+    rows = sd.rows()
     punch_worst = 0.0
     for r in rows:
         pl = abs(float(r.get("타발홀L", 0) or 0))
@@ -409,15 +506,116 @@ def get_sheet_margin(job_id: str, sheet_key: str):
 # =============================================================================
 # [API CONTRACT] Step2 · 공정마진 파일 업로드 (프린팅 + 슬리터)
 # =============================================================================
+def _append_names(base: Optional[List[str]], new: List[str]) -> List[str]:
+    """파일명 목록 추가 — 다시 올린 파일명은 기존 위치에서 빼고 뒤에 (printing_by_file 순서와 동일)."""
+    return [n for n in (base or []) if n not in new] + new
+
+
+def _merge_process_data(
+    base: Optional[ProcessData],
+    margin: ingest.ProcessMargin,
+    printing_filenames: List[str],
+    slitter_filenames: List[str],
+) -> ProcessData:
+    """
+    새로 계산한 파일별 결과(margin)를 기존 ProcessData(base, 없으면 새로 생성)에 합친다.
+    - 슬리터: 파일별 결과 추가(같은 파일명은 새 결과로 교체), 대표값 = 첫 번째 파일
+    - 프린팅: 새 파일이 있을 때만 저장된 파일별 결과 + 새 결과로 합산 재조립 (재파싱 없음)
+    - 기존 파일 결과는 다시 계산하지 않음
+    """
+    if base is None:
+        base = ProcessData(
+            printing_calc={}, carbon_rows=[], insulation_rows=[], slitter_rows=[],
+            row_points_carbon="", row_points_insulation="",
+            fabric_rows=[], stencil_detail=[], stencil_summary=[], interference_rows=[],
+            slitter_total_rows=[], slitter_by_file={}, slitter_total_by_file={},
+            slitter_filenames=[], printing_filenames=[], printing_by_file={},
+        )
+        printing_new = True
+    else:
+        printing_new = bool(printing_filenames)
+    # 다시 올린 슬리터 파일의 이전 결과는 제거 (새 파일에 슬리터 항목이 없을 수도 있음)
+    slitter_by_file = {k: v for k, v in (base.slitter_by_file or {}).items() if k not in slitter_filenames}
+    slitter_total_by_file = {k: v for k, v in (base.slitter_total_by_file or {}).items() if k not in slitter_filenames}
+    out = replace(
+        base,
+        slitter_by_file={**slitter_by_file, **margin.slitter_by_file},
+        slitter_total_by_file={**slitter_total_by_file, **margin.slitter_total_by_file},
+        slitter_filenames=_append_names(base.slitter_filenames, slitter_filenames),
+        printing_filenames=_append_names(base.printing_filenames, printing_filenames),
+    )
+
+    # 합산 결과 (MarginPage 호환 — 첫 번째 파일 데이터)
+    if out.slitter_by_file:
+        out.slitter_rows = out.slitter_by_file.get(out.slitter_filenames[0], [])
+        out.slitter_total_rows = out.slitter_total_by_file.get(out.slitter_filenames[0], [])
+
+    if not printing_new:
+        return out
+
+    # 파일별 결과는 업로드 순서 유지 (같은 파일명은 뒤로 옮겨 새 결과로 교체)
+    by_file = dict(base.printing_by_file or {})
+    calcs = [ingest.printing_calc_from_entry(e) for e in by_file.values()]
+    for name in margin.printing_by_file:
+        if name in by_file:
+            del calcs[list(by_file).index(name)]
+            del by_file[name]
+    entries = list(by_file.values())
+    for name, entry in margin.printing_by_file.items():
+        by_file[name] = entry
+    # 같은 요청 안의 같은 파일명도 합산에는 모두 반영 (전체 파일 분석과 동일)
+    calcs += margin.printing_calcs
+    entries += margin.printing_entries
+
+    printing = ingest.merge_printing(calcs, entries)
+    out.printing_calc = {str(k): v for k, v in printing["printingCalc"].items()}
+    out.carbon_rows = printing["carbon"]
+    out.insulation_rows = printing["insulation"]
+    out.row_points_carbon = printing["rowPointsCarbon"]
+    out.row_points_insulation = printing["rowPointsInsulation"]
+    out.fabric_rows = printing["fabric"]
+    out.stencil_detail = printing["stencilDetail"]
+    out.stencil_summary = printing["stencilSummary"]
+    out.interference_rows = printing["interference"]
+    out.row_points_interference = printing["rowPointsInterference"]
+    out.printing_by_file = by_file
+    return out
+
+
+def _process_payload(job_id: str, pd_data: ProcessData) -> Dict:
+    return {
+        "jobId": job_id,
+        "carbon": pd_data.carbon_rows,
+        "insulation": pd_data.insulation_rows,
+        "slitter": pd_data.slitter_rows,
+        "rowPointsCarbon": pd_data.row_points_carbon,
+        "rowPointsInsulation": pd_data.row_points_insulation,
+        "fabric": pd_data.fabric_rows or [],
+        "stencilDetail": pd_data.stencil_detail or [],
+        "stencilSummary": pd_data.stencil_summary or [],
+        "interference": pd_data.interference_rows or [],
+        "rowPointsInterference": pd_data.row_points_interference or "",
+        "slitterTotal": pd_data.slitter_total_rows or [],
+        "printingCalc": pd_data.printing_calc or {},
+        "slitterByFile": pd_data.slitter_by_file or {},
+        "slitterTotalByFile": pd_data.slitter_total_by_file or {},
+        "slitterFilenames": pd_data.slitter_filenames or [],
+        "printingFilenames": pd_data.printing_filenames or [],
+        "printingByFile": pd_data.printing_by_file or {},
+    }
+
+
 @app.post("/api/v1/measurements/upload-process/{job_id}")
 async def upload_process_files(
     job_id: str,
     printing_files: Optional[List[UploadFile]] = File(None),
     slitter_files: Optional[List[UploadFile]] = File(None),
+    append: bool = Query(False),
 ):
     """
     기능: 프린팅/슬리터 CSV 업로드 → 공정마진 계산
     입력: job_id, printing_files (프린팅 CSV), slitter_files (슬리터 CSV)
+          append=true : 기존 공정마진 데이터에 새 파일만 계산해서 추가 (기본: 전체 교체)
     출력: { jobId, carbon: [...], insulation: [...], slitter: [...] }
 
     프론트엔드에서 FormData 필드명으로 파일 종류를 구분하여 전송
@@ -432,130 +630,31 @@ async def upload_process_files(
     if slitter_files is None:
         slitter_files = []
 
-    printing_dfs = []
-    slitter_dfs = []
-    printing_filenames = []
-    slitter_filenames = []
+    base = job.process_data if append else None
+    if printing_files and base is not None and base.printing_filenames and base.printing_by_file is None:
+        # 파일별 프린팅 결과가 없는(이전 버전에서 저장된) 데이터는 합산을 다시 만들 수 없음
+        raise HTTPException(status_code=409, detail="기존 공정마진 데이터에 파일별 프린팅 결과가 없습니다. 전체 파일로 다시 업로드하세요.")
 
-    # 프린팅 파일 처리
-    for f in printing_files:
-        raw = await f.read()
-        df = core.parse_tabular_like(raw)
-        printing_dfs.append(df)
-        printing_filenames.append(f.filename or f"printing_{len(printing_filenames)+1}")
+    # 파일 읽기(비동기) → 프린팅/슬리터 파일별 분석은 ingest 워커 풀에서 동시 실행
+    printing_items = [
+        (f.filename or f"printing_{i + 1}", await f.read()) for i, f in enumerate(printing_files)
+    ]
+    slitter_items = [
+        (f.filename or f"slitter_{i + 1}", await f.read()) for i, f in enumerate(slitter_files)
+    ]
+    printing_filenames = [name for name, _raw in printing_items]
+    slitter_filenames = [name for name, _raw in slitter_items]
 
-    # 슬리터 파일 처리
-    for f in slitter_files:
-        raw = await f.read()
-        df = core.parse_tabular_like(raw)
-        slitter_dfs.append(df)
-        slitter_filenames.append(f.filename or f"slitter_{len(slitter_filenames)+1}")
-
-    # ── 프린팅 파일에서 5가지 분석 ──
-    calc_map = {}
-    carbon_rows = []
-    insulation_rows = []
-    rp_carbon_name = ""
-    rp_insulation_name = ""
-    fabric_rows = []
-    stencil_detail = []
-    stencil_summary = []
-    interference_rows = []
-    rp_intf_name = ""
-
-    if printing_dfs:
-        printing_all = pd.concat(printing_dfs, ignore_index=True)
-
-        # (1) 원단 분석 — "거리 타발" 항목
-        dist_df = core.extract_distances(printing_all)
-        if not dist_df.empty:
-            fabric_rows = core.compute_fabric(dist_df)
-
-        # (2) 스텐실 분석 — "거리 카본/절연" 항목
-        if not dist_df.empty:
-            stencil_detail, stencil_summary = core.compute_stencil(dist_df)
-
-        # (3) 프린팅 마진 — "계산기 타발기준" 항목
-        calc_map = core.extract_printing_calc(printing_all)
-        if calc_map:
-            has_carbon = any(k[1] == "카본" for k in calc_map.keys())
-            if has_carbon:
-                rp_carbon_name, rp_carbon = core._pick_row_points(calc_map, layer="카본")
-                carbon_rows = core.compute_printing_layer(calc_map, "카본", row_points=rp_carbon)
-
-            has_insulation = any(k[1] == "절연" for k in calc_map.keys())
-            if has_insulation:
-                rp_insulation_name, rp_insulation = core._pick_row_points(calc_map, layer="절연")
-                insulation_rows = core.compute_printing_layer(calc_map, "절연", row_points=rp_insulation)
-
-            # (4) 레이어간 간섭 — "계산기 카본기준" 항목
-            has_intf = any(k[0] == "카본기준" for k in calc_map.keys())
-            if has_intf:
-                rp_intf_name, rp_intf = core._pick_row_points(calc_map, layer="절연", ref="카본기준")
-                interference_rows = core.compute_printing_layer(
-                    calc_map, "절연", ref="카본기준", row_points=rp_intf
-                )
-
-    # ── 슬리터 파일에서 분석 (v4.8: 파일별 개별 처리) ──
-    slitter_rows = []
-    slitter_total_rows = []
-    slitter_by_file = {}
-    slitter_total_by_file = {}
-
-    if slitter_dfs:
-        # 파일별 개별 처리 (파일 identity 보존)
-        for fname, sdf in zip(slitter_filenames, slitter_dfs):
-            slit_items = core.extract_slitter_items(sdf)
-            if not slit_items.empty:
-                slitter_by_file[fname] = core.compute_slitter_punch(slit_items)
-                slitter_total_by_file[fname] = core.compute_slitter_total(slit_items)
-
-        # 합산 결과 (MarginPage 호환 — 첫 번째 파일 데이터)
-        if slitter_by_file:
-            first_key = slitter_filenames[0]
-            slitter_rows = slitter_by_file.get(first_key, [])
-            slitter_total_rows = slitter_total_by_file.get(first_key, [])
-
-    # ── 저장 ──
-    process_data = ProcessData(
-        printing_calc={str(k): v for k, v in calc_map.items()},
-        carbon_rows=carbon_rows,
-        insulation_rows=insulation_rows,
-        slitter_rows=slitter_rows,
-        row_points_carbon=rp_carbon_name,
-        row_points_insulation=rp_insulation_name,
-        fabric_rows=fabric_rows,
-        stencil_detail=stencil_detail,
-        stencil_summary=stencil_summary,
-        interference_rows=interference_rows,
-        row_points_interference=rp_intf_name,
-        slitter_total_rows=slitter_total_rows,
-        slitter_by_file=slitter_by_file,
-        slitter_total_by_file=slitter_total_by_file,
-        slitter_filenames=slitter_filenames,
-        printing_filenames=printing_filenames,
-    )
-    job.process_data = process_data
+    margin = await ingest.compute_process_margin(printing_items, slitter_items)
 
-    return {
-        "jobId": job_id,
-        "carbon": carbon_rows,
-        "insulation": insulation_rows,
-        "slitter": slitter_rows,
-        "rowPointsCarbon": rp_carbon_name,
-        "rowPointsInsulation": rp_insulation_name,
-        "fabric": fabric_rows,
-        "stencilDetail": stencil_detail,
-        "stencilSummary": stencil_summary,
-        "interference": interference_rows,
-        "rowPointsInterference": rp_intf_name,
-        "slitterTotal": slitter_total_rows,
-        "printingCalc": {str(k): v for k, v in calc_map.items()},
-        "slitterByFile": slitter_by_file,
-        "slitterTotalByFile": slitter_total_by_file,
-        "slitterFilenames": slitter_filenames,
-        "printingFilenames": printing_filenames,
-    }
+    # ── 저장 ── (계산 대기 후 최신 process_data 기준으로 합침: await 없이 교체까지 수행)
+    if append:
+        base = job.process_data
+    job.process_data = _merge_process_data(base, margin, printing_filenames, slitter_filenames)
+    await run_in_threadpool(_JOBS.save_process, job)
+    await run_in_threadpool(_record_printing_trends, printing_filenames, margin.printing_calcs, time.time())
+
+    return _process_payload(job_id, job.process_data)
 
 
 @app.get("/api/v1/measurements/process/{job_id}")
@@ -571,27 +670,9 @@ def get_process_data(job_id: str):
                 "fabric": [], "stencilDetail": [], "stencilSummary": [],
                 "interference": [], "slitterTotal": [],
                 "slitterByFile": {}, "slitterTotalByFile": {},
-                "slitterFilenames": [], "printingFilenames": []}
+                "slitterFilenames": [], "printingFilenames": [], "printingByFile": {}}
 
-    return {
-        "jobId": job_id,
-        "carbon": pd_data.carbon_rows,
-        "insulation": pd_data.insulation_rows,
-        "slitter": pd_data.slitter_rows,
-        "rowPointsCarbon": pd_data.row_points_carbon,
-        "rowPointsInsulation": pd_data.row_points_insulation,
-        "fabric": pd_data.fabric_rows or [],
-        "stencilDetail": pd_data.stencil_detail or [],
-        "stencilSummary": pd_data.stencil_summary or [],
-        "interference": pd_data.interference_rows or [],
-        "rowPointsInterference": pd_data.row_points_interference or "",
-        "slitterTotal": pd_data.slitter_total_rows or [],
-        "printingCalc": pd_data.printing_calc or {},
-        "slitterByFile": pd_data.slitter_by_file or {},
-        "slitterTotalByFile": pd_data.slitter_total_by_file or {},
-        "slitterFilenames": pd_data.slitter_filenames or [],
-        "printingFilenames": pd_data.printing_filenames or [],
-    }
+    return _process_payload(job_id, pd_data)
 
 
 # =============================================================================
@@ -606,6 +687,16 @@ class SimulationRequest(BaseModel):
     assembly_y: List[float] = [0.0] * 12
 
 
+def _offsets_dict(req: SimulationRequest) -> Dict:
+    return {
+        "printing_x": req.printing_x,
+        "printing_y": req.printing_y,
+        "slitter_y": req.slitter_y,
+        "assembly_x": req.assembly_x,
+        "assembly_y": req.assembly_y,
+    }
+
+
 @app.post("/api/v1/measurements/sheets/{job_id}/{sheet_key}/simulate")
 def simulate_sheet_adjustment(job_id: str, sheet_key: str, req: SimulationRequest):
     """
@@ -618,26 +709,92 @@ def simulate_sheet_adjustment(job_id: str, sheet_key: str, req: SimulationReques
     if sd is None:
         raise HTTPException(status_code=404, detail="sheetKey not found")
 
-    offsets = {
-        "printing_x": req.printing_x,
-        "printing_y": req.printing_y,
-        "slitter_y": req.slitter_y,
-        "assembly_x": req.assembly_x,
-        "assembly_y": req.assembly_y,
-    }
-    result = core.simulate_adjustment(sd.row_df, offsets, th=None)
+    result = core.simulate_adjustment(sd.row_df, _offsets_dict(req), th=None)
     return result
 
 
+SWEEP_MAX_CANDIDATES = 20000
+
+
+class SweepRequest(BaseModel):
+    base: SimulationRequest = SimulationRequest()     # 그리드 축 외 고정 오프셋
+    printing_x: List[float] = []                      # 그리드 축 (비우면 base 값 1개)
+    printing_y: List[float] = []
+    candidates: List[SimulationRequest] = []          # 개별 오프셋 벡터 (그리드와 함께 쓰면 그리드 뒤에 평가)
+
+
+def _sweep_columns(res: Dict, sl: slice, n_cols: Optional[int] = None) -> Dict:
+    """simulate_sweep 결과 구간 → {worstX, worstY, score, status} 리스트 (n_cols가 있으면 [iy][ix] 2차원)."""
+    def _grid(vals: List) -> List:
+        return vals if n_cols is None else [vals[i : i + n_cols] for i in range(0, len(vals), n_cols)]
+
+    def _round(arr, nd: int) -> List:
+        return [round(x, nd) if x == x else None for x in arr[sl].tolist()]
+
+    return {
+        "worstX": _grid(_round(res["worstX"], 4)),
+        "worstY": _grid(_round(res["worstY"], 4)),
+        "score": _grid(_round(res["score"], 1)),
+        "status": _grid(res["status"][sl].tolist()),
+    }
+
+
+@app.post("/api/v1/measurements/sheets/{job_id}/{sheet_key}/simulate/sweep")
+def simulate_sheet_sweep(job_id: str, sheet_key: str, req: SweepRequest):
+    """
+    여러 오프셋 후보의 After 지표를 한 번에 계산한다 (히트맵용).
+    입력: base + printing_x/printing_y 그리드 축, 또는 candidates(개별 오프셋)
+    출력: { count, grid{printing_x, printing_y, worstX/worstY/score/status [iy][ix]} | null,
+            candidates{worstX/worstY/score/status [i]} | null }
+    """
+    job = _JOBS.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="jobId not found")
+    sd = job.sheets.get(sheet_key)
+    if sd is None:
+        raise HTTPException(status_code=404, detail="sheetKey not found")
+
+    use_grid = bool(req.printing_x or req.printing_y)
+    gx = req.printing_x or [req.base.printing_x]
+    gy = req.printing_y or [req.base.printing_y]
+    n_grid = len(gx) * len(gy) if use_grid else 0
+    total = n_grid + len(req.candidates)
+    if total == 0:
+        raise HTTPException(status_code=400, detail="그리드 축 또는 candidates가 필요합니다.")
+    if total > SWEEP_MAX_CANDIDATES:
+        raise HTTPException(status_code=400, detail=f"후보 수가 너무 많습니다 ({total} > {SWEEP_MAX_CANDIDATES}).")
+
+    parts = []
+    if use_grid:
+        # 행(iy) = printing_y, 열(ix) = printing_x. Row별 오프셋은 base 값 반복
+        mx, my = np.meshgrid(np.asarray(gx, dtype=float), np.asarray(gy, dtype=float))
+        _bx, _by, sy, ax, ay = core.offset_arrays([_offsets_dict(req.base)])
+        parts.append((mx.ravel(), my.ravel(), *(np.repeat(a, n_grid, axis=0) for a in (sy, ax, ay))))
+    if req.candidates:
+        parts.append(core.offset_arrays([_offsets_dict(c) for c in req.candidates]))
+    px, py, sy, ax, ay = (np.concatenate(cols) for cols in zip(*parts))
+
+    res = core.simulate_sweep(sd.row_df, px, py, sy, ax, ay, th=None)
+    return {
+        "count": total,
+        "grid": {"printing_x": gx, "printing_y": gy, **_sweep_columns(res, slice(0, n_grid), len(gx))} if use_grid else None,
+        "candidates": _sweep_columns(res, slice(n_grid, total)) if req.candidates else None,
+    }
+
+
 @app.get("/api/v1/measurements/sheets/{job_id}/{sheet_key}/recommended-offsets")
 def get_recommended_offsets(
     job_id: str,
     sheet_key: str,
     slitter_available: bool = Query(True),
+    mode: str = Query("heuristic"),
 ):
     """
-    Worst Row 기준 추천 보정값을 반환한다.
+    추천 보정값을 반환한다.
+    mode: heuristic(기존 Worst Row 기준) | optimize(장비 단위/범위 내 worst 최소화, predicted 점수 포함)
     """
+    if mode not in core.RECOMMEND_MODES:
+        raise HTTPException(status_code=400, detail=f"mode는 {'/'.join(core.RECOMMEND_MODES)} 중 하나여야 합니다.")
     job = _JOBS.get(job_id)
     if job is None:
         raise HTTPException(status_code=404, detail="jobId not found")
@@ -645,13 +802,133 @@ def get_recommended_offsets(
     if sd is None:
         raise HTTPException(status_code=404, detail="sheetKey not found")
 
-    recommended = core.compute_recommended_offsets(sd.row_df, slitter_available=slitter_available)
+    recommended = core.compute_recommended_offsets(sd.row_df, slitter_available=slitter_available, mode=mode)
     return recommended
 
 
+def _score_distribution(sc: Dict[str, np.ndarray]) -> Dict:
+    """시트별 점수 배열 → 분포 요약 + 상태별 시트 수."""
+    s = sc["score"]
+    q = np.percentile(s, [10, 50, 90])
+    return {
+        "mean": round(float(s.mean()), 1),
+        "min": round(float(s.min()), 1),
+        "p10": round(float(q[0]), 1),
+        "median": round(float(q[1]), 1),
+        "p90": round(float(q[2]), 1),
+        "max": round(float(s.max()), 1),
+        "counts": {label: int((sc["status"] == label).sum()) for label in ("MUST", "CHECK", "OK")},
+    }
+
+
+@app.get("/api/v1/measurements/recommended-offsets/{job_id}")
+def get_job_recommended_offsets(
+    job_id: str,
+    slitter_available: bool = Query(True),
+    lot: Optional[str] = Query(None),
+    status: Optional[str] = Query(None),
+):
+    """
+    Job(또는 로트/상태 필터) 전체 시트에 공통으로 적용할 추천 보정값 1세트.
+    목표: 시트 평균 qualityScore 최대 (core.compute_job_recommended_offsets)
+    출력: { jobId, filter, sheetCount, offsets, before/after {mean, min, p10, median, p90, max, counts{MUST,CHECK,OK}},
+            sheets[{sheetKey, before{score,status}, after{score,status}}] }
+    """
+    job = _JOBS.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="jobId not found")
+
+    # sheetKey = 일자|라인명|로트명|상태|시트넘버 → 키로 먼저 거르고 해당 시트만 로드
+    keys = [
+        k for k in job.sheets
+        if (lot is None or k.split("|")[2] == lot) and (status is None or k.split("|")[3] == status)
+    ]
+    entries = [(k, job.sheets[k].row_df) for k in keys]
+    entries = [(k, df) for k, df in entries if len(df)]
+    if not entries:
+        raise HTTPException(status_code=404, detail="조건에 맞는 시트가 없습니다.")
+
+    res = core.compute_job_recommended_offsets([df for _k, df in entries], slitter_available=slitter_available)
+    before, after = res["before"], res["after"]
+    return {
+        "jobId": job_id,
+        "filter": {"lot": lot, "status": status},
+        "sheetCount": len(entries),
+        "offsets": res["offsets"],
+        "before": _score_distribution(before),
+        "after": _score_distribution(after),
+        "sheets": [
+            {
+                "sheetKey": k,
+                "before": {"score": round(float(before["score"][i]), 1), "status": before["status"][i]},
+                "after": {"score": round(float(after["score"][i]), 1), "status": after["status"][i]},
+            }
+            for i, (k, _df) in enumerate(entries)
+        ],
+    }
+
+
+# =============================================================================
+# [STEP4] 품질 추이 (시계열)
+# =============================================================================
+@app.get("/api/v1/trends")
+def get_trend_summary():
+    """
+    기능: 추이 저장소 요약
+    출력: { points, metrics{지표: 포인트 수}, start, end, lines[], lots[], statuses[] }
+    """
+    return _TRENDS.summary()
+
+
+@app.post("/api/v1/trends/dispensing")
+async def upload_dispensing_trends(files: List[UploadFile] = File(...)):
+    """
+    기능: 분주 CSV → 파일별 분주면적 CV(dispensingCv) 추이 기록 (Job과 무관)
+    입력: files (분주 CSV, 여러 개)
+    출력: { added, files[{filename, cv}] } — 분주면적 세트가 없는 파일은 cv=null (기록 안 함)
+    """
+    uploaded_at = time.time()
+    out, added = [], 0
+    for i, f in enumerate(files):
+        name = f.filename or f"dispensing_{i + 1}"
+        raw = await f.read()
+        cv = await run_in_threadpool(lambda: core.dispensing_area_cv(core.parse_tabular_like(raw)))
+        if cv == cv:
+            added += await run_in_threadpool(_TRENDS.record_file, "dispensingCv", name, cv, {}, uploaded_at)
+        out.append({"filename": name, "cv": cv if cv == cv else None})
+    return {"added": added, "files": out}
+
+
+@app.get("/api/v1/trends/{metric}")
+def get_trend(
+    metric: str,
+    bucket: str = Query("1d"),
+    start: Optional[str] = Query(None),
+    end: Optional[str] = Query(None),
+    row: int = Query(0),
+    line: Optional[str] = Query(None),
+    lot: Optional[str] = Query(None),
+    status: Optional[str] = Query(None),
+):
+    """
+    기능: 지표 1개의 시간 버킷별 min/max/mean (한 달치도 호출 1번)
+    입력: metric (trendstore.TREND_METRICS), bucket ("1h"/"1d"/"1w"/초), start/end (ISO, end 미포함),
+          row (0 = 시트 단위, 1~ = Row), line/lot/status (파일명 키 필터)
+    출력: { metric, row, bucketSeconds, total, t[], count[], min[], max[], mean[] }
+    """
+    if metric not in trendstore.TREND_METRICS:
+        raise HTTPException(status_code=404, detail=f"metric은 {'/'.join(trendstore.TREND_METRICS)} 중 하나여야 합니다.")
+    try:
+        bucket_s = trendstore.parse_bucket(bucket)
+        t0, t1 = trendstore.parse_time(start), trendstore.parse_time(end)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _TRENDS.query(metric, bucket=bucket_s, start=t0, end=t1, row=row, line=line, lot=lot, status=status)
+
+
 # =============================================================================
 # [DEBUG] 헬스 체크
 # =============================================================================
 @app.get("/health")
 def health():
-    return {"ok": True, "jobs": len(_JOBS)}
+    return {"ok": True, "jobs": len(_JOBS), "trendPoints": len(_TRENDS), "parseCache": parse_cache.PARSE_CACHE.stats()}
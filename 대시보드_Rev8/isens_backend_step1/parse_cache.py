@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+# [FILE] parse_cache.py
+# [PURPOSE] 업로드 CSV 파싱 결과 캐시 — 원본 바이트 해시(+파서 버전) 기준
+#
+# - 같은 파일을 다시 올리면 해시 1회 + 조회 1회로 decode/정규식/pandas 처리를 건너뜀
+# - 키: blake2b(raw) + 종류(kind) + core.PARSER_VERSION
+# - 값: 파싱 결과 객체(DataFrame/dict) 그대로 — 호출측은 읽기 전용으로 사용
+# - 크기 제한: 항목 수 기준 LRU (ISENS_PARSE_CACHE_SIZE, 기본 2048)
+# - hit/miss 통계는 /health에 노출
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import core
+
+
+class ParseCache:
+    """스레드 안전 LRU 캐시 + hit/miss 카운터."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._data: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(raw: bytes, kind: str) -> str:
+        return f"{kind}:v{core.PARSER_VERSION}:{hashlib.blake2b(raw, digest_size=16).hexdigest()}"
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            val = self._data.get(key)
+            if val is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return val
+
+    def put(self, key: str, val: Any) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._data[key] = val
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hitRate": round(self.hits / total, 4) if total else None,
+                "size": len(self._data),
+                "maxSize": self.max_size,
+            }
+
+
+PARSE_CACHE = ParseCache(int(os.environ.get("ISENS_PARSE_CACHE_SIZE", "2048")))
+
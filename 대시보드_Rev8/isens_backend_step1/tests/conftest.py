@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+"""
+# [FILE] tests/conftest.py
+# [PURPOSE] 테스트에서 백엔드 모듈(core, bench …)을 그대로 import 하도록 앱 폴더를 sys.path에 추가
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,597 @@
+# -*- coding: utf-8 -*-
+"""
+# [FILE] tests/legacy_step1.py
+# [PURPOSE] 동등성 테스트 기준 — 벡터화 이전 Step1 구현을 그대로 보관 (수정 금지)
+#
+# - read_measurement_csv / pivot_row_values : 2579dcf 이전 core.py (줄 단위 파싱 + pick() 7회)
+# - build_step1_detail_summary (+ 보조 함수)  : 7602c1a 이전 core.py (iterrows / apply 기반)
+"""
+from __future__ import annotations
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+# =============================================================================
+# 2579dcf 이전: 측정 CSV 파싱 / Row 피벗
+# =============================================================================
+ITEM_RE = re.compile(
+    r'^\s*"?\s*(?P<test>.+?)_+(?P<pos>좌측|우측|좌|우|중|센터|L|R|C)_+(?P<row>\d+)\s*[:：]\s*(?P<metric>.+?)\s*"?\s*$'
+)
+
+
+_POS_MAP = {
+    "좌측": "좌",
+    "우측": "우",
+    "좌": "좌",
+    "우": "우",
+    "중": "중",
+    "센터": "중",
+    "L": "좌",
+    "R": "우",
+    "C": "중",
+}
+
+
+def _to_f(x) -> float:
+    try:
+        if x is None:
+            return np.nan
+        s = str(x).strip().strip('"').strip()
+        if s == "":
+            return np.nan
+        return float(s)
+    except Exception:
+        return np.nan
+
+
+def _decode_bytes(file_bytes: bytes) -> str:
+    for enc in ("utf-16", "utf-16-le", "utf-8-sig", "utf-8", "cp949"):
+        try:
+            return file_bytes.decode(enc)
+        except Exception:
+            continue
+    return file_bytes.decode("utf-8", errors="ignore")
+
+
+def read_measurement_csv(file_bytes: bytes) -> pd.DataFrame:
+    """
+    반환 컬럼:
+      - 검사종류, 위치(좌/중/우), Row(int), 측정항목, 계산값(float)
+    """
+    text = _decode_bytes(file_bytes)
+
+    lines = []
+    for ln in text.splitlines():
+        t = ln.strip()
+        if not t or t == ":BEGIN":
+            continue
+        lines.append(ln)
+
+    # delimiter guess: prefer tab
+    delim = "\t" if any("\t" in ln for ln in lines[:20]) else ","
+    if delim != "\t" and any(";" in ln for ln in lines[:20]):
+        delim = ";"
+
+    out_rows: List[Dict] = []
+    unmatched: List[str] = []
+
+    for ln in lines:
+        parts = [p.strip() for p in ln.split(delim)]
+        if not parts:
+            continue
+
+        item = parts[0].strip().strip('"').strip()
+        if not item:
+            continue
+
+        # 면적 항목 제외(대시보드 지표에서 사용 안 함)
+        if "면적" in item:
+            continue
+
+        # 계산값: 뒤에서부터 숫자 변환 가능한 값 찾기
+        calc = np.nan
+        for token in reversed(parts[1:]):
+            v = _to_f(token)
+            if pd.notna(v):
+                calc = v
+                break
+
+        m = ITEM_RE.match(item)
+        if not m:
+            if len(unmatched) < 50:
+                unmatched.append(item)
+            continue
+
+        d = m.groupdict()
+        test = (d.get("test") or "").strip()
+        pos_raw = (d.get("pos") or "").strip()
+        pos = _POS_MAP.get(pos_raw, pos_raw)
+        row = int(d.get("row"))
+        metric = (d.get("metric") or "").strip()
+
+        out_rows.append(
+            {
+                "검사종류": test,
+                "위치": pos,
+                "Row": row,
+                "측정항목": metric,
+                "계산값": float(calc) if pd.notna(calc) else np.nan,
+            }
+        )
+
+    df = pd.DataFrame(out_rows)
+    # 디버그용(원하면 나중에 화면에 노출 가능)
+    df.attrs["unmatched_items"] = unmatched
+    return df
+
+
+def pivot_row_values(long_df: pd.DataFrame) -> pd.DataFrame:
+    df = long_df.copy()
+    if df.empty:
+        return pd.DataFrame(columns=[
+            "Row","조립치우침L","조립치우침R","상하치우침L","상하치우침C","상하치우침R","타발홀L","타발홀R"
+        ])
+
+    def pick(test_name: str, metric_kw: Tuple[str, ...], pos: str) -> pd.Series:
+        sub = df[
+            (df["검사종류"].astype(str).str.contains(test_name, na=False))
+            & (df["측정항목"].apply(lambda x: any(k in str(x) for k in metric_kw)))
+            & (df["위치"] == pos)
+        ]
+        if sub.empty:
+            return pd.Series(dtype=float)
+        # Row별 abs 최대값을 대표값으로 사용
+        g = sub.groupby("Row")["계산값"]
+        return g.apply(lambda s: float(s.loc[s.abs().idxmax()]) if s.notna().any() else np.nan)
+
+    rows = sorted(set(pd.to_numeric(df["Row"], errors="coerce").dropna().astype(int).tolist()))
+    out = pd.DataFrame({"Row": rows}).set_index("Row")
+
+    out["조립치우침L"] = pick("계산기 양면", ("숫자",), "좌")
+    out["조립치우침R"] = pick("계산기 양면", ("숫자",), "우")
+    out["상하치우침L"] = pick("거리 양면상하", ("거리", "Y"), "좌")
+    out["상하치우침C"] = pick("거리 양면상하", ("거리", "Y"), "중")
+    out["상하치우침R"] = pick("거리 양면상하", ("거리", "Y"), "우")
+    out["타발홀L"] = pick("타원 타발홀", ("단축",), "좌")
+    out["타발홀R"] = pick("타원 타발홀", ("단축",), "우")
+
+    return out.reset_index()
+
+
+# =============================================================================
+# 7602c1a 이전: Step1 디테일 요약
+# =============================================================================
+def worst_abs(vals) -> float:
+    s = pd.to_numeric(pd.Series(list(vals)), errors="coerce").dropna()
+    if s.empty:
+        return np.nan
+    return float(s.abs().max())
+
+
+def compute_constraints(r: pd.Series) -> Tuple[float, float]:
+    """
+    c_asym: 좌/우 비대칭(절댓값 차이)
+    diag  : 사선(좌-우 기울기 proxy)
+    """
+    xl = pd.to_numeric(r.get("상하치우침L"), errors="coerce")
+    xr = pd.to_numeric(r.get("상하치우침R"), errors="coerce")
+    if pd.isna(xl) or pd.isna(xr):
+        return np.nan, np.nan
+    c_asym = float(abs(xl - xr))
+    diag = float(abs(xl + xr) / 2.0)  # 단순 proxy
+    return c_asym, diag
+
+
+def _th(th: Dict[str, float] | None, *keys: str, default: float) -> float:
+    """threshold dict에서 여러 키(별칭)를 허용."""
+    th = th or {}
+    for k in keys:
+        if k in th and th[k] is not None:
+            try:
+                return float(th[k])
+            except Exception:
+                pass
+    return float(default)
+
+
+def sheet_status(worst_x, worst_y, c_asym, diag, punch_w, th):
+    ng_x = _th(th, "ng_x", default=0.15)
+    ng_y = _th(th, "ng_y", default=0.15)
+
+    tag_x = _th(th, "tag_x", "x_tag", default=0.10)
+    tag_y = _th(th, "tag_y", "y_tag", default=0.10)
+    tag_p = _th(th, "tag_punch", "punch", default=0.10)
+    th_asym = _th(th, "th_asym", "casym", default=0.10)
+    th_diag = _th(th, "th_diag", "diag", default=0.10)
+
+    if (pd.notna(worst_x) and worst_x >= ng_x) or (pd.notna(worst_y) and worst_y >= ng_y):
+        return "MUST"
+
+    conds = []
+    if pd.notna(worst_x):
+        conds.append(worst_x >= tag_x)
+    if pd.notna(worst_y):
+        conds.append(worst_y >= tag_y)
+    if pd.notna(c_asym):
+        conds.append(c_asym >= th_asym)
+    if pd.notna(diag):
+        conds.append(diag >= th_diag)
+    if pd.notna(punch_w):
+        conds.append(punch_w >= tag_p)
+
+    return "CHECK" if any(conds) else "OK"
+
+
+def direction_label(axis: str, value: float, deadband: float) -> str:
+    """부호 → 방향 텍스트(현장용). deadband 이내면 '중심'."""
+    if value is None or pd.isna(value):
+        return "-"
+    if abs(float(value)) <= float(deadband):
+        return "중심"
+    if axis.upper() == "X":
+        return "우측쏠림" if float(value) > 0 else "좌측쏠림"
+    if axis.upper() == "Y":
+        return "상측쏠림" if float(value) > 0 else "하측쏠림"
+    return "-"
+
+
+def _argmax_abs(df: pd.DataFrame, cols: List[str]) -> Optional[Dict]:
+    """주어진 컬럼들에서 |값| 최대의 (rowId, side, value)를 찾는다."""
+    best = None
+    for c in cols:
+        if c not in df.columns:
+            continue
+        s = pd.to_numeric(df[c], errors="coerce")
+        if not s.notna().any():
+            continue
+        idx = s.abs().idxmax()
+        v = float(s.loc[idx])
+        row_id = df.loc[idx, "Row"] if "Row" in df.columns else None
+        cand = (abs(v), c, v, row_id)
+        if best is None or cand[0] > best[0]:
+            best = cand
+    if best is None:
+        return None
+    _abs, col, val, row_id = best
+    # side 파싱
+    side = "C" if col.endswith("C") else ("L" if col.endswith("L") else ("R" if col.endswith("R") else "-"))
+    return {"rowId": int(row_id) if pd.notna(row_id) else None, "side": side, "value": float(val), "col": col}
+
+
+def _row_severity_and_rep(df: pd.DataFrame) -> pd.DataFrame:
+    """Row별 severity(max(|X|,|Y|))와 대표 축/면/값을 생성."""
+    out = df.copy()
+    # numeric
+    for c in [
+        "조립치우침L","조립치우침R",
+        "상하치우침L","상하치우침C","상하치우침R",
+        "타발홀L","타발홀R",
+    ]:
+        if c in out.columns:
+            out[c] = pd.to_numeric(out[c], errors="coerce")
+
+    out["sev_x"] = out[[c for c in ["조립치우침L","조립치우침R"] if c in out.columns]].abs().max(axis=1)
+    out["sev_y"] = out[[c for c in ["상하치우침L","상하치우침C","상하치우침R"] if c in out.columns]].abs().max(axis=1)
+    out["severity"] = pd.concat([out["sev_x"], out["sev_y"]], axis=1).max(axis=1)
+
+    # 대표 축 선택: sev_x > sev_y => X, else Y (동률이면 Y)
+    rep_axis = np.where(out["sev_x"] > out["sev_y"], "X", "Y")
+    out["rep_axis"] = rep_axis
+
+    # 대표 side/value
+    def _pick_rep(row: pd.Series):
+        if row.get("rep_axis") == "X":
+            a = row.get("조립치우침L")
+            b = row.get("조립치우침R")
+            if pd.isna(a) and pd.isna(b):
+                return pd.Series({"rep_side": "-", "rep_value": np.nan})
+            if pd.isna(a):
+                return pd.Series({"rep_side": "R", "rep_value": float(b)})
+            if pd.isna(b):
+                return pd.Series({"rep_side": "L", "rep_value": float(a)})
+            return pd.Series({"rep_side": "L" if abs(float(a)) >= abs(float(b)) else "R", "rep_value": float(a) if abs(float(a)) >= abs(float(b)) else float(b)})
+        # Y
+        cand = {
+            "L": row.get("상하치우침L"),
+            "C": row.get("상하치우침C"),
+            "R": row.get("상하치우침R"),
+        }
+        cand = {k: v for k, v in cand.items() if v is not None and pd.notna(v)}
+        if not cand:
+            return pd.Series({"rep_side": "-", "rep_value": np.nan})
+        k = max(cand.keys(), key=lambda kk: abs(float(cand[kk])))
+        return pd.Series({"rep_side": k, "rep_value": float(cand[k])})
+
+    rep = out.apply(_pick_rep, axis=1)
+    out["rep_side"] = rep["rep_side"]
+    out["rep_value"] = rep["rep_value"]
+    return out
+
+
+def build_step1_detail_summary(
+    row_df: pd.DataFrame,
+    th: Dict[str, float] | None = None,
+    *,
+    deadband_x: float = 0.02,
+    deadband_y: float = 0.02,
+    tilt_thresh_y: float = 0.03,
+    bow_thresh_y: float = 0.03,
+) -> Dict:
+    """React 디테일(진단/TopN/미니카드)을 위한 요약 스키마 생성."""
+    th = th or {}
+    ng_x = _th(th, "ng_x", default=0.15)
+    ng_y = _th(th, "ng_y", default=0.15)
+    check_x = _th(th, "tag_x", "x_tag", default=0.10)
+    check_y = _th(th, "tag_y", "y_tag", default=0.10)
+    check_p = _th(th, "tag_punch", "punch", default=0.10)
+    th_asym = _th(th, "th_asym", "casym", "asym", default=0.10)
+    th_diag = _th(th, "th_diag", "diag", default=0.10)
+
+    df = row_df.copy()
+    if df.empty:
+        return {
+            "diagnosis": {"sheetStatus": "-", "summary": "Row 데이터가 없습니다.", "worstX": None, "worstY": None, "tags": []},
+            "problemRowsTop5": [],
+            "punchTop3": [],
+            "mini": {"x": None, "y": None},
+        }
+
+    # worstX / worstY
+    worst_x = _argmax_abs(df, ["조립치우침L", "조립치우침R"])
+    worst_y = _argmax_abs(df, ["상하치우침L", "상하치우침C", "상하치우침R"])
+
+    wx_val = worst_x["value"] if worst_x else np.nan
+    wy_val = worst_y["value"] if worst_y else np.nan
+
+    # constraints (시트 단위): Row별 compute_constraints를 최대값으로 집계
+    cas, dig = [], []
+    for _i, r in df.iterrows():
+        c_asym, diag = compute_constraints(r)
+        cas.append(c_asym)
+        dig.append(diag)
+    c_asym_sheet = worst_abs(cas)
+    diag_sheet = worst_abs(dig)
+    _pL = pd.to_numeric(df["타발홀L"], errors="coerce").dropna().tolist() if "타발홀L" in df.columns else []
+    _pR = pd.to_numeric(df["타발홀R"], errors="coerce").dropna().tolist() if "타발홀R" in df.columns else []
+    punch_w_sheet = worst_abs(_pL + _pR)
+
+    st_raw = sheet_status(abs(wx_val) if pd.notna(wx_val) else np.nan, abs(wy_val) if pd.notna(wy_val) else np.nan, c_asym_sheet, diag_sheet, punch_w_sheet, th)
+    sheet_st = "NG" if st_raw == "MUST" else st_raw
+
+    # tags (구조화)
+    tags = []
+    if pd.notna(c_asym_sheet) and c_asym_sheet >= th_asym:
+        tags.append({"name": "C_ASYM", "value": float(c_asym_sheet), "limit": float(th_asym)})
+    if pd.notna(diag_sheet) and diag_sheet >= th_diag:
+        tags.append({"name": "diag", "value": float(diag_sheet), "limit": float(th_diag)})
+
+    # X/Y tag
+    if pd.notna(wx_val) and abs(float(wx_val)) >= check_x:
+        tags.append({"name": "X", "value": float(abs(wx_val)), "limit": float(check_x)})
+    if pd.notna(wy_val) and abs(float(wy_val)) >= check_y:
+        tags.append({"name": "Y", "value": float(abs(wy_val)), "limit": float(check_y)})
+
+    # punch tag
+    pL = pd.to_numeric(df.get("타발홀L"), errors="coerce") if "타발홀L" in df.columns else pd.Series(dtype=float)
+    pR = pd.to_numeric(df.get("타발홀R"), errors="coerce") if "타발홀R" in df.columns else pd.Series(dtype=float)
+    punch_w = worst_abs(list(pL.dropna().tolist()) + list(pR.dropna().tolist()))
+    if pd.notna(punch_w) and punch_w >= check_p:
+        tags.append({"name": "Punch", "value": float(punch_w), "limit": float(check_p)})
+
+    # summary sentence (대표 축: worst 중 더 큰 축)
+    # NOTE: 표시는 프론트에서 2자리. 여기서는 값/row/side만 제공.
+    def _summary():
+        # choose representative axis
+        ax = "X" if (pd.notna(wx_val) and (pd.isna(wy_val) or abs(wx_val) >= abs(wy_val))) else "Y"
+        if sheet_st == "NG":
+            if ax == "X" and worst_x:
+                return {"axis": "X", "value": float(wx_val), "rowId": worst_x["rowId"], "side": worst_x["side"], "limit": float(ng_x)}
+            if worst_y:
+                return {"axis": "Y", "value": float(wy_val), "rowId": worst_y["rowId"], "side": worst_y["side"], "limit": float(ng_y)}
+        if sheet_st == "CHECK":
+            # punch 우선
+            if pd.notna(punch_w) and punch_w >= check_p:
+                return {"axis": "PUNCH", "value": float(punch_w), "rowId": None, "side": "-", "limit": float(check_p)}
+            if ax == "X" and worst_x:
+                return {"axis": "X", "value": float(wx_val), "rowId": worst_x["rowId"], "side": worst_x["side"], "limit": float(check_x)}
+            if worst_y:
+                return {"axis": "Y", "value": float(wy_val), "rowId": worst_y["rowId"], "side": worst_y["side"], "limit": float(check_y)}
+        return {"axis": "OK", "value": None, "rowId": None, "side": "-", "limit": None}
+
+    summary = _summary()
+
+    # mini card data (Row-level view uses L/R or L/C/R points)
+    def _mini_x():
+        if not ("조립치우침L" in df.columns or "조립치우침R" in df.columns):
+            return None
+        # 대표는 worst row 우선 (타입 불일치 방어: int 비교)
+        rid = worst_x["rowId"] if worst_x and worst_x.get("rowId") is not None else int(df["Row"].iloc[0])
+        matched = df[pd.to_numeric(df["Row"], errors="coerce") == int(rid)]
+        if matched.empty:
+            matched = df.head(1)
+        rr = matched.iloc[0]
+        xL = pd.to_numeric(rr.get("조립치우침L"), errors="coerce")
+        xR = pd.to_numeric(rr.get("조립치우침R"), errors="coerce")
+        x_center = float((xL + xR) / 2.0) if pd.notna(xL) and pd.notna(xR) else float(xL if pd.notna(xL) else (xR if pd.notna(xR) else np.nan))
+        x_skew = float((xR - xL) / 2.0) if pd.notna(xL) and pd.notna(xR) else np.nan
+        flags = []
+        if pd.notna(x_skew):
+            if abs(x_skew) >= float(max(2 * deadband_x, 0.03)):
+                flags.append({"type": "SKEW", "text": "R면 더 큼" if x_skew > 0 else "L면 더 큼", "value": float(x_skew), "thresh": float(max(2 * deadband_x, 0.03))})
+        pts = []
+        for side, v in [("L", xL), ("R", xR)]:
+            if pd.notna(v):
+                pts.append({"pos": side, "value": float(v)})
+        # worst mark
+        if pts:
+            worst_idx = max(range(len(pts)), key=lambda i: abs(float(pts[i]["value"])))
+            for i in range(len(pts)):
+                pts[i]["isWorst"] = (i == worst_idx)
+
+        return {
+            "axis": "X",
+            "ng": float(ng_x),
+            "deadband": float(deadband_x),
+            "centerValue": float(x_center) if pd.notna(x_center) else None,
+            "direction": direction_label("X", x_center, deadband_x),
+            "points": pts,
+            "flags": flags,
+            "rowId": int(rid),
+        }
+
+    def _mini_y():
+        if not any(c in df.columns for c in ["상하치우침L", "상하치우침C", "상하치우침R"]):
+            return None
+        rid = worst_y["rowId"] if worst_y and worst_y.get("rowId") is not None else int(df["Row"].iloc[0])
+        matched = df[pd.to_numeric(df["Row"], errors="coerce") == int(rid)]
+        if matched.empty:
+            matched = df.head(1)
+        rr = matched.iloc[0]
+        yL = pd.to_numeric(rr.get("상하치우침L"), errors="coerce")
+        yC = pd.to_numeric(rr.get("상하치우침C"), errors="coerce")
+        yR = pd.to_numeric(rr.get("상하치우침R"), errors="coerce")
+        vals = [v for v in [yL, yC, yR] if pd.notna(v)]
+        y_center = float(np.median(vals)) if vals else np.nan
+        y_tilt = float((yR - yL) / 2.0) if pd.notna(yL) and pd.notna(yR) else np.nan
+        y_bow = float(yC - (yL + yR) / 2.0) if pd.notna(yC) and pd.notna(yL) and pd.notna(yR) else np.nan
+        flags = []
+        if pd.notna(y_tilt) and abs(y_tilt) >= float(tilt_thresh_y):
+            flags.append({"type": "TILT", "text": "우측이 더 상측" if y_tilt > 0 else "좌측이 더 상측", "value": float(y_tilt), "thresh": float(tilt_thresh_y)})
+        if pd.notna(y_bow) and abs(y_bow) >= float(bow_thresh_y):
+            flags.append({"type": "BOW", "text": "가운데가 더 상측(뜸)" if y_bow > 0 else "가운데가 더 하측(처짐)", "value": float(y_bow), "thresh": float(bow_thresh_y)})
+
+        pts = []
+        for side, v in [("L", yL), ("C", yC), ("R", yR)]:
+            if pd.notna(v):
+                pts.append({"pos": side, "value": float(v)})
+        if pts:
+            worst_idx = max(range(len(pts)), key=lambda i: abs(float(pts[i]["value"])))
+            for i in range(len(pts)):
+                pts[i]["isWorst"] = (i == worst_idx)
+
+        return {
+            "axis": "Y",
+            "ng": float(ng_y),
+            "deadband": float(deadband_y),
+            "centerValue": float(y_center) if pd.notna(y_center) else None,
+            "direction": direction_label("Y", y_center, deadband_y),
+            "points": pts,
+            "flags": flags,
+            "rowId": int(rid),
+        }
+
+    mini_x = _mini_x()
+    mini_y = _mini_y()
+
+    # Problem Rows Top5
+    tmp = _row_severity_and_rep(df)
+
+    # rowStatus (선택) — 대표값 기준
+    def _row_status(row: pd.Series) -> str:
+        # NG if any exceed ng
+        x_ok = True
+        y_ok = True
+        if pd.notna(row.get("sev_x")):
+            x_ok = float(row.get("sev_x")) < float(ng_x)
+        if pd.notna(row.get("sev_y")):
+            y_ok = float(row.get("sev_y")) < float(ng_y)
+        if not (x_ok and y_ok):
+            return "NG"
+        # CHECK if exceed check or punch
+        if pd.notna(row.get("sev_x")) and float(row.get("sev_x")) >= float(check_x):
+            return "CHECK"
+        if pd.notna(row.get("sev_y")) and float(row.get("sev_y")) >= float(check_y):
+            return "CHECK"
+        # punch
+        psev = worst_abs([row.get("타발홀L"), row.get("타발홀R")])
+        if pd.notna(psev) and float(psev) >= float(check_p):
+            return "CHECK"
+        return "OK"
+
+    tmp["rowStatus"] = tmp.apply(_row_status, axis=1)
+    status_rank = tmp["rowStatus"].map({"NG": 2, "CHECK": 1, "OK": 0}).fillna(0)
+    tmp["_sr"] = status_rank
+    top5_df = tmp.sort_values(["_sr", "severity", "Row"], ascending=[False, False, True]).head(5)
+
+    top5 = []
+    for _, r in top5_df.iterrows():
+        axis = r.get("rep_axis")
+        side = r.get("rep_side")
+        val = r.get("rep_value")
+        db = deadband_x if axis == "X" else deadband_y
+        dir_txt = direction_label(axis, val, db)
+        top5.append({
+            "rowId": int(r.get("Row")) if pd.notna(r.get("Row")) else None,
+            "axis": axis,
+            "side": side,
+            "value": float(val) if pd.notna(val) else None,
+            "direction": dir_txt,
+            "rowStatus": str(r.get("rowStatus")),
+            "severity": float(r.get("severity")) if pd.notna(r.get("severity")) else None,
+        })
+
+    # Punch Top3
+    punch_rows = []
+    if "타발홀L" in df.columns or "타발홀R" in df.columns:
+        ptmp = df[[c for c in ["Row","타발홀L","타발홀R"] if c in df.columns]].copy()
+        ptmp["타발홀L"] = pd.to_numeric(ptmp.get("타발홀L"), errors="coerce") if "타발홀L" in ptmp.columns else np.nan
+        ptmp["타발홀R"] = pd.to_numeric(ptmp.get("타발홀R"), errors="coerce") if "타발홀R" in ptmp.columns else np.nan
+        ptmp["severity"] = ptmp[[c for c in ["타발홀L","타발홀R"] if c in ptmp.columns]].abs().max(axis=1)
+        ptmp = ptmp.sort_values(["severity","Row"], ascending=[False, True]).head(3)
+        for _, r in ptmp.iterrows():
+            a = r.get("타발홀L")
+            b = r.get("타발홀R")
+            if pd.isna(a) and pd.isna(b):
+                continue
+            side = "L" if (pd.notna(a) and (pd.isna(b) or abs(float(a)) >= abs(float(b)))) else "R"
+            val = float(a) if side == "L" else float(b)
+            punch_rows.append({
+                "rowId": int(r.get("Row")) if pd.notna(r.get("Row")) else None,
+                "axis": "PUNCH",
+                "side": side,
+                "value": val,
+                "direction": "기준초과" if abs(val) >= check_p else "정상",
+                "rowStatus": "CHECK" if abs(val) >= check_p else "OK",
+                "severity": float(r.get("severity")) if pd.notna(r.get("severity")) else None,
+            })
+
+    # worst objects with direction
+    worstX_obj = None
+    if worst_x:
+        worstX_obj = {
+            "value": float(wx_val),
+            "rowId": worst_x.get("rowId"),
+            "side": worst_x.get("side"),
+            "direction": direction_label("X", wx_val, deadband_x),
+            "ng": float(ng_x),
+            "check": float(check_x),
+        }
+    worstY_obj = None
+    if worst_y:
+        worstY_obj = {
+            "value": float(wy_val),
+            "rowId": worst_y.get("rowId"),
+            "side": worst_y.get("side"),
+            "direction": direction_label("Y", wy_val, deadband_y),
+            "ng": float(ng_y),
+            "check": float(check_y),
+        }
+
+    return {
+        "diagnosis": {
+            "sheetStatus": sheet_st,
+            "summary": summary,
+            "worstX": worstX_obj,
+            "worstY": worstY_obj,
+            "C_ASYM": float(c_asym_sheet) if pd.notna(c_asym_sheet) else None,
+            "diag": float(diag_sheet) if pd.notna(diag_sheet) else None,
+            "tags": tags,
+        },
+        "problemRowsTop5": top5,
+        "punchTop3": punch_rows,
+        "mini": {"x": mini_x, "y": mini_y},
+    }
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+# [FILE] tests/test_detail_equivalence.py
+# [PURPOSE] 배열 기반 build_step1_detail_summary 가 이전 iterrows/apply 구현과 같은 결과인지 무작위 입력으로 확인
+#
+# - 고정 시드 RNG로 Row 프레임 생성: NaN 셀, 빈 시트, 반올림 동률, 중복/섞인 Row, 빠진 컬럼, 임계값/데드밴드 변경
+# - 기준 구현: tests/legacy_step1.py (7602c1a 이전 core.py)
+"""
+from __future__ import annotations
+
+import json
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import core
+from tests import legacy_step1 as legacy
+
+N_CASES = 300
+VALUE_COLUMNS = ["조립치우침L", "조립치우침R", "상하치우침L", "상하치우침C", "상하치우침R", "타발홀L", "타발홀R"]
+TH_KEYS = ["ng_x", "ng_y", "tag_x", "tag_y", "tag_punch", "th_asym", "th_diag",
+           "x_tag", "y_tag", "punch", "casym", "asym", "diag"]
+
+
+def _dump(summary: dict) -> str:
+    return json.dumps(summary, sort_keys=True, ensure_ascii=False,
+                      default=lambda o: o.item() if hasattr(o, "item") else str(o))
+
+
+def _random_rows(rng: np.random.Generator) -> pd.DataFrame:
+    """무작위 Row 프레임 — 값 분포/결측/동률/Row 배치를 케이스마다 다르게."""
+    n = int(rng.integers(0, 16))
+    rows = np.arange(1, n + 1)
+    if n and rng.random() < 0.3:
+        rows = rng.permutation(rows)
+    if n and rng.random() < 0.2:
+        rows = np.concatenate([rows, rng.choice(rows, size=int(rng.integers(1, n + 1)))])
+    data: Dict[str, object] = {"Row": rows}
+    scale = float(rng.choice([0.02, 0.08, 0.2]))
+    for col in VALUE_COLUMNS:
+        if rng.random() < 0.1:
+            continue  # 컬럼 자체가 없는 시트
+        v = rng.normal(0.0, scale, size=len(rows))
+        if rng.random() < 0.4:
+            v = np.round(v, 2)  # 동률 (abs 최대/정렬 순서)
+        if rng.random() < 0.3:
+            v = np.where(rng.random(len(rows)) < 0.25, np.nan, v)
+        if rng.random() < 0.05:
+            v = np.full(len(rows), np.nan)
+        data[col] = v
+    df = pd.DataFrame(data)
+    if n and rng.random() < 0.1:
+        df["Row"] = df["Row"].astype(str)
+    return df
+
+
+def _random_th(rng: np.random.Generator) -> Optional[Dict[str, float]]:
+    if rng.random() < 0.5:
+        return None
+    keys = rng.choice(TH_KEYS, size=int(rng.integers(1, 5)), replace=False)
+    return {str(k): float(np.round(rng.uniform(0.01, 0.2), 3)) for k in keys}
+
+
+def _cases():
+    rng = np.random.default_rng(20240611)
+    out = []
+    for i in range(N_CASES):
+        kwargs = {}
+        if rng.random() < 0.3:
+            kwargs = {k: float(np.round(rng.uniform(0.0, 0.06), 3))
+                      for k in ("deadband_x", "deadband_y", "tilt_thresh_y", "bow_thresh_y")}
+        out.append(pytest.param(_random_rows(rng), _random_th(rng), kwargs, id=f"case{i}"))
+    return out
+
+
+@pytest.mark.parametrize("row_df,th,kwargs", _cases())
+def test_detail_summary_matches_legacy(row_df: pd.DataFrame, th, kwargs) -> None:
+    new = core.build_step1_detail_summary(row_df.copy(), th=th, **kwargs)
+    old = legacy.build_step1_detail_summary(row_df.copy(), th=th, **kwargs)
+    assert _dump(new) == _dump(old)
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+# [FILE] tests/test_parse_equivalence.py
+# [PURPOSE] 벡터화 read_measurement_csv / pivot_row_values / build_step1_detail_summary 가
+#           이전 구현(tests/legacy_step1.py)과 같은 결과인지 확인
+#
+# - 입력: 저장소 샘플 조립 CSV + 변형(행 섞기/중복) + bench.synth 합성 시트
+# - 비교: 컬럼 순서, dtype, 값(정확히 일치), attrs["unmatched_items"], 디테일 요약 JSON
+"""
+from __future__ import annotations
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import core
+from bench import synth
+from tests import legacy_step1 as legacy
+
+SAMPLES = os.path.join(os.path.dirname(__file__), "..", "..", "..", "production-dashboard", "data", "samples")
+
+
+def _sample_files():
+    if not os.path.isdir(SAMPLES):
+        return []
+    return sorted(os.path.join(SAMPLES, f) for f in os.listdir(SAMPLES) if f.endswith(".csv"))
+
+
+def _variants(raw: bytes, seed: int):
+    """샘플 → (원본, 행 섞기, 행 중복) — :BEGIN 블록 안의 데이터 행만 변형."""
+    text = raw.decode("utf-16")
+    lines = text.splitlines()
+    rng = np.random.default_rng(seed)
+    body = [i for i, ln in enumerate(lines) if "\t" in ln]
+    shuffled = list(lines)
+    for i, j in zip(body, rng.permutation(body)):
+        shuffled[i] = lines[j]
+    dup = list(lines)
+    for i in rng.choice(body, size=min(len(body), 10), replace=False) if body else []:
+        dup.insert(int(i), lines[int(i)])
+    return [raw] + [("\r\n".join(v) + "\r\n").encode("utf-16") for v in (shuffled, dup)]
+
+
+def _inputs():
+    out = []
+    for path in _sample_files():
+        with open(path, "rb") as f:
+            raw = f.read()
+        for k, v in enumerate(_variants(raw, seed=len(out))):
+            out.append(pytest.param(v, id=f"{os.path.basename(path)}-{k}"))
+    for name, raw in synth.generate_sheets(30, seed=7):
+        out.append(pytest.param(raw, id=f"synth-{name}"))
+    return out
+
+
+def _assert_same_frame(new: pd.DataFrame, old: pd.DataFrame) -> None:
+    assert list(new.columns) == list(old.columns)
+    assert list(new.dtypes) == list(old.dtypes)
+    pd.testing.assert_frame_equal(new, old, check_exact=True)
+
+
+def _dump(summary: dict) -> str:
+    """디테일 요약 비교용 JSON — numpy 스칼라는 파이썬 값으로, NaN 도 그대로 표기."""
+    return json.dumps(summary, sort_keys=True, ensure_ascii=False,
+                      default=lambda o: o.item() if hasattr(o, "item") else str(o))
+
+
+@pytest.mark.parametrize("raw", _inputs())
+def test_read_and_pivot_match_legacy(raw: bytes) -> None:
+    new_long = core.read_measurement_csv(raw)
+    old_long = legacy.read_measurement_csv(raw)
+    _assert_same_frame(new_long, old_long)
+    assert new_long.attrs.get("unmatched_items") == old_long.attrs.get("unmatched_items")
+
+    new_rows = core.pivot_row_values(new_long)
+    _assert_same_frame(new_rows, legacy.pivot_row_values(old_long))
+
+    assert (_dump(core.build_step1_detail_summary(new_rows.copy()))
+            == _dump(legacy.build_step1_detail_summary(new_rows.copy())))
+
+
+def test_empty_input_matches_legacy() -> None:
+    raw = ":BEGIN\r\n:END\r\n".encode("utf-16")
+    _assert_same_frame(core.read_measurement_csv(raw), legacy.read_measurement_csv(raw))
+    _assert_same_frame(core.pivot_row_values(core.read_measurement_csv(raw)),
+                       legacy.pivot_row_values(legacy.read_measurement_csv(raw)))
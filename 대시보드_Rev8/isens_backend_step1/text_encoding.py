@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+# [FILE] text_encoding.py
+# [PURPOSE] 계측 CSV 인코딩 판별 + 1회 디코딩
+#
+# - 장비 출력은 UTF-16 LE + BOM이 기본 → BOM만 보고 바로 결정(시도/예외 없음)
+# - BOM이 없으면 앞부분(prefix)의 NUL 바이트 분포로 UTF-16 LE/BE 추정
+# - 그 외: UTF-8 → CP949 순서로 시도, 모두 실패하면 UTF-8(errors, 기본 "replace")로 강제 디코딩 — 예외 없음
+# - 전체 버퍼 디코딩은 항상 1회 (BOM은 코덱이 제거)
+#
+# NOTE: production-dashboard/src/backend/parsers/text_encoding.py 와 동일 규칙/상수 이름/errors 기본값을 유지할 것
+"""
+from __future__ import annotations
+
+import codecs
+from typing import NamedTuple, Tuple
+
+# (BOM, 인코딩 이름, 디코딩 코덱) — 코덱이 BOM을 스스로 제거하므로 버퍼 슬라이스 불필요
+# ("utf-16"은 bytes.decode 내장 fast path라 "utf-16-le"보다 빠름)
+_BOMS: Tuple[Tuple[bytes, str, str], ...] = (
+    (codecs.BOM_UTF8, "utf-8-sig", "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16-le", "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16-be", "utf-16"),
+)
+
+SNIFF_BYTES = 512           # NUL 분포를 볼 앞부분 길이
+NUL_RATIO_UTF16 = 0.3       # 한쪽 바이트 위치의 NUL 비율이 이 이상이면 UTF-16으로 판단
+
+
+class DecodedText(NamedTuple):
+    text: str
+    encoding: str   # 실제 사용한 인코딩 (예: "utf-16-le", "utf-8-sig", "cp949", "utf-8(replace)")
+    bom: bool       # BOM으로 판별했는지
+
+
+def detect_encoding(data: bytes) -> Tuple[str | None, str | None, bool]:
+    """
+    BOM/prefix만 보고 인코딩 추정.
+    반환: (인코딩 이름, 디코딩 코덱, BOM 여부) — 코덱이 None이면 시도 디코딩 필요
+    """
+    for bom, enc, codec in _BOMS:
+        if data.startswith(bom):
+            return enc, codec, True
+
+    head = data[:SNIFF_BYTES]
+    half = len(head) // 2
+    if half:
+        nul_even = head[0::2].count(0) / half
+        nul_odd = head[1::2].count(0) / half
+        if nul_odd >= NUL_RATIO_UTF16 and nul_even < NUL_RATIO_UTF16:
+            return "utf-16-le", "utf-16-le", False
+        if nul_even >= NUL_RATIO_UTF16 and nul_odd < NUL_RATIO_UTF16:
+            return "utf-16-be", "utf-16-be", False
+    return None, None, False
+
+
+def decode_bytes(data: bytes, errors: str = "replace") -> DecodedText:
+    """바이트 → 텍스트. 판별된 인코딩으로 전체 버퍼를 1회만 디코딩한다."""
+    enc, codec, bom = detect_encoding(data)
+    if codec is not None:
+        try:
+            return DecodedText(data.decode(codec), enc, bom)
+        except UnicodeDecodeError:
+            # BOM/NUL 추정이 틀린 경우(손상 파일 등) → 일반 시도로 넘어감
+            pass
+
+    for cand in ("utf-8", "cp949"):
+        try:
+            return DecodedText(data.decode(cand), cand, False)
+        except UnicodeDecodeError:
+            continue
+    return DecodedText(data.decode("utf-8", errors=errors), f"utf-8({errors})", False)
@@ -0,0 +1,393 @@
+# -*- coding: utf-8 -*-
+"""
+# [FILE] trendstore.py
+# [PURPOSE] 품질 이력(추이) 저장소 — 시트/Row 지표를 append-only 컬럼 파일로 누적, 시간 버킷 다운샘플 조회
+#
+# [DATA] 포인트 1개 = (ts, metric, row, value) + 파일명 키(일자/라인명/로트명/상태/시트넘버)
+# - ts     : 파일명 일자 기준 로컬 시각(초, 1970-01-01 00:00 기준, 시간대 없음). 일자를 못 읽으면 업로드 시각
+# - metric : TREND_METRICS 순번 (새 지표는 뒤에만 추가 — 저장된 코드 유지)
+# - row    : 0 = 시트 단위, 1~ = Row 번호 (프린팅은 포인트 번호)
+# - 문자열 키는 사전 코드(int32)로 저장, 0 = 없음
+#
+# [STORAGE] 디렉터리 1개
+# - <컬럼>.bin : 컬럼별 raw 배열 (append만 함)
+# - meta.json  : 확정된 포인트 수 + 문자열 사전 (컬럼 append 후 원자적 교체)
+#   → 쓰는 도중 종료돼도 meta.json 이후 꼬리는 재시작 시 잘라냄
+#
+# [CONFIG] (환경변수)
+# - ISENS_TREND_STORE : "disk"(기본) | "memory"(재시작 시 삭제)
+# - ISENS_TREND_DIR   : 저장 디렉터리 (기본 ./data/trends)
+#
+# [NOTE]
+# - 같은 시트(같은 키 + 같은 값) / 같은 프린팅 파일 재업로드는 건너뜀 (uid 컬럼)
+# - 조회는 메모리 배열에서 마스크 + 정렬 1회 → 한 달치(수백만 포인트)도 한 번의 호출
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+import core
+
+
+# 시트 단위: worstX ~ score, Row 단위: worstX ~ punch, 프린팅 파일 단위: printingMaxDeviation, 분주 파일 단위: dispensingCv
+TREND_METRICS: Tuple[str, ...] = (
+    "worstX", "worstY", "cAsym", "diag", "punch", "score", "printingMaxDeviation", "dispensingCv",
+)
+
+# 시트 지표 → (score_sheets 키, row_metrics 키 or None)
+_SHEET_METRIC_KEYS = {
+    "worstX": ("worst_x", "worst_x"),
+    "worstY": ("worst_y", "worst_y"),
+    "cAsym": ("c_asym", "c_asym"),
+    "diag": ("diag", "diag"),
+    "punch": ("punch", "punch"),
+    "score": ("score", None),
+}
+
+_COLUMNS: Dict[str, np.dtype] = {
+    "ts": np.dtype("<i8"),
+    "metric": np.dtype("u1"),
+    "row": np.dtype("<i2"),
+    "value": np.dtype("<f8"),
+    "date": np.dtype("<i4"),
+    "line": np.dtype("<i4"),
+    "lot": np.dtype("<i4"),
+    "status": np.dtype("<i4"),
+    "sheet": np.dtype("<i4"),
+    "uid": np.dtype("<i8"),
+}
+_KEY_FIELDS = {"date": "일자", "line": "라인명", "lot": "로트명", "status": "상태"}
+
+_EPOCH = datetime(1970, 1, 1)
+_BUCKET_ORIGIN = 4 * 86400  # 1970-01-05(월) — 주 단위 버킷이 월요일 00:00에 시작 (일/시간 버킷 경계는 그대로)
+_BUCKET_RE = re.compile(r"^\s*(\d+)\s*([smhdw]?)\s*$")
+_BUCKET_UNIT = {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400, "w": 7 * 86400}
+
+
+# =============================================================================
+# 시간 변환
+# =============================================================================
+def _local_seconds(dt: datetime) -> int:
+    return int((dt - _EPOCH).total_seconds())
+
+
+def to_iso(ts: int) -> str:
+    return (_EPOCH + timedelta(seconds=int(ts))).isoformat()
+
+
+def parse_time(text: Optional[str]) -> Optional[int]:
+    """
+    ISO 날짜/시각 문자열(2026-01-23, 2026-01-23T08:00) → ts. None이면 None.
+    시간대가 붙은 값(2026-01-01T00:00:00.000Z 등 JS toISOString)은 서버 로컬 시각으로 변환.
+    """
+    if text is None or text == "":
+        return None
+    dt = datetime.fromisoformat(text)
+    if dt.tzinfo is not None:
+        dt = dt.astimezone().replace(tzinfo=None)
+    return _local_seconds(dt)
+
+
+def parse_bucket(text: str) -> int:
+    """버킷 크기 "15m" / "1h" / "1d" / "1w" / 초(숫자) → 초."""
+    m = _BUCKET_RE.match(str(text).lower())
+    if not m or int(m.group(1)) <= 0:
+        raise ValueError(f"bucket 형식 오류: {text}")
+    return int(m.group(1)) * _BUCKET_UNIT[m.group(2)]
+
+
+def point_time(date_text: Optional[str], fallback_ts: float) -> int:
+    """
+    파일명 일자 → ts (그날 00:00).
+    YYYYMMDD / YYMMDD / MMDD(연도는 업로드 시각 기준, 미래 날짜면 전년도), 못 읽으면 업로드 시각.
+    """
+    now = datetime.fromtimestamp(fallback_ts)
+    s = re.sub(r"\D", "", str(date_text or ""))
+    try:
+        if len(s) == 8:
+            d = datetime(int(s[:4]), int(s[4:6]), int(s[6:]))
+        elif len(s) == 6:
+            d = datetime(2000 + int(s[:2]), int(s[2:4]), int(s[4:]))
+        elif len(s) == 4:
+            d = datetime(now.year, int(s[:2]), int(s[2:]))
+            if d > now:
+                d = d.replace(year=now.year - 1)
+        else:
+            d = now
+    except ValueError:
+        d = now
+    return _local_seconds(d)
+
+
+def _uid(*parts: bytes) -> int:
+    h = hashlib.blake2b(digest_size=8)
+    for p in parts:
+        h.update(p)
+    return int.from_bytes(h.digest(), "little", signed=True)
+
+
+# =============================================================================
+# 저장소
+# =============================================================================
+class TrendStore:
+    """append-only 컬럼 저장소. directory가 None이면 메모리만 사용."""
+
+    def __init__(self, directory: Optional[str]):
+        self.directory = directory
+        self._lock = threading.RLock()
+        self._n = 0
+        self._cols: Dict[str, np.ndarray] = {name: np.empty(0, dtype=dt) for name, dt in _COLUMNS.items()}
+        self._strings: List[str] = [""]
+        self._codes: Dict[str, int] = {"": 0}
+        self._uids: set = set()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._load()
+
+    def __len__(self) -> int:
+        return self._n
+
+    # ── 디스크 ──
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _load(self) -> None:
+        try:
+            with open(self._path("meta.json"), encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            meta = {"count": 0, "strings": [""]}
+
+        n = int(meta.get("count", 0))
+        cols = {}
+        for name, dt in _COLUMNS.items():
+            try:
+                cols[name] = np.fromfile(self._path(f"{name}.bin"), dtype=dt, count=n)
+            except (OSError, ValueError):
+                cols[name] = np.empty(0, dtype=dt)
+            n = min(n, len(cols[name]))
+
+        # meta.json 이후 꼬리(쓰다 만 append) 잘라냄
+        for name, dt in _COLUMNS.items():
+            p = self._path(f"{name}.bin")
+            if os.path.exists(p):
+                os.truncate(p, n * dt.itemsize)
+        self._cols = {name: arr[:n].copy() for name, arr in cols.items()}
+        self._n = n
+        self._strings = list(meta.get("strings") or [""])
+        self._codes = {s: i for i, s in enumerate(self._strings)}
+        self._uids = set(np.unique(self._cols["uid"]).tolist())
+        if n != meta.get("count", 0):
+            self._write_meta()
+
+    def _write_meta(self) -> None:
+        tmp = self._path("meta.json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"count": self._n, "strings": self._strings}, f, ensure_ascii=False)
+        os.replace(tmp, self._path("meta.json"))
+
+    # ── 추가 ──
+    def _code(self, value) -> int:
+        s = "" if value is None else str(value)
+        code = self._codes.get(s)
+        if code is None:
+            code = len(self._strings)
+            self._strings.append(s)
+            self._codes[s] = code
+        return code
+
+    def _append(self, new: Dict[str, np.ndarray]) -> int:
+        """컬럼별 배열 추가 (호출 측에서 lock 보유). 반환: 추가된 포인트 수."""
+        k = len(new["ts"])
+        if k == 0:
+            return 0
+        new = {name: np.ascontiguousarray(new[name], dtype=dt) for name, dt in _COLUMNS.items()}
+        n = self._n
+        for name, arr in new.items():
+            col = self._cols[name]
+            if n + k > len(col):
+                grown = np.empty(max(n + k, 2 * len(col), 1024), dtype=col.dtype)
+                grown[:n] = col[:n]
+                self._cols[name] = col = grown
+            col[n : n + k] = arr
+        if self.directory:
+            for name, arr in new.items():
+                with open(self._path(f"{name}.bin"), "ab") as f:
+                    f.write(arr.tobytes())
+        self._n = n + k
+        if self.directory:
+            self._write_meta()
+        return k
+
+    def record_sheets(self, sheets: List[Tuple[str, Dict, pd.DataFrame]], fallback_ts: float) -> int:
+        """
+        (sheet_key, meta, row_df) 목록 → 시트 지표 + Row 지표 포인트 추가. 반환: 추가된 포인트 수.
+        값이 없는(NaN) 지표는 저장하지 않음 (Row 값이 하나도 없는 시트는 score도 저장하지 않음).
+        """
+        with self._lock:
+            v = core.stack_row_values([df for _skey, _meta, df in sheets])
+            todo = []
+            for k, (skey, meta, df) in enumerate(sheets):
+                uid = _uid(skey.encode("utf-8"), v[k].tobytes())
+                if uid not in self._uids:
+                    todo.append((uid, meta, df))
+            if not todo:
+                return 0
+
+            dfs = [df for _uid_, _meta, df in todo]
+            sc = core.score_sheets(dfs, th=None)
+            rm = core.row_metrics(dfs)
+            n_sheets, n_rows = rm["row"].shape
+
+            base = {
+                "ts": np.array([point_time(m.get("일자"), fallback_ts) for _u, m, _d in todo], dtype=np.int64),
+                "uid": np.array([u for u, _m, _d in todo], dtype=np.int64),
+                "sheet": np.array([m.get("시트넘버") if m.get("시트넘버") is not None else -1 for _u, m, _d in todo]),
+                **{col: np.array([self._code(m.get(key)) for _u, m, _d in todo]) for col, key in _KEY_FIELDS.items()},
+            }
+
+            # 지표가 전부 NaN인 시트 = 측정값 없음 → score(=100)도 추이에서 제외
+            measured = ~np.all([np.isnan(np.asarray(sc[k], dtype=float))
+                                for k, row_k in _SHEET_METRIC_KEYS.values() if row_k is not None], axis=0)
+
+            parts: List[Dict[str, np.ndarray]] = []
+            for metric, (sheet_key, row_key) in _SHEET_METRIC_KEYS.items():
+                code = TREND_METRICS.index(metric)
+                vals = np.asarray(sc[sheet_key], dtype=float)
+                ok = ~np.isnan(vals) & measured
+                parts.append({**{c: a[ok] for c, a in base.items()}, "metric": np.full(ok.sum(), code),
+                              "row": np.zeros(ok.sum()), "value": vals[ok]})
+                if row_key is None:
+                    continue
+                vals = rm[row_key]
+                ok = ~np.isnan(vals) & (rm["row"] > 0)
+                sheet_idx = np.broadcast_to(np.arange(n_sheets)[:, None], (n_sheets, n_rows))[ok]
+                parts.append({**{c: a[sheet_idx] for c, a in base.items()}, "metric": np.full(ok.sum(), code),
+                              "row": rm["row"][ok], "value": vals[ok]})
+
+            added = self._append({name: np.concatenate([p[name] for p in parts]) for name in _COLUMNS})
+            self._uids.update(base["uid"].tolist())
+            return added
+
+    def record_file(self, metric: str, filename: str, value: float, per_row: Dict[int, float], fallback_ts: float) -> int:
+        """파일 단위 지표 1개(+ Row/포인트별 값) 추가 — 예: 프린팅 maxDeviation, 분주 CV. 같은 파일·같은 값이면 건너뜀."""
+        if metric not in TREND_METRICS:
+            raise ValueError(f"unknown metric: {metric}")
+        if value != value:
+            return 0
+        with self._lock:
+            rows = sorted(per_row)
+            uid = _uid(metric.encode("utf-8"), filename.encode("utf-8"),
+                       np.array([value, *(per_row[r] for r in rows)], dtype=float).tobytes())
+            if uid in self._uids:
+                return 0
+            meta = core.parse_filename(filename)
+            k = 1 + len(rows)
+            added = self._append({
+                "ts": np.full(k, point_time(meta.get("일자"), fallback_ts)),
+                "metric": np.full(k, TREND_METRICS.index(metric)),
+                "row": np.array([0, *rows]),
+                "value": np.array([value, *(per_row[r] for r in rows)], dtype=float),
+                **{col: np.full(k, self._code(meta.get(key))) for col, key in _KEY_FIELDS.items()},
+                "sheet": np.full(k, meta.get("시트넘버") if meta.get("시트넘버") is not None else -1),
+                "uid": np.full(k, uid),
+            })
+            self._uids.add(uid)
+            return added
+
+    # ── 조회 ──
+    def _snapshot(self) -> Tuple[int, Dict[str, np.ndarray], Dict[str, int]]:
+        with self._lock:
+            n = self._n
+            return n, {name: col[:n] for name, col in self._cols.items()}, dict(self._codes)
+
+    def query(
+        self,
+        metric: str,
+        bucket: int = 86400,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        row: int = 0,
+        line: Optional[str] = None,
+        lot: Optional[str] = None,
+        status: Optional[str] = None,
+    ) -> Dict:
+        """
+        지표 1개의 시간 버킷별 count/min/max/mean (컬럼형 리스트). start 이상 end 미만, row 0 = 시트 단위.
+        버킷 경계는 1970-01-05(월) 00:00 기준 bucket 배수 (1d = 자정, 1w = 월요일).
+        """
+        if metric not in TREND_METRICS:
+            raise ValueError(f"unknown metric: {metric}")
+        if bucket <= 0:
+            raise ValueError("bucket must be positive")
+        _n, c, codes = self._snapshot()
+
+        mask = (c["metric"] == TREND_METRICS.index(metric)) & (c["row"] == row)
+        if start is not None:
+            mask &= c["ts"] >= start
+        if end is not None:
+            mask &= c["ts"] < end
+        for col, want in (("line", line), ("lot", lot), ("status", status)):
+            if want is not None:
+                mask &= c[col] == codes.get(want, -1)
+
+        b = (c["ts"][mask] - _BUCKET_ORIGIN) // bucket
+        vals = c["value"][mask]
+        order = np.argsort(b, kind="stable")
+        b, vals = b[order], vals[order]
+        starts = np.flatnonzero(np.r_[True, b[1:] != b[:-1]]) if len(b) else np.empty(0, dtype=int)
+        counts = np.diff(np.r_[starts, len(b)])
+
+        def _r4(a: np.ndarray) -> List[float]:
+            return [round(x, 4) for x in a.tolist()]
+
+        return {
+            "metric": metric,
+            "row": row,
+            "bucketSeconds": bucket,
+            "total": int(len(vals)),
+            "t": [to_iso(x) for x in (b[starts] * bucket + _BUCKET_ORIGIN).tolist()],
+            "count": counts.tolist(),
+            "min": _r4(np.minimum.reduceat(vals, starts)) if len(b) else [],
+            "max": _r4(np.maximum.reduceat(vals, starts)) if len(b) else [],
+            "mean": _r4(np.add.reduceat(vals, starts) / counts) if len(b) else [],
+        }
+
+    def summary(self) -> Dict:
+        """지표별 포인트 수, 기간, 키 값 목록 (필터 선택용)."""
+        n, c, _codes = self._snapshot()
+        with self._lock:
+            strings = list(self._strings)
+
+        def _values(col: str) -> List[str]:
+            return sorted(strings[i] for i in np.unique(c[col]).tolist() if i > 0)
+
+        counts = np.bincount(c["metric"], minlength=len(TREND_METRICS))
+        return {
+            "points": n,
+            "metrics": {m: int(counts[i]) for i, m in enumerate(TREND_METRICS)},
+            "start": to_iso(c["ts"].min()) if n else None,
+            "end": to_iso(c["ts"].max()) if n else None,
+            "lines": _values("line"),
+            "lots": _values("lot"),
+            "statuses": _values("status"),
+        }
+
+
+def create_trend_store() -> TrendStore:
+    """환경변수 설정에 따라 저장소 생성."""
+    if os.environ.get("ISENS_TREND_STORE", "disk").lower() == "memory":
+        return TrendStore(None)
+    return TrendStore(os.environ.get(
+        "ISENS_TREND_DIR",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "trends"),
+    ))
@@ -3,16 +3,17 @@ import axios from "axios";
 const BASE_URL = "http://127.0.0.1:8000";
 
 /**
- * Worst Row 기준 추천 보정값 조회
+ * 추천 보정값 조회
  * @param {string} jobId
  * @param {string} sheetKey
  * @param {boolean} slitterAvailable - 슬리터 사용 가능 여부
- * @returns {Promise<{ printing_x, printing_y, slitter_y[12], assembly_x[12], assembly_y[12] }>}
+ * @param {"heuristic"|"optimize"} mode - heuristic: Worst Row 기준(기존) / optimize: 장비 단위 내 worst 최소화
+ * @returns {Promise<{ printing_x, printing_y, slitter_y[12], assembly_x[12], assembly_y[12], predicted? }>}
  */
-export async function getRecommendedOffsets(jobId, sheetKey, slitterAvailable = true) {
+export async function getRecommendedOffsets(jobId, sheetKey, slitterAvailable = true, mode = "heuristic") {
   const res = await axios.get(
     `${BASE_URL}/api/v1/measurements/sheets/${encodeURIComponent(jobId)}/${encodeURIComponent(sheetKey)}/recommended-offsets`,
-    { params: { slitter_available: slitterAvailable } }
+    { params: { slitter_available: slitterAvailable, mode } }
   );
   return res.data;
 }
@@ -31,3 +32,32 @@ export async function simulateAdjustment(jobId, sheetKey, offsets) {
   );
   return res.data;
 }
+
+/**
+ * 오프셋 스윕 (히트맵용) — 후보 여러 개의 After 지표를 한 번에 계산
+ * @param {string} jobId
+ * @param {string} sheetKey
+ * @param {Object} sweep - { base, printing_x[], printing_y[] } (그리드) 및/또는 { candidates[] } (개별 오프셋)
+ * @returns {Promise<{ count, grid: { printing_x, printing_y, worstX, worstY, score, status } | null, candidates: { worstX, worstY, score, status } | null }>}
+ */
+export async function simulateSweep(jobId, sheetKey, sweep) {
+  const res = await axios.post(
+    `${BASE_URL}/api/v1/measurements/sheets/${encodeURIComponent(jobId)}/${encodeURIComponent(sheetKey)}/simulate/sweep`,
+    sweep
+  );
+  return res.data;
+}
+
+/**
+ * Job(로트/상태 필터) 공통 추천 보정값 — 시트 평균 qualityScore 최대
+ * @param {string} jobId
+ * @param {Object} [opts] - { lot, status, slitterAvailable }
+ * @returns {Promise<{ jobId, filter, sheetCount, offsets, before, after, sheets[] }>}
+ */
+export async function getJobRecommendedOffsets(jobId, { lot, status, slitterAvailable = true } = {}) {
+  const res = await axios.get(
+    `${BASE_URL}/api/v1/measurements/recommended-offsets/${encodeURIComponent(jobId)}`,
+    { params: { slitter_available: slitterAvailable, lot, status } }
+  );
+  return res.data;
+}
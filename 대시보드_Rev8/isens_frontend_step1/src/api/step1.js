@@ -13,6 +13,41 @@ export async function uploadMeasurements(files) {
   return res.data; // { jobId, parsed, failedSamples, sheets }
 }
 
+// 스트리밍 업로드(NDJSON): 시트 요약이 계산되는 즉시 onEvent로 전달
+// 이벤트: {type:"job"} → {type:"sheet"|"failed"}* → {type:"done", ...업로드 응답}
+export async function uploadMeasurementsStream(files, onEvent) {
+  const form = new FormData();
+  for (const f of files) form.append("files", f);
+
+  const res = await fetch(`${BASE_URL}/api/v1/measurements/upload-stream`, {
+    method: "POST",
+    body: form,
+  });
+  if (!res.ok || !res.body) throw new Error(`HTTP ${res.status}`);
+
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder("utf-8");
+  let buf = "";
+  let done = null;
+  for (;;) {
+    const { value, done: eof } = await reader.read();
+    if (value) buf += decoder.decode(value, { stream: true });
+    let nl;
+    while ((nl = buf.indexOf("\n")) >= 0) {
+      const line = buf.slice(0, nl).trim();
+      buf = buf.slice(nl + 1);
+      if (!line) continue;
+      const ev = JSON.parse(line);
+      if (ev.type === "done") done = ev;
+      onEvent?.(ev);
+    }
+    if (eof) break;
+  }
+  // done 없이 끝나면 서버가 Job을 저장하지 못한 것 → 성공으로 취급하지 않음
+  if (!done) throw new Error("업로드 스트림이 완료(done) 전에 끊겼습니다");
+  return done; // { jobId, parsed, failedSamples, sheets }
+}
+
 export async function getSheetDetail(jobId, sheetKey) {
   // sheetKey는 한글/특수문자 포함 가능 → URL 인코딩
   const res = await axios.get(
@@ -20,3 +55,12 @@ export async function getSheetDetail(jobId, sheetKey) {
   );
   return res.data;
 }
+
+// 여러 시트 디테일 일괄 조회 (fields: ["rows","detail","mini"] 중 선택, 생략 시 rows+detail)
+export async function getSheetDetails(jobId, sheetKeys, fields) {
+  const res = await axios.post(
+    `${BASE_URL}/api/v1/measurements/sheets/${encodeURIComponent(jobId)}/batch`,
+    { sheetKeys, ...(fields ? { fields } : {}) }
+  );
+  return res.data; // { jobId, sheets[], missing[] }
+}
@@ -0,0 +1,25 @@
+import axios from "axios";
+
+const BASE_URL = "http://127.0.0.1:8000";
+
+/**
+ * 추이 저장소 요약 (지표별 포인트 수, 기간, 라인/로트/상태 목록)
+ * @returns {Promise<{ points, metrics, start, end, lines[], lots[], statuses[] }>}
+ */
+export async function getTrendSummary() {
+  const res = await axios.get(`${BASE_URL}/api/v1/trends`);
+  return res.data;
+}
+
+/**
+ * 지표 1개의 시간 버킷별 min/max/mean
+ * @param {"worstX"|"worstY"|"cAsym"|"diag"|"punch"|"score"|"printingMaxDeviation"} metric
+ * @param {Object} [opts] - { bucket: "1h"|"1d"|"1w", start, end (ISO, end 미포함), row (0 = 시트 단위), line, lot, status }
+ * @returns {Promise<{ metric, row, bucketSeconds, total, t[], count[], min[], max[], mean[] }>}
+ */
+export async function getTrend(metric, { bucket = "1d", start, end, row = 0, line, lot, status } = {}) {
+  const res = await axios.get(`${BASE_URL}/api/v1/trends/${encodeURIComponent(metric)}`, {
+    params: { bucket, start, end, row, line, lot, status },
+  });
+  return res.data;
+}
@@ -32,7 +32,7 @@ import BarChartIcon from "@mui/icons-material/BarChart";
 
 import useAppStore from "../../store/useAppStore";
 import useBasketStore from "../../store/useBasketStore";
-import { uploadMeasurements } from "../../api/step1";
+import { uploadMeasurementsStream } from "../../api/step1";
 import ThresholdSettingsPanel from "../shared/ThresholdSettingsPanel";
 
 // 탭 인덱스 ↔ 경로 매핑
@@ -52,6 +52,7 @@ export default function AppShell({ children }) {
   const setBusy = useAppStore((s) => s.setBusy);
   const setMessage = useAppStore((s) => s.setMessage);
   const setJob = useAppStore((s) => s.setJob);
+  const setSheets = useAppStore((s) => s.setSheets);
   const basketCount = useBasketStore((s) => s.basketItems.length);
 
   // 기준값 설정 상태 (D2)
@@ -92,14 +93,29 @@ export default function AppShell({ children }) {
     setMessage(`업로드 중... (${files.length}개)`);
 
     try {
-      const res = await uploadMeasurements(files);
-      setJob(res?.jobId ?? null, res?.sheets ?? []);
+      // 시트가 계산되는 대로 목록에 추가 (같은 sheetKey는 최신으로 교체)
+      let streamed = [];
+      let started = false;
+      const res = await uploadMeasurementsStream(files, (ev) => {
+        if (ev.type === "job") {
+          // 첫 이벤트에서 Job 생성 후 Explorer로 이동 (done 전까지는 busy → 시트 열기 막힘)
+          started = true;
+          setJob(ev.jobId, []);
+          navigate("/explorer");
+        } else if (ev.type === "sheet") {
+          const { type: _t, ...sheet } = ev;
+          streamed = [...streamed.filter((s) => s.sheetKey !== sheet.sheetKey), sheet];
+          setSheets(streamed);
+          setMessage(`업로드 중... (${streamed.length}/${files.length})`);
+        }
+      });
+      setSheets(res.sheets ?? []);
       setMessage(
-        `업로드 완료: parsed=${res?.parsed?.count ?? "-"} / failed=${(res?.failedSamples ?? []).length}`
+        `업로드 완료: parsed=${res.parsed?.count ?? "-"} / failed=${(res.failedSamples ?? []).length}`
       );
-      // 업로드 후 Explorer로 이동
-      navigate("/explorer");
     } catch (e) {
+      // 스트림이 done 전에 끊김: 서버에 Job이 저장되지 않았으므로 받은 시트 목록도 비움
+      if (started) setJob(null, []);
       setMessage(`업로드 실패: ${e?.message ?? e}`);
     } finally {
       setBusy(false);
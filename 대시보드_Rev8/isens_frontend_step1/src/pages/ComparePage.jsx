@@ -18,7 +18,7 @@ import ArrowBackIcon from "@mui/icons-material/ArrowBack";
 import useAppStore from "../store/useAppStore";
 import useThresholdStore from "../store/useThresholdStore";
 import useBasketStore from "../store/useBasketStore";
-import { getSheetDetail } from "../api/step1";
+import { getSheetDetails } from "../api/step1";
 import { getProcessData } from "../api/margin";
 import StatusChip from "../components/shared/StatusChip";
 import BarCell from "../components/shared/BarCell";
@@ -56,18 +56,17 @@ export default function ComparePage() {
     if (!jobId || basketItems.length === 0) return;
 
     setLoading(true);
-    const detailPromises = basketItems.map((key) =>
-      getSheetDetail(jobId, key)
-        .then((d) => ({ key, data: d }))
-        .catch(() => ({ key, data: null }))
-    );
+    // 바구니 시트 전체를 1회 요청으로 조회
+    const detailPromise = getSheetDetails(jobId, basketItems)
+      .then((d) => d.sheets ?? [])
+      .catch(() => []);
 
     const processPromise = getProcessData(jobId).catch(() => null);
 
-    Promise.all([Promise.all(detailPromises), processPromise]).then(([results, procData]) => {
+    Promise.all([detailPromise, processPromise]).then(([results, procData]) => {
       const map = {};
-      results.forEach((r) => {
-        if (r.data) map[r.key] = r.data;
+      results.forEach((d) => {
+        map[d.sheetKey] = d;
       });
       setDetails(map);
       setProcessData(procData);
@@ -39,6 +39,8 @@ export default function ExplorerPage() {
 
   const sheets = useAppStore((s) => s.sheets);
   const jobId = useAppStore((s) => s.jobId);
+  // 스트리밍 업로드 중(done 전)에는 Job이 저장되지 않아 디테일 조회 불가 → 시트 선택/이동 막음
+  const busy = useAppStore((s) => s.busy);
   const setSortedKeys = useAppStore((s) => s.setSortedKeys);
   const explorerFilters = useAppStore((s) => s.explorerFilters);
   const setExplorerFilters = useAppStore((s) => s.setExplorerFilters);
@@ -186,8 +188,8 @@ export default function ExplorerPage() {
           sheets={sortedSheets}
           rankMap={rankMap}
           selectedKey={null}
-          onSelect={onSelectSheet}
-          onDoubleClick={onDoubleClickSheet}
+          onSelect={busy ? undefined : onSelectSheet}
+          onDoubleClick={busy ? undefined : onDoubleClickSheet}
         />
       </Box>
 
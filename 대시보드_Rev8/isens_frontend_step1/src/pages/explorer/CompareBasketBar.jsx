@@ -24,6 +24,8 @@ export default function CompareBasketBar() {
   const basketItems = useBasketStore((s) => s.basketItems);
   const removeFromBasket = useBasketStore((s) => s.removeFromBasket);
   const clearBasket = useBasketStore((s) => s.clearBasket);
+  // 업로드 완료(done) 전에는 Job이 없어 비교/디테일 조회 불가
+  const busy = useAppStore((s) => s.busy);
 
   if (basketItems.length === 0) return null;
 
@@ -56,7 +58,7 @@ export default function CompareBasketBar() {
             <Button
               size="small"
               variant="contained"
-              disabled={basketItems.length < 2}
+              disabled={busy || basketItems.length < 2}
               onClick={() => navigate("/compare")}
             >
               비교
@@ -74,10 +76,10 @@ export default function CompareBasketBar() {
                     minWidth: 200,
                     flexShrink: 0,
                     borderRadius: 2,
-                    cursor: "pointer",
-                    "&:hover": { borderColor: "primary.main" },
+                    cursor: busy ? "default" : "pointer",
+                    "&:hover": { borderColor: busy ? undefined : "primary.main" },
                   }}
-                  onClick={() => navigate(`/detail/${encodeURIComponent(key)}`)}
+                  onClick={() => !busy && navigate(`/detail/${encodeURIComponent(key)}`)}
                 >
                   <CardContent sx={{ py: 0.8, px: 1.2, "&:last-child": { pb: 0.8 } }}>
                     <Stack direction="row" alignItems="center" spacing={0.5}>